@@ -5,7 +5,6 @@ import os
 import sys
 from flask import Flask, request, jsonify, send_from_directory, Response
 from flask_cors import CORS
-import uuid
 from dotenv import load_dotenv
 import logging
 
@@ -19,10 +18,22 @@ PROJECT_ROOT = os.path.dirname(BASE_DIR)
 FRONTEND_DIR = os.path.join(PROJECT_ROOT, "frontend")
 sys.path.append(BASE_DIR)
 
-from utils.ai_analyzer import analyze_evidence, analyze_evidence_advanced
-from utils.firebase_storage import save_to_storage, save_metadata, get_pdf_from_firestore
-from utils.firestore_manager import firestore_manager
-from utils.pdf_generator import generate_pdf
+from utils.ai_analyzer import analyze_evidence
+from utils.firebase_storage import stream_blob, get_report, report_cache_stats
+from utils.firestore_manager import firestore_manager, CASE_LIST_FIELDS, EVIDENCE_LIST_FIELDS
+from utils.gcp_clients import gcp_clients
+from utils.pdf_generator import check_report_fonts, warm_report_styles, REPORT_LANGUAGES
+from utils.evidence_ingest import evidence_ingestor, UploadTooLargeError
+from utils.job_queue import job_queue
+from utils.analysis_cache import analysis_cache
+from utils.report_renderer import report_renderer
+from utils.report_service import report_service
+from utils.case_report import case_report_builder, CaseReportUnavailableError
+from utils.pdf_response import pdf_response
+from config import LISTING_PAGE_SIZE, LISTING_MAX_PAGE_SIZE
+from utils.evidence_pipeline import (
+    run_standard_pipeline, run_advanced_pipeline, STANDARD_STAGES, ADVANCED_STAGES
+)
 
 # Load environment variables
 load_dotenv(os.path.join(BASE_DIR, '.env'))
@@ -35,6 +46,29 @@ UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Background evidence pipeline
+job_queue.register_handler('standard', run_standard_pipeline)
+job_queue.register_handler('advanced', run_advanced_pipeline)
+
+def create_app(start_workers=True):
+    """
+    Prepare the app for serving: check report fonts, warm report styles and
+    start the job workers. Called by the entrypoints (wsgi.py, serve.py),
+    never at import.
+    """
+    # Refuse to serve reports without their fonts, then build style sheets before the first render
+    check_report_fonts()
+    warm_report_styles()
+    if start_workers:
+        # Start workers now so interrupted jobs resume
+        job_queue.start()
+        # Case counters incremented before a crash are rolled up like interrupted jobs
+        try:
+            firestore_manager.recover_pending_rollups()
+        except Exception as e:
+            logger.error(f"Could not recover pending case roll-ups: {e}")
+    return app
+
 # Serve index.html from the root
 @app.route('/')
 def serve_frontend():
@@ -62,55 +96,28 @@ def upload_evidence():
     if file.filename == '':
         return jsonify({'error': 'No selected file'}), 400
     
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-    file.save(file_path)
-    
+    # Stream to disk, hashing and sniffing the MIME type in the same pass
     try:
-        # Get language preference
-        language = request.form.get('language', 'en')
-        
-        # 1. Analyze
-        analysis = analyze_evidence(file_path)
-        if not analysis:
-            raise Exception("AI analysis returned empty.")
-
-        # 2. Upload to Storage
-        storage_url = save_to_storage(file_path)
-
-        # 3. Generate PDF with language support
-        temp_report_id = str(uuid.uuid4())
-        pdf_bytes = generate_pdf(analysis, temp_report_id, language=language)
-
-        # 4. Save metadata and PDF to Firestore
-        report_id = save_metadata(analysis, storage_url, file.filename, pdf_bytes)
-
-        # 5. Return analysis text to frontend
-        return jsonify({
-            'message': 'Report generated successfully',
-            'report_id': report_id,
-            'pdf_url': f'/reports/{report_id}',
-            'analysis': analysis
-        })
-
-    except Exception as e:
-        logger.error(f"Upload process error: {e}")
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        return jsonify({'error': f'An error occurred: {e}'}), 500
+        ingest = evidence_ingestor.ingest(file, app.config['UPLOAD_FOLDER'])
+    except UploadTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    
+    payload = {
+        'file_path': ingest['file_path'],
+        'filename': file.filename,
+        'content_type': file.content_type,
+        'language': request.form.get('language', 'en'),
+        'fileHash': ingest['sha256'],
+        'fileSize': ingest['size_bytes'],
+        'mimeType': ingest['mime_type'],
+        'bypass_cache': _wants_reanalysis()
+    }
+    return _enqueue_evidence_job('standard', payload, STANDARD_STAGES)
 
 # Advanced analysis endpoint
-# In your app.py, update the import section and advanced analysis endpoint:
-
-# Remove this problematic import line:
-# from utils.pdf_generator import generate_pdf
-
-# Replace with direct import at the function level:
 @app.route('/api/analyze-advanced', methods=['POST'])
 def analyze_evidence_advanced_route():
     """Advanced analysis endpoint"""
-    # Import here to avoid circular imports
-    from utils.pdf_generator import generate_pdf
-    
     if 'evidence' not in request.files:
         return jsonify({'error': 'No file part'}), 400
     
@@ -118,86 +125,98 @@ def analyze_evidence_advanced_route():
     if file.filename == '':
         return jsonify({'error': 'No selected file'}), 400
     
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-    file.save(file_path)
+    # Stream to disk, hashing and sniffing the MIME type in the same pass
+    try:
+        ingest = evidence_ingestor.ingest(file, app.config['UPLOAD_FOLDER'])
+    except UploadTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
     
+    payload = {
+        'file_path': ingest['file_path'],
+        'filename': file.filename,
+        'content_type': file.content_type,
+        'language': request.form.get('language', 'en'),
+        'officerId': request.form.get('officerId', 'default_officer'),
+        'description': request.form.get('description', ''),
+        'fileHash': ingest['sha256'],
+        'fileSize': ingest['size_bytes'],
+        'mimeType': ingest['mime_type'],
+        'bypass_cache': _wants_reanalysis()
+    }
+    return _enqueue_evidence_job('advanced', payload, ADVANCED_STAGES)
+
+def _wants_reanalysis():
+    """True when the client asked to skip the analysis cache"""
+    return request.form.get('force_reanalysis', '').lower() in ('1', 'true', 'yes')
+
+def _enqueue_evidence_job(job_type, payload, stages):
+    """Queue an evidence pipeline run and return its job ID immediately"""
     try:
-        # Get language preference
-        language = request.form.get('language', 'en')
-        
-        # Use enhanced analysis flow
-        from utils.advanced_analyzer import advanced_analyzer
-        basic_analysis = analyze_evidence(file_path)
-        enhanced_analysis_data = advanced_analyzer.enhance_ai_analysis(file_path, basic_analysis)
-        
-        # Extract the actual analysis text
-        if isinstance(enhanced_analysis_data, dict) and 'basic_analysis' in enhanced_analysis_data:
-            analysis = enhanced_analysis_data['basic_analysis']
-            advanced_features = enhanced_analysis_data.get('advanced_features', {})
-        else:
-            analysis = enhanced_analysis_data
-            advanced_features = {}
-        
-        # Store in Firestore with new schema
-        case_data = {
-            'title': f"Case Analysis - {file.filename}",
-            'officerId': request.form.get('officerId', 'default_officer'),
-            'description': request.form.get('description', ''),
-            'evidenceType': file.content_type,
-            'language': language
-        }
-        
-        case_id = firestore_manager.create_case_document(case_data)
-        
-        evidence_data = {
-            'filename': file.filename,
-            'filePath': file_path,
-            'analysis': analysis,
-            'advanced_features': advanced_features,
-            'analysisType': 'advanced',
-            'fileType': file.content_type,
-            'language': language
-        }
-        
-        evidence_id = firestore_manager.add_evidence_to_case(case_id, evidence_data)
-        
-        # Generate PDF report with language support - use imported function
-        pdf_bytes = generate_pdf(analysis, evidence_id, language=language, enhanced_data=enhanced_analysis_data)
-        
-        # Store PDF in Firestore
-        report_data = {
-            'filename': file.filename,
-            'evidence_url': f'/reports/{evidence_id}',
-            'analysis': analysis,
-            'advanced_features': advanced_features,
-            'pdf_bytes': pdf_bytes,
-            'timestamp': firestore_manager.get_server_timestamp(),
-            'case_id': case_id,
-            'evidence_id': evidence_id,
-            'language': language
-        }
-        
-        firestore_manager.db.collection('reports').document(evidence_id).set(report_data)
-        
-        return jsonify({
-            'message': 'Advanced analysis completed',
-            'case_id': case_id,
-            'evidence_id': evidence_id,
-            'analysis': analysis,
-            'advanced_features': advanced_features,
-            'pdf_url': f'/reports/{evidence_id}'
-        })
-        
+        job_id = job_queue.enqueue(job_type, payload, stages)
     except Exception as e:
-        logger.error(f"Advanced analysis error: {e}")
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        return jsonify({'error': str(e)}), 500
+        logger.error(f"Enqueue error: {e}")
+        if os.path.exists(payload['file_path']):
+            os.remove(payload['file_path'])
+        return jsonify({'error': f'An error occurred: {e}'}), 500
+    
+    return jsonify({
+        'message': 'Evidence queued for analysis',
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}'
+    }), 202
+
+# Job status endpoint
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Report per-stage progress and the final result of an evidence job"""
+    job = job_queue.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    # Internal spool paths are not exposed to clients
+    job.pop('payload', None)
+    return jsonify(job)
 
 # Case management endpoints
+def _listing_options(list_fields):
+    """
+    Read paging options for a listing: ?limit=, ?start_after=<document id>,
+    ?fields=all for full documents and ?format=ndjson (or Accept:
+    application/x-ndjson) to stream every match instead of one page.
+    """
+    ndjson = (request.args.get('format') == 'ndjson'
+              or request.accept_mimetypes.best == 'application/x-ndjson')
+    limit = request.args.get('limit', type=int)
+    if limit is None or limit <= 0:
+        # Streams are unbounded unless asked; JSON pages are always bounded
+        limit = None if ndjson else LISTING_PAGE_SIZE
+    elif not ndjson:
+        limit = min(limit, LISTING_MAX_PAGE_SIZE)
+    return {
+        'fields': None if request.args.get('fields') == 'all' else list_fields,
+        'page_size': limit,
+        'start_after': request.args.get('start_after') or None,
+    }, ndjson
+
+def _listing_response(key, documents, page_size, ndjson):
+    """One JSON page with a cursor to the next, or one JSON document per line as they stream in"""
+    if ndjson:
+        def generate():
+            try:
+                for document in documents:
+                    yield app.json.dumps(document) + '\n'
+            except Exception as e:
+                # Headers are already sent; the client sees a truncated stream
+                logger.error(f"{key} stream error: {e}")
+        return Response(generate(), mimetype='application/x-ndjson')
+    
+    page = list(documents)
+    next_cursor = page[-1]['id'] if page_size and len(page) == page_size else None
+    return jsonify({key: page, 'next_cursor': next_cursor})
+
 @app.route('/api/cases', methods=['GET'])
 def get_cases():
-    """Get all cases with optional filtering"""
+    """List cases with optional filtering, one page or an NDJSON stream at a time"""
     try:
         filters = {}
         if request.args.get('status'):
@@ -205,8 +224,9 @@ def get_cases():
         if request.args.get('officerId'):
             filters['officerId'] = request.args.get('officerId')
         
-        cases = firestore_manager.search_cases_by_metadata(filters)
-        return jsonify({'cases': cases})
+        options, ndjson = _listing_options(CASE_LIST_FIELDS)
+        cases = firestore_manager.iter_cases(filters, **options)
+        return _listing_response('cases', cases, options['page_size'], ndjson)
     
     except Exception as e:
         logger.error(f"Get cases error: {e}")
@@ -214,15 +234,48 @@ def get_cases():
 
 @app.route('/api/cases/<case_id>/evidence', methods=['GET'])
 def get_case_evidence(case_id):
-    """Get all evidence for a specific case"""
+    """List evidence for a specific case, one page or an NDJSON stream at a time"""
     try:
-        evidence = firestore_manager.get_case_evidence(case_id)
-        return jsonify({'evidence': evidence})
+        options, ndjson = _listing_options(EVIDENCE_LIST_FIELDS)
+        evidence = firestore_manager.iter_case_evidence(case_id, **options)
+        return _listing_response('evidence', evidence, options['page_size'], ndjson)
     
     except Exception as e:
         logger.error(f"Get case evidence error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/cases/<case_id>/counters', methods=['GET'])
+def get_case_counters(case_id):
+    """Current evidence count and other case aggregates, without waiting for the next roll-up"""
+    try:
+        counters = firestore_manager.get_case_counters(case_id)
+    except Exception as e:
+        logger.error(f"Get case counters error: {e}")
+        return jsonify({'error': str(e)}), 500
+    
+    if counters is None:
+        return jsonify({'error': 'Case not found'}), 404
+    return jsonify(counters)
+
+@app.route('/api/cases/<case_id>/report', methods=['GET'])
+def get_case_report(case_id):
+    """Compile every evidence report in a case into one PDF with a table of contents"""
+    try:
+        compiled = case_report_builder.build(case_id)
+    except CaseReportUnavailableError as e:
+        return jsonify({'error': str(e)}), 501
+    except Exception as e:
+        logger.error(f"Case report error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    if compiled is None:
+        return jsonify({'error': 'No evidence found for case'}), 404
+
+    # Streamed as it is assembled, so the length is not known up front
+    response = Response(compiled, mimetype='application/pdf')
+    response.headers['Content-Disposition'] = f'inline; filename=case_{case_id}.pdf'
+    return response
+
 @app.route('/api/cases/create', methods=['POST'])
 def create_case():
     """Create a new case"""
@@ -242,14 +295,12 @@ def ask_evidence_question(evidence_id):
     try:
         question = request.json.get('question', '')
         
-        # Get the evidence analysis from Firestore
-        evidence_ref = firestore_manager.db.collection('reports').document(evidence_id)
-        evidence_doc = evidence_ref.get()
+        # Only the fields answers use; follow-up questions are served from the report cache
+        evidence_data = get_report(evidence_id, fields=['analysis', 'advanced_features'])
         
-        if not evidence_doc.exists:
+        if evidence_data is None:
             return jsonify({'error': 'Evidence not found'}), 404
             
-        evidence_data = evidence_doc.to_dict()
         analysis_text = evidence_data.get('analysis', '')
         advanced_features = evidence_data.get('advanced_features', {})
         
@@ -326,16 +377,30 @@ def enhanced_analysis_flow(file_path):
         # Fallback to basic analysis
         return analyze_evidence(file_path)
 
-# Route to serve PDF from Firestore
+# Route to serve PDF, rendered on first view and streamed from Storage
 @app.route('/reports/<report_id>', methods=['GET'])
 def serve_pdf(report_id):
-    pdf_bytes = get_pdf_from_firestore(report_id)
-    if pdf_bytes:
-        response = Response(pdf_bytes, mimetype='application/pdf')
-        response.headers['Content-Disposition'] = f'inline; filename=report_{report_id}.pdf'
-        return response
-    else:
+    # ?lang= picks another language of the same report; defaults to the language it was uploaded in
+    language = request.args.get('lang')
+    if language and language not in REPORT_LANGUAGES:
+        return jsonify({'error': f"Unsupported language '{language}'"}), 400
+
+    ref = report_service.get_pdf(report_id, language)
+    if ref is None:
         return jsonify({'error': 'Report not found'}), 404
+    return pdf_response(report_id, ref, stream_blob)
+
+# Metrics endpoint
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Expose cache and rendering counters for monitoring"""
+    return jsonify({
+        'analysis_cache': analysis_cache.stats(),
+        'report_renderer': report_renderer.stats(),
+        'report_pdf_cache': report_service.stats(),
+        'report_doc_cache': report_cache_stats(),
+        'gcp_clients': gcp_clients.stats()
+    })
 
 # Health check endpoint
 @app.route('/api/health', methods=['GET'])
@@ -348,5 +413,6 @@ def health_check():
     })
 
 if __name__ == '__main__':
-    logger.info("Starting Alfa Labs Evidence Analyzer...")
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    # serve.py is the development entrypoint; it loads this module as `app`, so routes and workers live there
+    from serve import main
+    main()
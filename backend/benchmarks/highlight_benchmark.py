@@ -0,0 +1,108 @@
+# benchmarks/highlight_benchmark.py
+"""
+Compare the single-pass evidence highlighter against the previous
+multi-pass implementation on a synthetic 2,000-token analysis.
+
+Usage: python benchmarks/highlight_benchmark.py [--tokens N] [--runs N]
+"""
+import argparse
+import random
+import re
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(BACKEND_DIR)
+
+from utils.pdf_generator import _highlight_evidences
+
+
+def legacy_highlight_evidences(text):
+    """The pre-compiled-scanner implementation, kept verbatim for comparison"""
+    if not text:
+        return ""
+
+    text = text.replace('<', '&lt;').replace('>', '&gt;')
+
+    time_pattern = re.compile(r'\b([01]?\d|2[0-3]):[0-5]\d(?::[0-5]\d)?\b')
+    plate_pattern = re.compile(r'\b(TN[-\s]?\d{1,2}[-\s]?[A-Z]{1,2}[-\s]?\d{1,4})\b', re.IGNORECASE)
+    phone_pattern = re.compile(r'\b(\d{3}[-.\s]??\d{3}[-.\s]??\d{4}|\(\d{3}\)\s*\d{3}[-.\s]??\d{4}|\d{3}[-.\s]??\d{4})\b')
+
+    places = ["Chennai", "Coimbatore", "Madurai", "Tiruchirappalli", "Tirunelveli",
+              "Salem", "Tiruppur", "Erode", "Kanchipuram", "Vellore"]
+
+    text = plate_pattern.sub(
+        lambda m: f'<font color="#D32F2F"><b>🚗 {m.group(0)}</b></font>', text)
+    text = time_pattern.sub(
+        lambda m: f'<font color="#1976D2"><b>⏰ {m.group(0)}</b></font>', text)
+    text = phone_pattern.sub(
+        lambda m: f'<font color="#388E3C"><b>📞 {m.group(0)}</b></font>', text)
+
+    for place in places:
+        text = re.sub(r'\b' + re.escape(place) + r'\b',
+                      f'<font color="#7B1FA2"><b>📍 {place}</b></font>', text, flags=re.IGNORECASE)
+
+    evidence_terms = ['evidence', 'suspicious', 'weapon', 'suspect', 'crime', 'illegal', 'theft', 'accident']
+    for term in evidence_terms:
+        text = re.sub(r'\b' + re.escape(term) + r'\b',
+                      f'<font color="#F57C00"><b>{term.upper()}</b></font>', text, flags=re.IGNORECASE)
+
+    return text
+
+
+_FILLER = ("the a person walked near vehicle camera frame shows scene was at on with from "
+           "individual moved toward entrance officer recorded while another crowd gathered").split()
+_ENTITIES = [
+    lambda r: f"TN {r.randint(1, 99):02d} {r.choice(['AB', 'K', 'XY'])} {r.randint(1, 9999)}",
+    lambda r: f"{r.randint(0, 23):02d}:{r.randint(0, 59):02d}",
+    lambda r: f"{r.randint(200, 999)}-{r.randint(200, 999)}-{r.randint(1000, 9999)}",
+    lambda r: r.choice(["Chennai", "madurai", "Vellore", "Salem"]),
+    lambda r: r.choice(["evidence", "Suspect", "weapon", "theft", "crime"]),
+]
+
+
+def build_analysis(tokens, seed=7):
+    """Paragraphs of filler text with a plate, time, phone, place or keyword every ~8 tokens"""
+    rng = random.Random(seed)
+    words = []
+    for i in range(tokens):
+        words.append(rng.choice(_ENTITIES)(rng) if i % 8 == 7 else rng.choice(_FILLER))
+    paragraphs = [' '.join(words[i:i + 60]) + '.' for i in range(0, len(words), 60)]
+    return paragraphs
+
+
+def _time(fn, paragraphs, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        for paragraph in paragraphs:
+            fn(paragraph)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tokens', type=int, default=2000)
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    paragraphs = build_analysis(args.tokens)
+    legacy_ms = _time(legacy_highlight_evidences, paragraphs, args.runs)
+    new_ms = _time(_highlight_evidences, paragraphs, args.runs)
+    differing = sum(
+        legacy_highlight_evidences(paragraph) != _highlight_evidences(paragraph) for paragraph in paragraphs
+    )
+
+    print(f"{args.tokens} tokens in {len(paragraphs)} paragraphs, median of {args.runs} runs")
+    print(f"legacy: {legacy_ms:.2f} ms per report")
+    print(f"new:    {new_ms:.2f} ms per report ({legacy_ms / new_ms:.1f}x)")
+    print(f"paragraphs with different markup: {differing}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# benchmarks/key_frames_benchmark.py
+"""
+Compare the sequential-decode FrameExtractor against the previous
+seek-per-timestamp extract_key_frames on the sample videos in uploads/.
+
+The legacy interval mode only sampled the first 200 frames, so it returns
+fewer frames from the start of the clip; the frames columns show how much
+work each side did, and on long clips the new interval mode is slower
+because it decodes across the whole video. In events mode the new extractor
+decodes no more frames than the legacy seeks; when every legacy seek happens
+to land just after a keyframe the two are at parity, within timing noise.
+
+Usage: python benchmarks/key_frames_benchmark.py [--runs N]
+"""
+import argparse
+import base64
+import glob
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(BACKEND_DIR)
+
+import cv2
+
+from utils.frame_extractor import FrameExtractor
+
+
+def legacy_extract_key_frames(video_path, timestamps=None):
+    """The pre-FrameExtractor implementation, kept verbatim for comparison"""
+    frames = []
+    cap = cv2.VideoCapture(video_path)
+
+    if not cap.isOpened():
+        return []
+
+    if not timestamps:
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps == 0:
+            fps = 30
+
+        interval = max(1, total_frames // 8)
+
+        for i in range(0, min(total_frames, 200), interval):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, i)
+            ret, frame = cap.read()
+            if ret:
+                _, buffer = cv2.imencode('.jpg', frame)
+                frame_base64 = base64.b64encode(buffer).decode('utf-8')
+                frames.append({
+                    'frame_number': i,
+                    'timestamp': i / fps,
+                    'timestamp_formatted': f"{int(i/fps/60):02d}:{int(i/fps%60):02d}",
+                    'image_data': frame_base64
+                })
+    else:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps == 0:
+            fps = 30
+
+        for timestamp in timestamps:
+            frame_number = int(timestamp * fps)
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            ret, frame = cap.read()
+            if ret:
+                _, buffer = cv2.imencode('.jpg', frame)
+                frame_base64 = base64.b64encode(buffer).decode('utf-8')
+                frames.append({
+                    'frame_number': frame_number,
+                    'timestamp': timestamp,
+                    'timestamp_formatted': f"{int(timestamp/60):02d}:{int(timestamp%60):02d}",
+                    'image_data': frame_base64
+                })
+
+    cap.release()
+    return frames
+
+
+def _payload_bytes(frames):
+    return sum(len(frame.get('image_bytes') or frame.get('image_data', '')) for frame in frames)
+
+
+def _time(fn, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def _event_timestamps(video_path, count=5):
+    """Unordered timestamps like the ones the detailed timeline produces"""
+    cap = cv2.VideoCapture(video_path)
+    duration = cap.get(cv2.CAP_PROP_FRAME_COUNT) / (cap.get(cv2.CAP_PROP_FPS) or 30)
+    cap.release()
+    return [duration * fraction for fraction in (0.8, 0.1, 0.5, 0.3, 0.65)][:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--videos', default=os.path.join(BACKEND_DIR, 'uploads', '*.mp4'))
+    args = parser.parse_args()
+
+    extractor = FrameExtractor()
+    videos = sorted(glob.glob(args.videos))
+    if not videos:
+        print(f"No videos matched {args.videos}")
+        return 1
+
+    print(f"{'video':<40} {'mode':<10} {'legacy ms':>10} {'new ms':>10} {'legacy KB':>10} {'new KB':>10} "
+          f"{'frames':>9}")
+    for video in videos:
+        name = os.path.basename(video)[:38]
+        timestamps = _event_timestamps(video)
+        for mode, stamps in (('interval', None), ('events', timestamps)):
+            legacy_ms, legacy_frames = _time(lambda: legacy_extract_key_frames(video, stamps), args.runs)
+            new_ms, new_frames = _time(lambda: extractor.extract(video, stamps), args.runs)
+            print(f"{name:<40} {mode:<10} {legacy_ms:>10.1f} {new_ms:>10.1f} "
+                  f"{_payload_bytes(legacy_frames) / 1024:>10.1f} {_payload_bytes(new_frames) / 1024:>10.1f} "
+                  f"{len(legacy_frames):>4}/{len(new_frames):<4}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
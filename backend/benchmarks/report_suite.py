@@ -0,0 +1,274 @@
+# benchmarks/report_suite.py
+"""
+Benchmark suite for the report pipeline, with baseline regression checks.
+
+Times PDF generation (short, long and enhanced analyses in every report
+language), evidence highlighting, analysis parsing, key-frame extraction and
+timeline building on synthetic text and the sample media in uploads/. Results
+are written as JSON, and the run fails when any case's p50 time or peak
+traced memory grows by more than --margin over the baseline, or a baselined
+case is skipped or missing (exit 1), or when there is no baseline to compare
+against (exit 2).
+
+Timings only compare on the same hardware: record the baseline on the CI
+machine that runs the suite. --update-baseline refuses runs that skipped a
+case (no sample video, no GCP clients, missing report fonts) or used --only,
+so a baseline always measures every case as shipped.
+
+Usage: python benchmarks/report_suite.py [--quick] [--only SUBSTRING]
+           [--output results.json] [--baseline benchmarks/baseline.json]
+           [--margin 0.2] [--update-baseline]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(BACKEND_DIR)
+sys.path.append(BENCH_DIR)
+
+from highlight_benchmark import build_analysis
+from utils.frame_extractor import frame_extractor
+from utils.motion_detector import motion_detector
+from utils.pdf_generator import (
+    generate_pdf, check_report_fonts, _highlight_evidences, ReportFontsUnavailableError, REPORT_LANGUAGES,
+    RENDERER_VERSION
+)
+from utils.report_document import parse_analysis
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results.json')
+
+
+def _analysis_text(tokens):
+    """Sectioned analysis text of roughly `tokens` words, with a timeline and identifiers"""
+    paragraphs = build_analysis(tokens)
+    timeline = [f"{minute // 60:02d}:{minute % 60:02d} - {paragraph[:80]}"
+                for minute, paragraph in zip(range(0, 600, 37), paragraphs)]
+    return '\n'.join(
+        ['EXECUTIVE SUMMARY', paragraphs[0], 'DETAILED ANALYSIS'] + paragraphs[1:]
+        + ['TIMELINE'] + timeline
+        + ['KEY FINDINGS'] + [paragraph[:160] for paragraph in paragraphs[1:6]]
+    )
+
+
+def _sample_video():
+    """Smallest bundled sample video, so key-frame cases stay short"""
+    videos = glob.glob(os.path.join(BACKEND_DIR, 'uploads', '*.mp4'))
+    return min(videos, key=os.path.getsize) if videos else None
+
+
+def _enhanced_data(analysis_text, video):
+    """Enhanced-analysis payload with real key frames from a sample video when one is available"""
+    key_frames = frame_extractor.extract(video, None)[:3] if video else []
+    return {
+        'basic_analysis': analysis_text,
+        'advanced_features': {'object_detection': 12, 'text_detection': 3, 'timeline_events': 9},
+        'key_frames': key_frames,
+        'analytical_intelligence': {
+            'confidence_metrics': {'object_detection': 0.91, 'text_detection': 0.78, 'overall_confidence': 0.85},
+        },
+    }
+
+
+def _video_analysis(events=200):
+    """Synthetic Video Intelligence output for timeline building"""
+    return {
+        'object_tracking': [{'entity': 'person', 'timestamp': i * 0.7, 'confidence': 0.8} for i in range(events)],
+        'scene_analysis': [{'start_time': i * 5.0, 'description': 'street', 'confidence': 0.6}
+                           for i in range(events // 10)],
+        'text_detections': [{'timestamp': i * 3.1, 'text': 'TN 09 AB 1234 ' * 5, 'confidence': 0.7}
+                            for i in range(events // 5)],
+        'local_detection': {
+            'scene_changes': [{'timestamp': i * 4.2, 'timestamp_formatted': '00:00', 'score': 0.3}
+                              for i in range(events // 10)],
+            'motion_events': [{'timestamp': i * 2.3, 'timestamp_formatted': '00:00', 'score': 0.05,
+                               'start_time': i * 2.3, 'end_time': i * 2.3 + 1} for i in range(events // 10)],
+        },
+    }
+
+
+def build_cases(quick=False):
+    """Map case name -> zero-argument callable, or the reason the case cannot run here"""
+    short_text = _analysis_text(150)
+    long_text = _analysis_text(600 if quick else 3000)
+    video = _sample_video()
+    enhanced = _enhanced_data(long_text, video)
+
+    cases = {}
+    for language in REPORT_LANGUAGES:
+        try:
+            check_report_fonts([language])
+        except ReportFontsUnavailableError as e:
+            # Timings without the bundled fonts measure Helvetica, not the shipped report
+            for variant in ('short', 'long', 'enhanced'):
+                cases[f'generate_pdf/{variant}/{language}'] = str(e)
+            continue
+        cases[f'generate_pdf/short/{language}'] = lambda language=language: generate_pdf(
+            short_text, 'BENCH-SHORT', language)
+        cases[f'generate_pdf/long/{language}'] = lambda language=language: generate_pdf(
+            long_text, 'BENCH-LONG', language)
+        cases[f'generate_pdf/enhanced/{language}'] = lambda language=language: generate_pdf(
+            long_text, 'BENCH-ENHANCED', language, enhanced_data=enhanced)
+
+    paragraphs = build_analysis(2000)
+    cases['highlight_evidences/2000_tokens'] = lambda: [_highlight_evidences(paragraph) for paragraph in paragraphs]
+    # parse_analysis replaced _extract_ai_sections and the other per-section parsers
+    cases['parse_analysis/long'] = lambda: parse_analysis(long_text)
+
+    if video:
+        # Same steps as AdvancedEvidenceAnalyzer.extract_key_frames, which needs the GCP clients to import
+        cases['extract_key_frames/sample_video'] = lambda: frame_extractor.extract(
+            video, motion_detector.key_moments(motion_detector.detect(video)) or None)
+    else:
+        cases['extract_key_frames/sample_video'] = 'no sample video in uploads/'
+
+    try:
+        from utils.advanced_analyzer import advanced_analyzer
+        video_analysis = _video_analysis()
+        cases['get_detailed_timeline/200_events'] = lambda: advanced_analyzer.get_detailed_timeline(video_analysis)
+    except Exception as e:
+        cases['get_detailed_timeline/200_events'] = f'advanced_analyzer unavailable: {e}'
+    return cases
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(fn, min_runs, max_seconds):
+    """Time fn after one warm-up call, then trace its peak Python allocation in one extra call"""
+    fn()
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    while len(samples) < min_runs or (time.perf_counter() < deadline and len(samples) < 200):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    mean_ms = statistics.fmean(samples)
+    return {
+        'runs': len(samples),
+        'ops_per_sec': round(1000 / mean_ms, 2) if mean_ms else None,
+        'mean_ms': round(mean_ms, 3),
+        'p50_ms': round(_percentile(samples, 0.5), 3),
+        'p95_ms': round(_percentile(samples, 0.95), 3),
+        'peak_mem_kb': round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, margin):
+    """
+    List of regressions: cases whose p50 time or peak memory grew by more
+    than margin, and baselined cases this run skipped or did not run.
+    """
+    regressions = []
+    for name, previous in baseline.items():
+        if 'skipped' in previous:
+            regressions.append(f"{name}: no measurement in the baseline ({previous['skipped']})")
+        elif name not in results:
+            regressions.append(f"{name}: in the baseline but not run")
+        elif 'skipped' in results[name]:
+            regressions.append(f"{name}: skipped ({results[name]['skipped']})")
+
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or 'skipped' in current or 'skipped' in previous:
+            continue
+        for metric in ('p50_ms', 'peak_mem_kb'):
+            if previous[metric] and current[metric] > previous[metric] * (1 + margin):
+                regressions.append(f"{name}: {metric} {previous[metric]} -> {current[metric]} "
+                                   f"(+{(current[metric] / previous[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='smaller inputs and fewer runs')
+    parser.add_argument('--only', default='', help='run cases whose name contains this text')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--margin', type=float, default=0.2, help='allowed growth over the baseline (0.2 = 20%%)')
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the new baseline')
+    args = parser.parse_args()
+
+    min_runs, max_seconds = (3, 0.5) if args.quick else (5, 2.0)
+    results = {}
+    for name, case in build_cases(args.quick).items():
+        if args.only not in name:
+            continue
+        if isinstance(case, str):
+            results[name] = {'skipped': case}
+            print(f"{name:<40} skipped: {case}")
+            continue
+        results[name] = measure(case, min_runs, max_seconds)
+        result = results[name]
+        print(f"{name:<40} {result['ops_per_sec']:>9} ops/s  p50 {result['p50_ms']:>9.2f} ms  "
+              f"p95 {result['p95_ms']:>9.2f} ms  peak {result['peak_mem_kb']:>9.1f} KB")
+
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'renderer_version': RENDERER_VERSION,
+            'quick': args.quick,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        skipped = [name for name, result in results.items() if 'skipped' in result]
+        if skipped or args.only:
+            print(f"Not updating the baseline: it must measure every case "
+                  f"(skipped: {', '.join(skipped) or 'none'}; --only {args.only!r})", file=sys.stderr)
+            return 1
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        # A missing baseline must not pass as "no regressions"
+        print(f"No baseline at {args.baseline}; run with --update-baseline on the CI machine to store one",
+              file=sys.stderr)
+        return 2
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline['meta'].get('quick') != args.quick:
+        print("Baseline was recorded with a different --quick setting; comparison may be misleading")
+
+    baselined = {name: result for name, result in baseline['results'].items() if args.only in name}
+    regressions = compare(results, baselined, args.margin)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.margin:.0%} or unmeasured case(s):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"No regressions beyond {args.margin:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,5 +12,91 @@ VERTEX_AI_PROJECT_ID = os.getenv('VERTEX_AI_PROJECT_ID', 'your-project-id')
 VERTEX_AI_LOCATION = os.getenv('VERTEX_AI_LOCATION', 'us-central1')
 VERTEX_AI_MODEL = os.getenv('VERTEX_AI_MODEL', 'gemini-2.0-flash-exp')
 
+# Seconds a Firebase/Google Cloud client that failed to build keeps failing fast before it is built again
+GCP_CLIENT_RETRY_SECONDS = float(os.getenv('GCP_CLIENT_RETRY_SECONDS', '30'))
+
+# Upload ingest settings
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))  # 1MB
+MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_BYTES', str(100 * 1024 * 1024)))  # 100MB
+
+# Local data directory for queues and caches
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+
+# Evidence job queue settings
+JOB_DB_PATH = os.getenv('JOB_DB_PATH', os.path.join(DATA_DIR, 'jobs.db'))
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+# A running job's lease is renewed by its worker's heartbeat; jobs whose lease lapses
+# (their process died) are claimed again. Failed attempts are retried after a backoff.
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '60'))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv('JOB_RETRY_BACKOFF_SECONDS', '10'))
+
+# Media larger than this is read by Gemini/Video Intelligence from Cloud Storage instead of inline bytes
+INLINE_MEDIA_MAX_BYTES = int(os.getenv('INLINE_MEDIA_MAX_BYTES', str(15 * 1024 * 1024)))  # 15MB
+
+# Long videos are split into overlapping windows analyzed in parallel
+VIDEO_WINDOW_MIN_SECONDS = float(os.getenv('VIDEO_WINDOW_MIN_SECONDS', '180'))
+VIDEO_WINDOW_SECONDS = float(os.getenv('VIDEO_WINDOW_SECONDS', '120'))
+VIDEO_WINDOW_OVERLAP_SECONDS = float(os.getenv('VIDEO_WINDOW_OVERLAP_SECONDS', '10'))
+VIDEO_WINDOW_PARALLELISM = int(os.getenv('VIDEO_WINDOW_PARALLELISM', '4'))
+VIDEO_WINDOW_CLIP_WIDTH = int(os.getenv('VIDEO_WINDOW_CLIP_WIDTH', '640'))
+VIDEO_WINDOW_CLIP_FPS = float(os.getenv('VIDEO_WINDOW_CLIP_FPS', '5'))
+
+# Key frames are stored at the size the PDF prints them (3x2 inches at 150 DPI)
+KEY_FRAME_MAX_WIDTH = int(os.getenv('KEY_FRAME_MAX_WIDTH', '450'))
+KEY_FRAME_MAX_HEIGHT = int(os.getenv('KEY_FRAME_MAX_HEIGHT', '300'))
+KEY_FRAME_JPEG_QUALITY = int(os.getenv('KEY_FRAME_JPEG_QUALITY', '80'))
+KEY_FRAME_SEEK_GAP_SECONDS = float(os.getenv('KEY_FRAME_SEEK_GAP_SECONDS', '30'))
+
+# Local shot-change/motion pre-pass over a low-resolution, subsampled frame stream
+MOTION_SAMPLE_FPS = float(os.getenv('MOTION_SAMPLE_FPS', '5'))
+MOTION_FRAME_WIDTH = int(os.getenv('MOTION_FRAME_WIDTH', '64'))
+SCENE_CHANGE_THRESHOLD = float(os.getenv('SCENE_CHANGE_THRESHOLD', '0.2'))
+MOTION_SCORE_THRESHOLD = float(os.getenv('MOTION_SCORE_THRESHOLD', '0.02'))
+
+# Report fonts for scripts Helvetica cannot render: Noto Sans Tamil/Kannada TTFs in REPORT_FONT_DIR
+# (fetched by fonts/fetch_fonts.py) unless REPORT_FONT_TA/KN point at a specific file
+REPORT_FONT_DIR = os.getenv('REPORT_FONT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts'))
+REPORT_FONT_TA = os.getenv('REPORT_FONT_TA', '')
+REPORT_FONT_KN = os.getenv('REPORT_FONT_KN', '')
+
+# PDF rendering runs in worker processes; 0 renders on the calling thread
+REPORT_RENDER_WORKERS = int(os.getenv('REPORT_RENDER_WORKERS', str(min(4, os.cpu_count() or 1))))
+REPORT_RENDER_START_METHOD = os.getenv('REPORT_RENDER_START_METHOD', 'spawn')
+
+# Storage references of rendered PDFs kept in memory for repeat views
+REPORT_PDF_CACHE_MAX_ENTRIES = int(os.getenv('REPORT_PDF_CACHE_MAX_ENTRIES', '4096'))
+# Bytes per chunk yielded when streaming a report from Storage (one download request per stream)
+REPORT_STREAM_CHUNK_BYTES = int(os.getenv('REPORT_STREAM_CHUNK_BYTES', str(1024 * 1024)))  # 1MB
+# Report documents (or the projections of them callers ask for) kept in memory,
+# bounded by count and approximate size; the TTL bounds staleness across processes
+REPORT_DOC_CACHE_MAX_ENTRIES = int(os.getenv('REPORT_DOC_CACHE_MAX_ENTRIES', '1024'))
+REPORT_DOC_CACHE_MAX_BYTES = int(os.getenv('REPORT_DOC_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))  # 64MB
+REPORT_DOC_CACHE_TTL = int(os.getenv('REPORT_DOC_CACHE_TTL', '300'))  # seconds
+# After a report's first render, render its other languages in the background
+REPORT_PRERENDER_VARIANTS = os.getenv('REPORT_PRERENDER_VARIANTS', 'True').lower() == 'true'
+# How long a request waits for another thread's render of the same PDF before rendering it itself
+REPORT_RENDER_WAIT_SECONDS = float(os.getenv('REPORT_RENDER_WAIT_SECONDS', '30'))
+
+# Compiled case reports: evidence reports fetched/rendered at once
+CASE_REPORT_PARALLELISM = int(os.getenv('CASE_REPORT_PARALLELISM', '4'))
+
+# Case and evidence listings: default and maximum page size of JSON responses
+LISTING_PAGE_SIZE = int(os.getenv('LISTING_PAGE_SIZE', '50'))
+LISTING_MAX_PAGE_SIZE = int(os.getenv('LISTING_MAX_PAGE_SIZE', '500'))
+
+# Per-case aggregates (evidenceCount) are sharded counters under cases/<id>/counters;
+# each process rolls them up onto the case document, with updatedAt, at most this often
+CASE_COUNTER_SHARDS = int(os.getenv('CASE_COUNTER_SHARDS', '10'))
+CASE_ROLLUP_INTERVAL = float(os.getenv('CASE_ROLLUP_INTERVAL', '5'))  # seconds
+
+# Concurrent pipeline stages shared by all job workers
+PIPELINE_MAX_WORKERS = int(os.getenv('PIPELINE_MAX_WORKERS', '8'))
+
+# Content-addressed analysis cache
+ANALYSIS_CACHE_PATH = os.getenv('ANALYSIS_CACHE_PATH', os.path.join(DATA_DIR, 'analysis_cache.db'))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '256'))
+ANALYSIS_CACHE_DISK_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_DISK_MAX_ENTRIES', '5000'))
+
 # Flask settings
 FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
@@ -0,0 +1,61 @@
+# fonts/fetch_fonts.py
+"""
+Download the Noto Sans Tamil and Kannada fonts (SIL Open Font License) the
+report generator registers from this folder, with their license files.
+
+The TTFs are meant to be committed next to this script so report rendering
+never depends on what happens to be installed on the host.
+
+Usage: python fonts/fetch_fonts.py [--force]
+"""
+import argparse
+import os
+import sys
+import urllib.request
+
+FONTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# notofonts publishes each script from its own repository
+_FAMILIES = {
+    'tamil': 'NotoSansTamil',
+    'kannada': 'NotoSansKannada',
+}
+_WEIGHTS = ['Regular', 'Bold']
+
+
+def _downloads():
+    """(url, file name) for every font and license file"""
+    for script, family in _FAMILIES.items():
+        for weight in _WEIGHTS:
+            name = f"{family}-{weight}.ttf"
+            yield f"https://notofonts.github.io/{script}/fonts/{family}/hinted/ttf/{name}", name
+        yield f"https://raw.githubusercontent.com/notofonts/{script}/main/OFL.txt", f"{family}-OFL.txt"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--force', action='store_true', help='download files that already exist')
+    args = parser.parse_args()
+
+    failed = []
+    for url, name in _downloads():
+        path = os.path.join(FONTS_DIR, name)
+        if os.path.exists(path) and not args.force:
+            print(f"exists  {name}")
+            continue
+        try:
+            with urllib.request.urlopen(url, timeout=60) as response:
+                data = response.read()
+        except Exception as e:
+            print(f"FAILED  {name}: {e}")
+            failed.append(name)
+            continue
+        with open(path, 'wb') as f:
+            f.write(data)
+        print(f"fetched {name} ({len(data)} bytes)")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,22 @@
+# serve.py
+"""
+Development server: python serve.py (or python app.py, which delegates here)
+
+Report render workers are spawned processes that re-import the main
+module, so this module imports nothing at the top level; the Flask app,
+GCP clients and job queue are only loaded in the serving process.
+"""
+import os
+
+
+def main():
+    from app import create_app, logger
+
+    logger.info("Starting Alfa Labs Evidence Analyzer...")
+    # The debug reloader re-runs this module; only the serving child owns the workers
+    app = create_app(start_workers=os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
+    app.run(debug=True, port=5000)
+
+
+if __name__ == '__main__':
+    main()
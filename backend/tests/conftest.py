@@ -0,0 +1,10 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Module-level singletons (e.g. the job queue) must not touch the real data folder
+os.environ.setdefault('JOB_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='evidence-tests-'), 'jobs.db'))
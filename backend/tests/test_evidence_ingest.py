@@ -0,0 +1,32 @@
+# tests/test_evidence_ingest.py
+import io
+import os
+
+from werkzeug.datastructures import FileStorage
+
+from utils.evidence_ingest import EvidenceIngestor, spool_filename
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 32
+
+
+def _ingest(tmp_path, data, filename):
+    upload = FileStorage(stream=io.BytesIO(data), filename=filename)
+    return EvidenceIngestor(chunk_size=8).ingest(upload, str(tmp_path))
+
+
+def test_non_ascii_name_keeps_extension():
+    assert spool_filename('வீடியோ.mp4', 'video/mp4').endswith('_upload.mp4')
+
+
+def test_missing_extension_comes_from_sniffed_type(tmp_path):
+    result = _ingest(tmp_path, PNG, 'புகைப்படம்')
+    assert result['mime_type'] == 'image/png'
+    assert result['file_path'].endswith('.png')
+    assert result['filename'] == 'புகைப்படம்'
+    assert os.listdir(tmp_path) == [os.path.basename(result['file_path'])]
+
+
+def test_spool_name_stays_in_upload_folder(tmp_path):
+    result = _ingest(tmp_path, PNG, '../../evidence photo.PNG')
+    assert os.path.dirname(result['file_path']) == str(tmp_path)
+    assert result['file_path'].endswith('_evidence_photo.png')
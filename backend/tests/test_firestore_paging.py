@@ -0,0 +1,91 @@
+# tests/test_firestore_paging.py
+import pytest
+
+pytest.importorskip('firebase_admin')
+
+from utils.firestore_manager import FirestoreManager
+
+
+class _Snapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class _Query:
+    """In-memory stand-in for a Firestore query over {document ID: data}"""
+
+    def __init__(self, docs, ops=()):
+        self.docs = docs
+        self.ops = list(ops)
+
+    def _with(self, op):
+        return _Query(self.docs, self.ops + [op])
+
+    def order_by(self, field):
+        return self._with(('order_by', field))
+
+    def select(self, fields):
+        return self._with(('select', list(fields)))
+
+    def start_after(self, cursor):
+        return self._with(('start_after', cursor['__name__'].id))
+
+    def limit(self, count):
+        return self._with(('limit', count))
+
+    def document(self, doc_id):
+        return _Snapshot(doc_id, {})
+
+    def stream(self):
+        ops = dict(self.ops)
+        assert ops.get('order_by') == '__name__'
+        ids = sorted(self.docs)
+        if 'start_after' in ops:
+            ids = [doc_id for doc_id in ids if doc_id > ops['start_after']]
+        if 'limit' in ops:
+            ids = ids[:ops['limit']]
+        for doc_id in ids:
+            data = self.docs[doc_id]
+            if 'select' in ops:
+                data = {key: value for key, value in data.items() if key in ops['select']}
+            yield _Snapshot(doc_id, data)
+
+
+@pytest.fixture
+def collection():
+    return _Query({f"e{i:02d}": {'filename': f"clip{i}.mp4", 'analysis': 'long text'} for i in range(7)})
+
+
+def _page(collection, **options):
+    return list(FirestoreManager._iter_documents(None, collection, collection, **options))
+
+
+def test_pages_follow_the_cursor(collection):
+    seen = []
+    cursor = None
+    while True:
+        page = _page(collection, page_size=3, start_after=cursor)
+        seen.extend(doc['id'] for doc in page)
+        if len(page) < 3:
+            break
+        cursor = page[-1]['id']
+    assert seen == sorted(collection.docs)
+
+
+def test_projection_keeps_the_id(collection):
+    page = _page(collection, fields=['filename'], page_size=2)
+    assert page == [{'filename': 'clip0.mp4', 'id': 'e00'}, {'filename': 'clip1.mp4', 'id': 'e01'}]
+
+
+def test_unbounded_stream_returns_everything(collection):
+    docs = _page(collection)
+    assert [doc['id'] for doc in docs] == sorted(collection.docs)
+    assert docs[0]['analysis'] == 'long text'
+
+
+def test_cursor_past_the_end(collection):
+    assert _page(collection, page_size=3, start_after='e99') == []
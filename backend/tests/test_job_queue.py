@@ -0,0 +1,161 @@
+# tests/test_job_queue.py
+import time
+
+import pytest
+
+from utils.job_queue import EvidenceJobQueue, QUEUED, RUNNING, COMPLETED, FAILED
+
+
+def _queue(db_path, owner, **options):
+    queue = EvidenceJobQueue(db_path=str(db_path), workers=0, **options)
+    queue.register_handler('standard', lambda ctx: {'evidence_id': ctx.payload['name']})
+    # Workers are driven by hand: no threads, a fixed lease owner
+    queue._started = True
+    queue.owner = owner
+    return queue
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / 'jobs.db'
+
+
+def test_claim_is_exclusive(db_path):
+    first = _queue(db_path, 'worker-a')
+    second = _queue(db_path, 'worker-b')
+    job_id = first.enqueue('standard', {'name': 'clip'}, ['upload'])
+
+    job = first._claim_next()
+    assert job['job_id'] == job_id
+    assert job['attempts'] == 1
+    assert second._claim_next() is None
+    assert first.get_job(job_id)['status'] == RUNNING
+
+
+def test_claims_oldest_first(db_path):
+    queue = _queue(db_path, 'worker-a')
+    older = queue.enqueue('standard', {'name': 'a'}, [])
+    newer = queue.enqueue('standard', {'name': 'b'}, [])
+
+    assert queue._claim_next()['job_id'] == older
+    assert queue._claim_next()['job_id'] == newer
+    assert queue._claim_next() is None
+
+
+def test_expired_lease_is_reclaimed(db_path):
+    crashed = _queue(db_path, 'worker-a', lease_seconds=0.05)
+    survivor = _queue(db_path, 'worker-b', lease_seconds=0.05)
+    job_id = crashed.enqueue('standard', {'name': 'clip'}, [])
+    crashed._claim_next()
+
+    time.sleep(0.1)
+    job = survivor._claim_next()
+    assert job['job_id'] == job_id
+    assert job['attempts'] == 2
+
+    # The crashed worker's late result is discarded
+    crashed._finish(job_id, COMPLETED, result={'evidence_id': 'stale'})
+    assert survivor.get_job(job_id)['status'] == RUNNING
+
+
+def test_live_lease_is_not_reclaimed(db_path):
+    holder = _queue(db_path, 'worker-a', lease_seconds=0.05)
+    other = _queue(db_path, 'worker-b', lease_seconds=0.05)
+    holder.enqueue('standard', {'name': 'clip'}, [])
+    holder._claim_next()
+
+    time.sleep(0.03)
+    holder.renew_leases()
+    time.sleep(0.03)
+    assert other._claim_next() is None
+
+
+def test_interrupted_too_often_fails(db_path):
+    queue = _queue(db_path, 'worker-a', lease_seconds=0.01, max_attempts=2)
+    job_id = queue.enqueue('standard', {'name': 'clip'}, [])
+    for _ in range(2):
+        assert queue._claim_next() is not None
+        time.sleep(0.02)
+
+    assert queue._claim_next() is None
+    job = queue.get_job(job_id)
+    assert job['status'] == FAILED
+    assert job['error'] == 'Job interrupted too many times'
+
+
+def test_failed_attempt_is_retried_after_backoff(db_path):
+    queue = _queue(db_path, 'worker-a', max_attempts=2, retry_backoff=0.05)
+    attempts = []
+
+    def flaky(ctx):
+        attempts.append(ctx.is_final_attempt)
+        if len(attempts) == 1:
+            raise RuntimeError('transient')
+        return {'evidence_id': 'e1'}
+
+    queue.register_handler('standard', flaky)
+    job_id = queue.enqueue('standard', {}, [])
+
+    queue._run(queue._claim_next())
+    job = queue.get_job(job_id)
+    assert job['status'] == QUEUED
+    assert job['error'] == 'transient'
+    assert queue._claim_next() is None  # still backing off
+
+    time.sleep(0.06)
+    queue._run(queue._claim_next())
+    job = queue.get_job(job_id)
+    assert job['status'] == COMPLETED
+    assert job['report_id'] == 'e1'
+    assert attempts == [False, True]
+
+
+def test_last_attempt_failure_is_final(db_path):
+    queue = _queue(db_path, 'worker-a', max_attempts=1)
+
+    def broken(ctx):
+        raise RuntimeError('bad input')
+
+    queue.register_handler('standard', broken)
+    job_id = queue.enqueue('standard', {}, [])
+    queue._run(queue._claim_next())
+
+    job = queue.get_job(job_id)
+    assert job['status'] == FAILED
+    assert job['error'] == 'bad input'
+    assert queue._claim_next() is None
+
+
+def test_stage_progress_is_recorded(db_path):
+    queue = _queue(db_path, 'worker-a')
+
+    def pipeline(ctx):
+        with ctx.stage('upload'):
+            pass
+        with ctx.stage('analysis'):
+            raise RuntimeError('model down')
+
+    queue.register_handler('standard', pipeline)
+    job_id = queue.enqueue('standard', {}, ['upload', 'analysis', 'report'])
+    queue._run(queue._claim_next())
+
+    stages = queue.get_job(job_id)['stages']
+    assert stages['upload']['state'] == COMPLETED
+    assert stages['analysis']['state'] == FAILED
+    assert stages['analysis']['error'] == 'model down'
+    assert stages['report']['state'] == 'pending'
+
+
+def test_unknown_job_type_is_rejected(db_path):
+    queue = _queue(db_path, 'worker-a')
+    with pytest.raises(ValueError):
+        queue.enqueue('unknown', {}, [])
+
+
+def test_enqueue_does_not_start_workers(db_path):
+    queue = EvidenceJobQueue(db_path=str(db_path), workers=1)
+    queue.register_handler('standard', lambda ctx: {})
+    job_id = queue.enqueue('standard', {}, [])
+    assert not queue._started
+    assert not queue._threads
+    assert queue.get_job(job_id)['status'] == QUEUED
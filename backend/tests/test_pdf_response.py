@@ -0,0 +1,100 @@
+# tests/test_pdf_response.py
+import pytest
+from flask import Flask
+
+from utils.pdf_response import pdf_response
+
+PDF = bytes(range(256)) * 4
+REF = {'path': 'reports/r1/abc.pdf', 'size': len(PDF), 'sha256': 'abc123'}
+
+app = Flask(__name__)
+
+
+def _stream_range(path, start, end):
+    assert path == REF['path']
+    yield PDF[start:end + 1]
+
+
+@pytest.fixture
+def get():
+    def request(headers=None):
+        with app.test_request_context('/reports/r1', headers=headers or {}):
+            response = pdf_response('r1', REF, _stream_range)
+            response.direct_passthrough = False
+            return response
+    return request
+
+
+def test_full_response(get):
+    response = get()
+    assert response.status_code == 200
+    assert response.get_data() == PDF
+    assert response.content_length == len(PDF)
+    assert response.headers['ETag'] == '"abc123"'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.mimetype == 'application/pdf'
+
+
+def test_matching_etag_is_not_modified(get):
+    response = get({'If-None-Match': '"abc123"'})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == '"abc123"'
+
+
+def test_stale_etag_gets_full_body(get):
+    response = get({'If-None-Match': '"old"'})
+    assert response.status_code == 200
+    assert response.get_data() == PDF
+
+
+def test_range(get):
+    response = get({'Range': 'bytes=10-19'})
+    assert response.status_code == 206
+    assert response.get_data() == PDF[10:20]
+    assert response.content_length == 10
+    assert response.headers['Content-Range'] == f'bytes 10-19/{len(PDF)}'
+
+
+def test_suffix_range(get):
+    response = get({'Range': 'bytes=-100'})
+    assert response.status_code == 206
+    assert response.get_data() == PDF[-100:]
+    assert response.headers['Content-Range'] == f'bytes {len(PDF) - 100}-{len(PDF) - 1}/{len(PDF)}'
+
+
+def test_range_past_end_is_unsatisfiable(get):
+    response = get({'Range': f'bytes={len(PDF)}-'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{len(PDF)}'
+
+
+def test_if_range_with_current_etag_applies_range(get):
+    response = get({'Range': 'bytes=0-9', 'If-Range': '"abc123"'})
+    assert response.status_code == 206
+    assert response.get_data() == PDF[:10]
+
+
+def test_if_range_with_stale_etag_sends_whole_pdf(get):
+    response = get({'Range': 'bytes=0-9', 'If-Range': '"old"'})
+    assert response.status_code == 200
+    assert response.get_data() == PDF
+
+
+def test_if_range_date_sends_whole_pdf(get):
+    # Only the content hash identifies a version, so a date validator never matches
+    response = get({'Range': 'bytes=0-9', 'If-Range': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+    assert response.status_code == 200
+
+
+def test_multiple_ranges_get_whole_pdf(get):
+    response = get({'Range': 'bytes=0-9,20-29'})
+    assert response.status_code == 200
+    assert response.get_data() == PDF
+    assert 'Content-Range' not in response.headers
+
+
+def test_multiple_unsatisfiable_ranges(get):
+    response = get({'Range': f'bytes={len(PDF)}-{len(PDF) + 9},{len(PDF) + 20}-{len(PDF) + 29}'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{len(PDF)}'
@@ -0,0 +1,85 @@
+# tests/test_report_document.py
+from utils.report_document import ParsedAnalysis, parse_analysis
+
+ANALYSIS = """EXECUTIVE SUMMARY
+A suspect enters the shop and argues with the cashier before leaving in a car.
+
+DETAILED ANALYSIS
+The individual wears a dark jacket. The vehicle outside has plate TN 09 AB 1234.
+Contact number 9876543210 is visible on a poster near the counter.
+
+TEMPORAL ANALYSIS
+00:05:10 - The suspect leaves the shop
+00:01:02 - The suspect enters the shop
+[00:02:30] The suspect raises a knife at the counter
+
+KEY FINDINGS
+A knife is raised by the suspect during the argument at the counter.
+"""
+
+
+def test_headers_split_sections():
+    parsed = parse_analysis(ANALYSIS)
+    assert parsed.executive_summary.startswith('A suspect enters the shop')
+    assert any('dark jacket' in line for line in parsed.sections['detailed_analysis'])
+    # "TEMPORAL ANALYSIS" is a timeline header, not detailed analysis
+    assert len(parsed.sections['chronology']) == 3
+    assert parsed.sections['key_findings'] == [
+        'A knife is raised by the suspect during the argument at the counter.'
+    ]
+    for lines in parsed.sections.values():
+        assert 'EXECUTIVE SUMMARY' not in lines
+
+
+def test_timeline_is_sorted_and_stripped():
+    parsed = parse_analysis(ANALYSIS)
+    assert [event.time for event in parsed.chronology] == ['00:01:02', '00:02:30', '00:05:10']
+    assert [event.seconds for event in parsed.chronology] == [62, 150, 310]
+    assert parsed.chronology[0].description == 'The suspect enters the shop'
+    assert parsed.chronology[1].description == 'The suspect raises a knife at the counter'
+
+
+def test_short_timestamps_are_minutes():
+    parsed = parse_analysis("TIMELINE\n14:30 - Vehicle arrives\n9:05 - Person leaves")
+    assert [(event.time, event.seconds) for event in parsed.chronology] == [
+        ('9:05', 9 * 3600 + 5 * 60), ('14:30', 14 * 3600 + 30 * 60)
+    ]
+
+
+def test_identifiers_are_deduplicated():
+    parsed = parse_analysis(ANALYSIS + "\nThe car TN 09 AB 1234 returns later.")
+    assert parsed.plates == ['TN 09 AB 1234']
+    assert parsed.phones == ['9876543210']
+
+
+def test_timestamp_after_prose_starts_chronology():
+    text = ("A person walks across the parking lot towards a parked vehicle.\n"
+            "The person opens the car door and sits inside for a while.\n"
+            "Nobody else is visible in the lot during this time.\n"
+            "The lights of the building behind the car switch off.\n"
+            "10:15 the car starts moving out of the lot\n"
+            "10:16 a second individual approaches the vehicle from behind")
+    parsed = parse_analysis(text)
+    assert len(parsed.sections['executive_summary']) == 4
+    assert parsed.sections['chronology'] == text.split('\n')[4:]
+    assert [event.time for event in parsed.chronology] == ['10:15', '10:16']
+
+
+def test_short_text_without_headers_uses_fallback_sections():
+    parsed = parse_analysis("Suspect holds a knife\nCar leaves at 10:15 now")
+    assert parsed.sections['key_findings'] == ['Suspect holds a knife']
+    assert parsed.sections['chronology'] == ['Car leaves at 10:15 now']
+
+
+def test_empty_text():
+    parsed = parse_analysis('')
+    assert parsed.chronology == []
+    assert all(lines == [] for lines in parsed.sections.values())
+
+
+def test_round_trip_and_stale_version():
+    parsed = parse_analysis(ANALYSIS)
+    assert ParsedAnalysis.from_dict(parsed.to_dict()) == parsed
+
+    stale = dict(parsed.to_dict(), version=parsed.version - 1)
+    assert ParsedAnalysis.from_dict(stale) is None
@@ -0,0 +1,22 @@
+# tests/test_report_fonts.py
+import pytest
+
+from utils import pdf_generator
+from utils.pdf_generator import ReportFontsUnavailableError, check_report_fonts
+
+
+@pytest.fixture
+def empty_font_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_generator, 'REPORT_FONT_DIR', str(tmp_path))
+    monkeypatch.setattr(pdf_generator, '_FONT_OVERRIDES', {})
+    monkeypatch.setattr(pdf_generator, '_font_cache', {})
+    return tmp_path
+
+
+def test_missing_fonts_fail_the_check(empty_font_dir):
+    with pytest.raises(ReportFontsUnavailableError, match='NotoSansTamil-Regular.ttf'):
+        check_report_fonts(['en', 'ta'])
+
+
+def test_languages_without_bundled_fonts_pass(empty_font_dir):
+    check_report_fonts(['en'])
@@ -0,0 +1,66 @@
+# tests/test_video_segmenter.py
+from utils.video_segmenter import format_timestamp, merge_window_analyses, plan_windows, shift_timestamps
+
+
+def _section(report, heading):
+    lines = report.split('\n')
+    start = lines.index(heading) + 1
+    end = lines.index('', start) if '' in lines[start:] else len(lines)
+    return lines[start:end]
+
+
+def test_plan_windows_overlap_and_cover():
+    assert plan_windows(50, 60, 10) == [(0.0, 50.0)]
+    windows = plan_windows(130, 60, 10)
+    assert windows == [(0.0, 60.0), (50.0, 110.0), (100.0, 130.0)]
+
+
+def test_shift_timestamps():
+    assert shift_timestamps("[00:05] enters, [01:10-01:20] leaves", 60) == \
+        "[00:01:05] enters, [00:02:10-00:02:20] leaves"
+    assert format_timestamp(3725) == '01:02:05'
+
+
+def test_overlapping_windows_are_deduplicated():
+    results = [
+        (0, 60, "SUMMARY:\nA man enters.\nTIMELINE:\n[00:10] A man enters the shop\n[00:55] He picks up a bag"),
+        (50, 110, "SUMMARY:\nHe leaves.\nTIMELINE:\n[00:05] He picks up a bag\n[00:40] He leaves the shop"),
+    ]
+    report = merge_window_analyses(results, 110, 10)
+    assert _section(report, "3. CHRONOLOGICAL TIMELINE:") == [
+        "- [00:00:10] A man enters the shop",
+        "- [00:00:55] He picks up a bag",
+        "- [00:01:30] He leaves the shop",
+    ]
+    summary = _section(report, "1. EXECUTIVE SUMMARY:")
+    assert "Window [00:00:00-00:01:00]: A man enters." in summary
+    assert "Window [00:00:50-00:01:50]: He leaves." in summary
+
+
+def test_distinct_events_at_the_same_time_are_kept():
+    results = [
+        (0, 60, "TIMELINE:\n[00:55] A car arrives"),
+        (50, 110, "TIMELINE:\n[00:05] A dog barks loudly"),
+    ]
+    timeline = _section(merge_window_analyses(results, 110, 10), "3. CHRONOLOGICAL TIMELINE:")
+    assert timeline == ["- [00:00:55] A car arrives", "- [00:00:55] A dog barks loudly"]
+
+
+def test_findings_are_deduplicated_by_wording():
+    results = [
+        (0, 60, "KEY FINDINGS:\nKnife visible in right hand"),
+        (50, 110, "KEY FINDINGS:\nknife visible in right hand\nRed car parked outside"),
+    ]
+    findings = _section(merge_window_analyses(results, 110, 10), "4. KEY EVIDENCE FINDINGS:")
+    assert findings == ["Knife visible in right hand", "Red car parked outside"]
+
+
+def test_failed_windows_are_reported_as_gaps():
+    results = [
+        (0, 60, "TIMELINE:\n[00:10] A man enters the shop"),
+        (50, 110, None),
+    ]
+    report = merge_window_analyses(results, 110, 10)
+    assert ("INCOMPLETE: 1 of 2 windows could not be analyzed ([00:00:50-00:01:50]); "
+            "events in those spans are missing from this report.") in _section(report, "1. EXECUTIVE SUMMARY:")
+    assert "Window [00:00:50-00:01:50]: analysis unavailable" in _section(report, "2. DETAILED ANALYSIS:")
@@ -1,10 +1,10 @@
 # utils/advanced_analyzer.py
-import vertexai
 from google.cloud import videointelligence_v1 as vi
 from google.cloud import vision
 import os
 import sys
 import logging
+import mimetypes
 from datetime import datetime
 import json
 
@@ -14,39 +14,57 @@ BACKEND_DIR = os.path.dirname(UTILS_DIR)
 sys.path.append(BACKEND_DIR)
 
 from config import VERTEX_AI_PROJECT_ID, VERTEX_AI_LOCATION
-
-# Initialize Vertex AI
-vertexai.init(project=VERTEX_AI_PROJECT_ID, location=VERTEX_AI_LOCATION)
-
-# Initialize clients with error handling
-video_client = None
-vision_client = None
-
-try:
-    video_client = vi.VideoIntelligenceServiceClient()
-except Exception as e:
-    logging.warning(f"Video Intelligence client initialization failed: {e}")
-
-try:
-    vision_client = vision.ImageAnnotatorClient()
-except Exception as e:
-    logging.warning(f"Vision client initialization failed: {e}")
+from utils.analysis_cache import analysis_cache
+from utils.gcp_clients import gcp_clients
+from utils.frame_extractor import frame_extractor
+from utils.motion_detector import motion_detector
+
+# Bump whenever the requested features or parsed output shape change
+ANNOTATION_VERSION = 4
+
+# Image features requested together in one annotate_image call
+IMAGE_FEATURES = [
+    vision.Feature.Type.FACE_DETECTION,
+    vision.Feature.Type.LABEL_DETECTION,
+    vision.Feature.Type.TEXT_DETECTION,
+    vision.Feature.Type.OBJECT_LOCALIZATION,
+    vision.Feature.Type.SAFE_SEARCH_DETECTION,
+]
+
+# Vision accepts at most 16 images per synchronous batch request
+VISION_BATCH_SIZE = 16
 
 logger = logging.getLogger(__name__)
 
+# Clients whose initialization failure has already been logged
+_unavailable_clients = set()
+
+def _client(name, accessor):
+    """Shared API client built on first use, or None (logged once per outage) if it cannot be created"""
+    try:
+        client = accessor()
+        _unavailable_clients.discard(name)
+        return client
+    except Exception as e:
+        if name not in _unavailable_clients:
+            _unavailable_clients.add(name)
+            logger.warning(f"{name} client initialization failed: {e}")
+        return None
+
 class AdvancedEvidenceAnalyzer:
     def __init__(self):
         self.project_id = VERTEX_AI_PROJECT_ID
         self.location = VERTEX_AI_LOCATION
         
-    def analyze_video_advanced(self, file_path):
+    def analyze_video_advanced(self, file_path, storage_uri=None):
         """Advanced video analysis with specialized features"""
+        local_detection = None
+        detected = False
         try:
+            video_client = _client('Video Intelligence', gcp_clients.video_intelligence)
             if not video_client:
-                return self._fallback_video_analysis(file_path, "Video Intelligence API not configured")
-                
-            with open(file_path, "rb") as f:
-                video_content = f.read()
+                return self._fallback_video_analysis(file_path, "Video Intelligence API not configured",
+                                                     motion_detector.detect(file_path))
 
             # Configure features for comprehensive analysis
             features = [
@@ -57,24 +75,35 @@ class AdvancedEvidenceAnalyzer:
                 vi.Feature.TEXT_DETECTION,
             ]
 
+            # Large videos are read by the API from Cloud Storage instead of being sent inline
+            request = {"features": features}
+            if storage_uri:
+                request["input_uri"] = storage_uri
+            else:
+                with open(file_path, "rb") as f:
+                    request["input_content"] = f.read()
+
             # Run annotation
-            operation = video_client.annotate_video(
-                request={
-                    "features": features,
-                    "input_content": video_content,
-                }
-            )
+            operation = video_client.annotate_video(request=request)
+
+            # Local pre-pass runs while the remote annotation is processing
+            local_detection = motion_detector.detect(file_path)
+            detected = True
             
             logger.info("Processing video analysis...")
             result = operation.result(timeout=300)
             
-            return self._parse_video_analysis(result, file_path)
+            analysis = self._parse_video_analysis(result, file_path)
+            analysis['local_detection'] = local_detection
+            return analysis
             
         except Exception as e:
             logger.error(f"Video analysis error: {e}")
-            return self._fallback_video_analysis(file_path, str(e))
+            if not detected:
+                local_detection = motion_detector.detect(file_path)
+            return self._fallback_video_analysis(file_path, str(e), local_detection)
 
-    def _fallback_video_analysis(self, file_path, error_msg):
+    def _fallback_video_analysis(self, file_path, error_msg, local_detection=None):
         """Fallback analysis when advanced features fail"""
         return {
             'file_info': {
@@ -82,6 +111,7 @@ class AdvancedEvidenceAnalyzer:
                 'analysis_timestamp': datetime.utcnow().isoformat(),
                 'analysis_type': 'basic_video_fallback'
             },
+            'local_detection': local_detection,
             'summary': {
                 'status': 'basic_analysis',
                 'message': f'Advanced video analysis unavailable: {error_msg}',
@@ -175,45 +205,78 @@ class AdvancedEvidenceAnalyzer:
                 'message': 'Could not generate detailed summary'
             }
 
-    def analyze_image_advanced(self, file_path):
+    def _image_request(self, file_path, storage_uri=None):
+        """Build one annotate request carrying every image feature"""
+        if storage_uri:
+            image = vision.Image(source=vision.ImageSource(gcs_image_uri=storage_uri))
+        else:
+            with open(file_path, "rb") as f:
+                image = vision.Image(content=f.read())
+
+        return vision.AnnotateImageRequest(
+            image=image,
+            features=[vision.Feature(type_=feature_type) for feature_type in IMAGE_FEATURES]
+        )
+
+    def _build_image_analysis(self, file_path, response):
+        """Parse one AnnotateImageResponse into the image analysis shape"""
+        if response.error.message:
+            return self._fallback_image_analysis(file_path, response.error.message)
+
+        # A combined response exposes the same fields as the per-feature helpers
+        analysis = {
+            'file_info': {
+                'filename': os.path.basename(file_path),
+                'analysis_timestamp': datetime.utcnow().isoformat(),
+                'analysis_type': 'advanced_image'
+            },
+            'face_analysis': self._parse_face_detection(response),
+            'object_detection': self._parse_object_detection(response),
+            'text_detection': self._parse_text_detection(response),
+            'label_analysis': self._parse_label_detection(response),
+            'safe_search': self._parse_safe_search(response),
+            'summary': {}
+        }
+        
+        analysis['summary'] = self._generate_image_summary(analysis)
+        return analysis
+
+    def analyze_image_advanced(self, file_path, storage_uri=None):
         """Advanced image analysis with specialized features"""
         try:
+            vision_client = _client('Vision', gcp_clients.vision)
             if not vision_client:
                 return self._fallback_image_analysis(file_path, "Vision API not configured")
-                
-            with open(file_path, "rb") as f:
-                image_content = f.read()
-
-            image = vision.Image(content=image_content)
             
-            # Multiple feature requests
-            face_response = vision_client.face_detection(image=image)
-            label_response = vision_client.label_detection(image=image)
-            text_response = vision_client.text_detection(image=image)
-            object_response = vision_client.object_localization(image=image)
-            safe_search_response = vision_client.safe_search_detection(image=image)
-            
-            analysis = {
-                'file_info': {
-                    'filename': os.path.basename(file_path),
-                    'analysis_timestamp': datetime.utcnow().isoformat(),
-                    'analysis_type': 'advanced_image'
-                },
-                'face_analysis': self._parse_face_detection(face_response),
-                'object_detection': self._parse_object_detection(object_response),
-                'text_detection': self._parse_text_detection(text_response),
-                'label_analysis': self._parse_label_detection(label_response),
-                'safe_search': self._parse_safe_search(safe_search_response),
-                'summary': {}
-            }
-            
-            analysis['summary'] = self._generate_image_summary(analysis)
-            return analysis
+            # All five features in a single round trip
+            response = vision_client.annotate_image(request=self._image_request(file_path, storage_uri))
+            return self._build_image_analysis(file_path, response)
             
         except Exception as e:
             logger.error(f"Image analysis error: {e}")
             return self._fallback_image_analysis(file_path, str(e))
 
+    def analyze_images_batch(self, file_paths):
+        """Annotate a batch of images with one Vision RPC per VISION_BATCH_SIZE images"""
+        vision_client = _client('Vision', gcp_clients.vision)
+        if not vision_client:
+            return [self._fallback_image_analysis(path, "Vision API not configured") for path in file_paths]
+
+        analyses = []
+        for offset in range(0, len(file_paths), VISION_BATCH_SIZE):
+            chunk = file_paths[offset:offset + VISION_BATCH_SIZE]
+            try:
+                batch_response = vision_client.batch_annotate_images(
+                    requests=[self._image_request(path) for path in chunk]
+                )
+                for path, response in zip(chunk, batch_response.responses):
+                    analyses.append(self._build_image_analysis(path, response))
+            except Exception as e:
+                logger.error(f"Batch image analysis error: {e}")
+                analyses.extend(self._fallback_image_analysis(path, str(e)) for path in chunk)
+
+        return analyses
+
     def _fallback_image_analysis(self, file_path, error_msg):
         """Fallback analysis when advanced features fail"""
         return {
@@ -322,72 +385,14 @@ class AdvancedEvidenceAnalyzer:
                 'message': 'Could not generate detailed summary'
             }
 
-    def extract_key_frames(self, video_path, timestamps=None):
-        """Extract key frames from video for evidence"""
-        try:
-            import cv2
-            frames = []
-            cap = cv2.VideoCapture(video_path)
-            
-            if not cap.isOpened():
-                logger.error(f"Cannot open video file: {video_path}")
-                return []
-            
-            # If no specific timestamps, extract at regular intervals
-            if not timestamps:
-                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                if fps == 0:
-                    fps = 30  # Default assumption
-                
-                interval = max(1, total_frames // 8)  # 8 frames max
-                
-                for i in range(0, min(total_frames, 200), interval):  # Limit to 200 frames max
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-                    ret, frame = cap.read()
-                    if ret:
-                        # Convert frame to base64 for storage
-                        import base64
-                        _, buffer = cv2.imencode('.jpg', frame)
-                        frame_base64 = base64.b64encode(buffer).decode('utf-8')
-                        
-                        frames.append({
-                            'frame_number': i,
-                            'timestamp': i / fps,
-                            'timestamp_formatted': f"{int(i/fps/60):02d}:{int(i/fps%60):02d}",
-                            'image_data': frame_base64
-                        })
-            else:
-                # Extract at specific timestamps
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                if fps == 0:
-                    fps = 30
-                
-                for timestamp in timestamps:
-                    frame_number = int(timestamp * fps)
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-                    ret, frame = cap.read()
-                    if ret:
-                        import base64
-                        _, buffer = cv2.imencode('.jpg', frame)
-                        frame_base64 = base64.b64encode(buffer).decode('utf-8')
-                        
-                        frames.append({
-                            'frame_number': frame_number,
-                            'timestamp': timestamp,
-                            'timestamp_formatted': f"{int(timestamp/60):02d}:{int(timestamp%60):02d}",
-                            'image_data': frame_base64
-                        })
-            
-            cap.release()
-            logger.info(f"Extracted {len(frames)} key frames from video")
-            return frames
-        except ImportError:
-            logger.warning("OpenCV not available for frame extraction")
-            return []
-        except Exception as e:
-            logger.error(f"Frame extraction error: {e}")
-            return []
+    def extract_key_frames(self, video_path, timestamps=None, detections=None):
+        """Extract key frames from video for evidence as downscaled JPEG bytes"""
+        if not timestamps:
+            # Prefer locally detected cuts and motion peaks over even spacing
+            if detections is None:
+                detections = motion_detector.detect(video_path)
+            timestamps = motion_detector.key_moments(detections)
+        return frame_extractor.extract(video_path, timestamps or None)
 
     def get_detailed_timeline(self, video_analysis):
         """Generate detailed chronological timeline from analysis"""
@@ -414,6 +419,26 @@ class AdvancedEvidenceAnalyzer:
                     'type': 'scene'
                 })
             
+            # Use the local shot-change/motion pre-pass for timeline
+            local_detection = video_analysis.get('local_detection') or {}
+            for change in local_detection.get('scene_changes', []):
+                timeline.append({
+                    'timestamp': change['timestamp'],
+                    'timestamp_formatted': change['timestamp_formatted'],
+                    'event': "Scene change (local detection)",
+                    'confidence': change['score'],
+                    'type': 'scene'
+                })
+
+            for motion in local_detection.get('motion_events', []):
+                timeline.append({
+                    'timestamp': motion['timestamp'],
+                    'timestamp_formatted': motion['timestamp_formatted'],
+                    'event': f"High motion ({motion['end_time'] - motion['start_time']:.1f}s burst)",
+                    'confidence': motion['score'],
+                    'type': 'motion'
+                })
+            
             # Use text detections for timeline
             for text in video_analysis.get('text_detections', []):
                 timeline.append({
@@ -440,38 +465,63 @@ class AdvancedEvidenceAnalyzer:
             logger.error(f"Timeline generation error: {e}")
             return []
 
-    def enhance_ai_analysis(self, file_path, basic_analysis):
-        """Enhance basic AI analysis with advanced features"""
+    def annotate_media(self, file_path, file_hash=None, mime_type=None, language='en', bypass_cache=False,
+                       storage_uri=None, display_name=None):
+        """
+        Run Vision/Video Intelligence annotation independently of the model analysis.
+
+        The branch is chosen by MIME type, not by the spool file's suffix;
+        file_info (the uploader's display_name) is added per call and never cached.
+        """
+        if not mime_type:
+            mime_type, _ = mimetypes.guess_type(file_path)
+        mime_type = mime_type or 'application/octet-stream'
+        file_info = {
+            'filename': display_name or os.path.basename(file_path),
+            'enhanced_at': datetime.utcnow().isoformat()
+        }
+
+        cache_key = None
+        if file_hash:
+            cache_key = analysis_cache.make_key('annotations', file_hash, mime_type, 'vision+videointelligence',
+                                                ANNOTATION_VERSION, language)
+            if bypass_cache:
+                analysis_cache.record_bypass()
+            else:
+                cached = analysis_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Annotation cache hit for {file_info['filename']}")
+                    return dict(cached, file_info=file_info)
+
         try:
-            enhanced = {
-                'basic_analysis': basic_analysis,
-                'advanced_features': {},
-                'file_info': {
-                    'filename': os.path.basename(file_path),
-                    'enhanced_at': datetime.utcnow().isoformat()
-                }
-            }
+            cacheable = False
+            annotations = {'advanced_features': {}}
             
-            if file_path.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')):
+            if mime_type.startswith('video/'):
                 # Add video-specific enhancements
-                video_analysis = self.analyze_video_advanced(file_path)
+                video_analysis = self.analyze_video_advanced(file_path, storage_uri=storage_uri)
+                cacheable = video_analysis.get('summary', {}).get('status') != 'basic_analysis'
                 
-                enhanced['advanced_features'] = {
+                annotations['advanced_features'] = {
                     'scene_changes': len(video_analysis.get('scene_analysis', [])),
                     'objects_tracked': len(video_analysis.get('object_tracking', [])),
                     'text_detections': len(video_analysis.get('text_detections', [])),
+                    'local_scene_changes': len((video_analysis.get('local_detection') or {}).get('scene_changes', [])),
+                    'motion_events': len((video_analysis.get('local_detection') or {}).get('motion_events', [])),
                     'detailed_timeline': self.get_detailed_timeline(video_analysis),
                     'analysis_summary': video_analysis.get('summary', {})
                 }
                 
                 # Extract key frames for important events
-                important_timestamps = [event['timestamp'] for event in enhanced['advanced_features']['detailed_timeline'][:5]]
-                enhanced['key_frames'] = self.extract_key_frames(file_path, important_timestamps)
+                important_timestamps = [event['timestamp'] for event in annotations['advanced_features']['detailed_timeline'][:5]]
+                annotations['key_frames'] = self.extract_key_frames(file_path, important_timestamps,
+                                                                    video_analysis.get('local_detection'))
             
-            elif file_path.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp')):
+            elif mime_type.startswith('image/'):
                 # Add image-specific enhancements
-                image_analysis = self.analyze_image_advanced(file_path)
-                enhanced['advanced_features'] = {
+                image_analysis = self.analyze_image_advanced(file_path, storage_uri=storage_uri)
+                cacheable = image_analysis.get('summary', {}).get('status') != 'basic_analysis'
+                annotations['advanced_features'] = {
                     'faces_detected': len(image_analysis.get('face_analysis', [])),
                     'objects_detected': len(image_analysis.get('object_detection', [])),
                     'text_found': len(image_analysis.get('text_detection', [])) > 0,
@@ -479,11 +529,23 @@ class AdvancedEvidenceAnalyzer:
                     'analysis_summary': image_analysis.get('summary', {})
                 }
             
-            return enhanced
+            # Fallback results are not cached so the next upload retries the APIs
+            if cache_key and cacheable:
+                analysis_cache.put(cache_key, annotations)
+            return dict(annotations, file_info=file_info)
         except Exception as e:
             logger.error(f"Analysis enhancement error: {e}")
-            # Return basic analysis if enhancement fails
-            return {'basic_analysis': basic_analysis, 'enhancement_failed': str(e)}
+            return {'enhancement_failed': str(e)}
+
+    def combine_analysis(self, basic_analysis, annotations):
+        """Merge model analysis text with independently computed annotations"""
+        enhanced = {'basic_analysis': basic_analysis}
+        enhanced.update(annotations)
+        return enhanced
+
+    def enhance_ai_analysis(self, file_path, basic_analysis):
+        """Enhance basic AI analysis with advanced features"""
+        return self.combine_analysis(basic_analysis, self.annotate_media(file_path))
 
 # Singleton instance
 advanced_analyzer = AdvancedEvidenceAnalyzer()
\ No newline at end of file
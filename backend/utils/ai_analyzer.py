@@ -2,6 +2,8 @@
 import mimetypes
 import sys
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 
@@ -14,6 +16,19 @@ sys.path.append(BACKEND_DIR)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+from config import (
+    VERTEX_AI_MODEL, VIDEO_WINDOW_MIN_SECONDS, VIDEO_WINDOW_SECONDS, VIDEO_WINDOW_OVERLAP_SECONDS,
+    VIDEO_WINDOW_PARALLELISM, VIDEO_WINDOW_CLIP_WIDTH, VIDEO_WINDOW_CLIP_FPS
+)
+from utils.analysis_cache import analysis_cache
+from utils.gcp_clients import gcp_clients
+from utils.video_segmenter import (
+    probe_video, plan_windows, write_window_clips, merge_window_analyses, format_timestamp
+)
+
+# Bump whenever _get_media_specific_prompt or the cached text changes so cached analyses are not reused
+PROMPT_TEMPLATE_VERSION = 2
+
 # Try to import Vertex AI with multiple fallbacks
 VERTEX_AI_AVAILABLE = False
 generative_ai_available = False
@@ -40,32 +55,29 @@ except ImportError as e:
         except ImportError as e3:
             logger.warning(f"❌ Google Generative AI also unavailable: {e3}")
 
-# Initialize if available
-model = None
-if VERTEX_AI_AVAILABLE:
-    try:
-        from config import VERTEX_AI_PROJECT_ID, VERTEX_AI_LOCATION, VERTEX_AI_MODEL
-        import vertexai
-        vertexai.init(project=VERTEX_AI_PROJECT_ID, location=VERTEX_AI_LOCATION)
+def _create_model():
+    if VERTEX_AI_AVAILABLE:
+        gcp_clients.vertexai()
         model = GenerativeModel(VERTEX_AI_MODEL)
         logger.info("✅ Vertex AI initialized successfully")
-    except Exception as e:
-        logger.error(f"❌ Vertex AI initialization failed: {e}")
-        VERTEX_AI_AVAILABLE = False
-
-elif generative_ai_available:
-    try:
-        from config import VERTEX_AI_MODEL
-        import google.generativeai as genai
+    else:
         # For generativeai, you might need to configure API key differently
         model = genai.GenerativeModel(VERTEX_AI_MODEL)
         logger.info("✅ Google Generative AI configured")
+    return model
+
+def _get_model():
+    """Generative model from the shared client registry, created on first use; None if it cannot be"""
+    if not VERTEX_AI_AVAILABLE and not generative_ai_available:
+        return None
+    try:
+        return gcp_clients.get('generative_model', _create_model)
     except Exception as e:
-        logger.error(f"❌ Google Generative AI configuration failed: {e}")
-        generative_ai_available = False
+        logger.error(f"❌ Generative model initialization failed: {e}")
+        return None
 
-def _get_file_metadata(file_path):
-    """Extract basic file metadata"""
+def _get_file_metadata(file_path, display_name=None):
+    """Extract basic file metadata; display_name replaces the spool file name"""
     try:
         stat_info = os.stat(file_path)
         file_size = stat_info.st_size
@@ -77,7 +89,7 @@ def _get_file_metadata(file_path):
             'size_mb': round(file_size / (1024 * 1024), 2),
             'created': created_time.strftime('%Y-%m-%d %H:%M:%S'),
             'modified': modified_time.strftime('%Y-%m-%d %H:%M:%S'),
-            'filename': os.path.basename(file_path)
+            'filename': display_name or os.path.basename(file_path)
         }
     except Exception as e:
         logger.warning(f"Could not extract file metadata: {e}")
@@ -234,30 +246,124 @@ def _validate_file(file_path):
     
     return True
 
-def analyze_evidence(file_path):
+def _build_content_part(file_path, mime_type, storage_uri=None):
+    """Build the model input Part, referencing Cloud Storage instead of inline bytes when possible"""
+    is_media = mime_type.startswith(('image/', 'video/', 'audio/'))
+
+    # Large media: the model reads the blob already uploaded by save_to_storage
+    if is_media and storage_uri:
+        return Part.from_uri(uri=storage_uri, mime_type=mime_type)
+
+    with open(file_path, 'rb') as f:
+        file_data = f.read()
+
+    if is_media:
+        return Part.from_data(data=file_data, mime_type=mime_type)
+
+    try:
+        text_content = file_data.decode('utf-8')
+    except UnicodeDecodeError:
+        text_content = "[Binary file - content not readable as text]"
+    return Part.from_text(text=text_content)
+
+def _generate(contents):
+    """Call the model with the standard evidence generation settings"""
+    response = _get_model().generate_content(
+        contents,
+        generation_config={
+            "temperature": 0.2,
+            "top_p": 0.8,
+            "top_k": 40,
+            "max_output_tokens": 2048,
+        }
+    )
+    return response.text
+
+def _analyze_video_windowed(file_path, full_prompt, video_info):
     """
-    Analyze evidence with multiple fallback options
+    Analyze a long video as overlapping windows with bounded parallelism and
+    merge the per-window timelines into one chronology. Returns the merged
+    text and the number of windows that failed (marked as gaps in the text).
+    """
+    windows = plan_windows(video_info['duration'], VIDEO_WINDOW_SECONDS, VIDEO_WINDOW_OVERLAP_SECONDS)
+    logger.info(f"Analyzing {os.path.basename(file_path)} as {len(windows)} windows")
+
+    with tempfile.TemporaryDirectory(prefix='evidence_windows_') as clip_dir:
+        clip_paths = write_window_clips(file_path, windows, clip_dir,
+                                        clip_width=VIDEO_WINDOW_CLIP_WIDTH, clip_fps=VIDEO_WINDOW_CLIP_FPS)
+
+        def analyze_window(index):
+            start, end = windows[index]
+            clip_path = clip_paths[index]
+            if not clip_path:
+                return None
+            window_prompt = full_prompt + f"""
+WINDOW CONTEXT:
+This clip is window {index + 1} of {len(windows)}, covering {format_timestamp(start)} to {format_timestamp(end)} of a longer recording.
+Give every timestamp as [mm:ss] relative to the START OF THIS CLIP.
+"""
+            try:
+                with open(clip_path, 'rb') as f:
+                    part = Part.from_data(data=f.read(), mime_type='video/mp4')
+                return _generate([window_prompt, part])
+            except Exception as e:
+                logger.error(f"Window {index + 1} analysis failed: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=VIDEO_WINDOW_PARALLELISM) as executor:
+            texts = list(executor.map(analyze_window, range(len(windows))))
+
+    if not any(texts):
+        raise RuntimeError("All video windows failed to analyze")
+
+    failed = sum(1 for text in texts if not text)
+    if failed:
+        logger.warning(f"{failed} of {len(windows)} windows failed for {os.path.basename(file_path)}")
+    window_results = [(start, end, text) for (start, end), text in zip(windows, texts)]
+    return merge_window_analyses(window_results, video_info['duration'], VIDEO_WINDOW_OVERLAP_SECONDS), failed
+
+def analyze_evidence(file_path, file_hash=None, mime_type=None, language='en', bypass_cache=False,
+                     storage_uri=None, display_name=None):
+    """
+    Analyze evidence with multiple fallback options.
+
+    When file_hash is given, model results are cached by content so repeated
+    uploads of the same evidence skip the model call; bypass_cache forces a
+    fresh analysis and refreshes the cached entry. When storage_uri is given,
+    media is passed to the model by gs:// reference instead of being read
+    into memory. display_name is the uploader's filename shown in the
+    report; file_path is only used to read the file.
     """
     try:
         # Validate file
         _validate_file(file_path)
         
         # Get file metadata
-        metadata = _get_file_metadata(file_path)
-        mime_type, _ = mimetypes.guess_type(file_path)
+        metadata = _get_file_metadata(file_path, display_name)
+        if not mime_type:
+            mime_type, _ = mimetypes.guess_type(file_path)
         if not mime_type:
             mime_type = 'application/octet-stream'
 
         logger.info(f"Processing file: {metadata.get('filename')}, Type: {mime_type}")
+        media_type_note = f"\n\n--- Analysis of {mime_type.upper()} file: {metadata.get('filename', 'Unknown')} ---\n"
+
+        cache_key = None
+        if file_hash:
+            cache_key = analysis_cache.make_key('analysis', file_hash, mime_type, VERTEX_AI_MODEL,
+                                                PROMPT_TEMPLATE_VERSION, language)
+            if bypass_cache:
+                analysis_cache.record_bypass()
+            else:
+                cached = analysis_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Analysis cache hit for {metadata.get('filename')}")
+                    return media_type_note + cached
 
         # If no AI available, use fallback
         if not VERTEX_AI_AVAILABLE and not generative_ai_available:
             from utils.fallback_analyzer import fallback_analyzer
-            return fallback_analyzer.analyze_evidence(file_path)
-
-        # Read file data
-        with open(file_path, 'rb') as f:
-            file_data = f.read()
+            return fallback_analyzer.analyze_evidence(file_path, display_name)
 
         # Get specialized prompt
         prompt = _get_media_specific_prompt(mime_type, metadata)
@@ -274,35 +380,22 @@ Analysis Context: Tamil Nadu Police Evidence Investigation
         full_prompt = metadata_context + prompt
 
         # Try Vertex AI first
-        if VERTEX_AI_AVAILABLE and model:
+        if VERTEX_AI_AVAILABLE and _get_model():
             try:
-                # Prepare Part based on MIME type
-                if mime_type.startswith('image/'):
-                    part = Part.from_data(data=file_data, mime_type=mime_type)
-                elif mime_type.startswith('video/'):
-                    part = Part.from_data(data=file_data, mime_type=mime_type)
-                elif mime_type.startswith('audio/'):
-                    part = Part.from_data(data=file_data, mime_type=mime_type)
+                # Long recordings are analyzed as overlapping windows in parallel
+                video_info = probe_video(file_path) if mime_type.startswith('video/') else None
+                failed_windows = 0
+                if video_info and video_info['duration'] > VIDEO_WINDOW_MIN_SECONDS:
+                    analysis_text, failed_windows = _analyze_video_windowed(file_path, full_prompt, video_info)
                 else:
-                    try:
-                        text_content = file_data.decode('utf-8')
-                    except UnicodeDecodeError:
-                        text_content = "[Binary file - content not readable as text]"
-                    part = Part.from_text(text=text_content)
-
-                # Generate content
-                response = model.generate_content(
-                    [full_prompt, part],
-                    generation_config={
-                        "temperature": 0.2,
-                        "top_p": 0.8,
-                        "top_k": 40,
-                        "max_output_tokens": 2048,
-                    }
-                )
-                
-                media_type_note = f"\n\n--- Analysis of {mime_type.upper()} file: {metadata.get('filename', 'Unknown')} ---\n"
-                return media_type_note + response.text
+                    part = _build_content_part(file_path, mime_type, storage_uri)
+                    analysis_text = _generate([full_prompt, part])
+
+                # Only complete model output is cached, never the fallback text or a result with gaps;
+                # the header naming this upload is added per call so cached text never carries a filename
+                if cache_key and not failed_windows:
+                    analysis_cache.put(cache_key, analysis_text)
+                return media_type_note + analysis_text
 
             except Exception as ai_error:
                 logger.error(f"Vertex AI analysis failed: {ai_error}")
@@ -310,12 +403,12 @@ Analysis Context: Tamil Nadu Police Evidence Investigation
 
         # If we reach here, use fallback
         from utils.fallback_analyzer import fallback_analyzer
-        return fallback_analyzer.analyze_evidence(file_path)
+        return fallback_analyzer.analyze_evidence(file_path, display_name)
 
     except Exception as e:
         logger.error(f"Analysis error: {e}")
         from utils.fallback_analyzer import fallback_analyzer
-        return fallback_analyzer.analyze_evidence(file_path)
+        return fallback_analyzer.analyze_evidence(file_path, display_name)
 
 def analyze_evidence_advanced(file_path):
     """
@@ -0,0 +1,144 @@
+# utils/analysis_cache.py
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from config import ANALYSIS_CACHE_PATH, ANALYSIS_CACHE_MAX_ENTRIES, ANALYSIS_CACHE_DISK_MAX_ENTRIES
+from utils.memory_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    cache_key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_accessed ON analysis_cache (accessed_at);
+"""
+
+
+class AnalysisCache:
+    """
+    Content-addressed cache of model and media-annotation results.
+
+    Entries are keyed on the evidence SHA-256 plus everything that changes
+    the output (MIME type, model, prompt version, language). Lookups hit a
+    bounded in-memory LRU first and fall back to an on-disk SQLite store.
+    """
+
+    def __init__(self, db_path=ANALYSIS_CACHE_PATH, max_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+                 disk_max_entries=ANALYSIS_CACHE_DISK_MAX_ENTRIES):
+        self.db_path = db_path
+        self.disk_max_entries = disk_max_entries
+        self.memory = LRUCache(max_entries=max_entries)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_evictions = 0
+        self.bypasses = 0
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Connection for one transaction: committed (or rolled back) on exit, then closed"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(kind, file_hash, mime_type, model, version, language='en'):
+        """Build the cache key for one analysis result"""
+        raw = '|'.join([kind, file_hash, mime_type or '', model or '', str(version), language or ''])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return a cached result or None"""
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value FROM analysis_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "UPDATE analysis_cache SET accessed_at = ? WHERE cache_key = ?", (time.time(), key)
+                    )
+        except Exception as e:
+            logger.warning(f"Analysis cache read failed: {e}")
+            return None
+
+        if not row:
+            return None
+
+        value = pickle.loads(row[0])
+        self.memory.put(key, value)
+        self.disk_hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store a result in memory and on disk"""
+        self.memory.put(key, value)
+        now = time.time()
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (cache_key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now, now)
+                )
+                self._trim_disk(conn)
+        except Exception as e:
+            logger.warning(f"Analysis cache write failed: {e}")
+
+    def _trim_disk(self, conn):
+        """Drop the least recently used rows beyond the disk bound"""
+        count = conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+        excess = count - self.disk_max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM analysis_cache WHERE cache_key IN "
+                "(SELECT cache_key FROM analysis_cache ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            )
+            self.disk_evictions += excess
+
+    def record_bypass(self):
+        """Count a forced re-analysis that skipped the lookup"""
+        self.bypasses += 1
+
+    def stats(self):
+        """Hit/miss/eviction counters for the metrics endpoint"""
+        memory_stats = self.memory.stats()
+        return {
+            'memory': memory_stats,
+            'disk_hits': self.disk_hits,
+            'disk_evictions': self.disk_evictions,
+            'bypasses': self.bypasses,
+            'hits': memory_stats['hits'] + self.disk_hits,
+            'misses': memory_stats['misses'] - self.disk_hits
+        }
+
+# Singleton instance
+analysis_cache = AnalysisCache()
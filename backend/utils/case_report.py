@@ -0,0 +1,362 @@
+# utils/case_report.py
+import io
+import os
+import sys
+import tempfile
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib import colors
+
+try:
+    from pypdf import PdfReader
+    from pypdf.generic import (
+        ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject, StreamObject, create_string_object
+    )
+except ImportError:
+    PdfReader = None
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from config import CASE_REPORT_PARALLELISM, REPORT_STREAM_CHUNK_BYTES
+from utils.firebase_storage import stream_blob
+from utils.firestore_manager import firestore_manager
+from utils.pdf_generator import _create_styles
+from utils.report_renderer import report_renderer
+from utils.report_service import report_service
+
+logger = logging.getLogger(__name__)
+
+# Evidence fields the contents and item rendering need; the analysis is fetched only when rendering
+CASE_REPORT_FIELDS = ['filename', 'analysisType', 'addedAt', 'language']
+
+
+class CaseReportUnavailableError(RuntimeError):
+    """Raised when compiled case reports cannot be built because pypdf is not installed"""
+
+
+class _PdfStreamWriter:
+    """
+    Writes one PDF incrementally from the pages of other PDFs.
+
+    pypdf's PdfWriter holds every object of the merged document until
+    write(); here each object is serialized as soon as it is copied, so only
+    the source document being copied and the xref offsets stay in memory.
+    Call drain() to take the bytes produced so far.
+    """
+
+    _PAGES = 1
+    _CATALOG = 2
+
+    def __init__(self):
+        self._buffer = io.BytesIO()
+        self._drained = 0
+        self._offsets = {}
+        self._next_number = 3
+        self.page_refs = []
+        self._buffer.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def position(self):
+        return self._drained + self._buffer.tell()
+
+    def drain(self, min_bytes=0):
+        """Return the bytes written since the last drain, or b'' if fewer than min_bytes are waiting"""
+        if self._buffer.tell() < max(min_bytes, 1):
+            return b''
+        data = self._buffer.getvalue()
+        self._drained += len(data)
+        self._buffer = io.BytesIO()
+        return data
+
+    def _reserve(self):
+        number = self._next_number
+        self._next_number += 1
+        return number
+
+    @staticmethod
+    def _ref(number):
+        return IndirectObject(number, 0, None)
+
+    def _write_object(self, number, obj):
+        self._offsets[number] = self.position
+        self._buffer.write(f"{number} 0 obj\n".encode())
+        obj.write_to_stream(self._buffer)
+        self._buffer.write(b"\nendobj\n")
+
+    def copy_pages(self, reader, at=None):
+        """
+        Copy every page of a document; yields after each page so the caller can drain the output.
+
+        Pages are appended to the page tree, or inserted from index `at`:
+        page order is set by the tree written in finish(), not by write order.
+        """
+        copied = {}
+        pending = []
+
+        def reference(indirect):
+            key = (indirect.idnum, indirect.generation)
+            if key not in copied:
+                if indirect.get_object().get('/Type') == '/Pages':
+                    # The source page tree is replaced by this document's
+                    return self._ref(self._PAGES)
+                copied[key] = self._reserve()
+                pending.append(indirect)
+            return self._ref(copied[key])
+
+        def copy(obj):
+            if isinstance(obj, IndirectObject):
+                return reference(obj)
+            if isinstance(obj, DictionaryObject):
+                result = StreamObject() if isinstance(obj, StreamObject) else DictionaryObject()
+                for key, value in obj.items():
+                    if key == '/Length' and isinstance(obj, StreamObject):
+                        continue
+                    result[NameObject(key)] = copy(value)
+                if isinstance(obj, StreamObject):
+                    # Stream data is copied still encoded; /Length is written from it
+                    result._data = obj._data
+                if result.get('/Type') == '/Page':
+                    result[NameObject('/Parent')] = self._ref(self._PAGES)
+                return result
+            if isinstance(obj, ArrayObject):
+                return ArrayObject(copy(item) for item in obj)
+            return obj
+
+        for page in reader.pages:
+            ref = reference(page.indirect_reference)
+            if at is None:
+                self.page_refs.append(ref)
+            else:
+                self.page_refs.insert(at, ref)
+                at += 1
+            while pending:
+                indirect = pending.pop()
+                self._write_object(copied[(indirect.idnum, indirect.generation)], copy(indirect.get_object()))
+            yield
+
+    def finish(self, outline=()):
+        """Write the page tree, outline, catalog and xref; outline is a list of (title, page index)"""
+        self._write_object(self._PAGES, DictionaryObject({
+            NameObject('/Type'): NameObject('/Pages'),
+            NameObject('/Kids'): ArrayObject(self.page_refs),
+            NameObject('/Count'): NumberObject(len(self.page_refs)),
+        }))
+
+        catalog = DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): self._ref(self._PAGES),
+        })
+        if outline:
+            root = self._reserve()
+            numbers = [self._reserve() for _ in outline]
+            for index, (title, page) in enumerate(outline):
+                item = DictionaryObject({
+                    NameObject('/Title'): create_string_object(title),
+                    NameObject('/Parent'): self._ref(root),
+                    NameObject('/Dest'): ArrayObject([self.page_refs[page], NameObject('/Fit')]),
+                })
+                if index > 0:
+                    item[NameObject('/Prev')] = self._ref(numbers[index - 1])
+                if index < len(numbers) - 1:
+                    item[NameObject('/Next')] = self._ref(numbers[index + 1])
+                self._write_object(numbers[index], item)
+            self._write_object(root, DictionaryObject({
+                NameObject('/Type'): NameObject('/Outlines'),
+                NameObject('/First'): self._ref(numbers[0]),
+                NameObject('/Last'): self._ref(numbers[-1]),
+                NameObject('/Count'): NumberObject(len(numbers)),
+            }))
+            catalog[NameObject('/Outlines')] = self._ref(root)
+            catalog[NameObject('/PageMode')] = NameObject('/UseOutlines')
+        self._write_object(self._CATALOG, catalog)
+
+        xref = self.position
+        self._buffer.write(f"xref\n0 {self._next_number}\n0000000000 65535 f \n".encode())
+        for number in range(1, self._next_number):
+            offset = self._offsets.get(number)
+            entry = f"{offset:010d} 00000 n \n" if offset is not None else "0000000000 65535 f \n"
+            self._buffer.write(entry.encode())
+        self._buffer.write(f"trailer\n<< /Size {self._next_number} /Root {self._CATALOG} 0 R >>\n"
+                           f"startxref\n{xref}\n%%EOF\n".encode())
+
+
+class CaseReportBuilder:
+    """
+    Compiles every evidence report in a case into one PDF with a table of contents.
+
+    Evidence reports are fetched (rendering them on first use) a few at a time
+    ahead of the output and written to a temporary directory rather than held
+    in memory. Each report's pages are streamed to the client as soon as it is
+    fetched; the table of contents is rendered last, once every page count is
+    known, and placed first in the page tree.
+    """
+
+    def __init__(self, parallelism=CASE_REPORT_PARALLELISM, chunk_bytes=REPORT_STREAM_CHUNK_BYTES):
+        self.parallelism = parallelism
+        self.chunk_bytes = chunk_bytes
+        self._executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix='case-report')
+
+    def _write_item_pdf(self, case_id, evidence, directory):
+        """Write one evidence report to disk; returns its path, or None if it could not be produced"""
+        path = os.path.join(directory, f"{evidence['id']}.pdf")
+        try:
+            # Only this language is needed; don't queue the other variants for every item
+            ref = report_service.get_pdf(evidence['id'], prerender_variants=False)
+            if ref is None:
+                # Evidence without a stored report is rendered from its own analysis,
+                # the only case that needs the full evidence document
+                document = firestore_manager.get_case_evidence_item(case_id, evidence['id']) or {}
+                pdf_bytes = report_renderer.render(
+                    document.get('analysis', ''),
+                    evidence['id'],
+                    language=evidence.get('language', 'en'),
+                    parsed_analysis=document.get('parsed_analysis')
+                )
+            with open(path, 'wb') as out:
+                if ref is not None:
+                    for chunk in stream_blob(ref['path'], 0, ref['size'] - 1):
+                        out.write(chunk)
+                else:
+                    out.write(pdf_bytes)
+            return path
+        except Exception as e:
+            logger.error(f"Case report item {evidence['id']} failed: {e}")
+            return None
+
+    def _fetch_items(self, case_id, evidence_items, directory):
+        """Yield (evidence, path) in order, fetching at most two rounds of items ahead of the caller"""
+        items = iter(evidence_items)
+        pending = deque()
+
+        def submit(evidence):
+            pending.append((evidence, self._executor.submit(self._write_item_pdf, case_id, evidence, directory)))
+
+        for evidence in islice(items, 2 * self.parallelism):
+            submit(evidence)
+        try:
+            while pending:
+                evidence, future = pending.popleft()
+                for next_evidence in islice(items, 1):
+                    submit(next_evidence)
+                yield evidence, future.result()
+        finally:
+            # A client that disconnects should not leave renders running for nothing
+            for _, future in pending:
+                future.cancel()
+
+    def _render_contents(self, case_id, entries, first_item_page):
+        """Table of contents listing each evidence item and the pages it starts on"""
+        styles = _create_styles('en')
+        rows = [['#', 'Evidence', 'Type', 'Page']]
+        for number, (evidence, start) in enumerate(entries, 1):
+            rows.append([
+                str(number),
+                Paragraph(evidence.get('filename') or evidence['id'], styles['normal']),
+                evidence.get('analysisType', ''),
+                str(first_item_page + start) if start is not None else 'unavailable'
+            ])
+
+        table = Table(rows, colWidths=[0.4*inch, 4.6*inch, 1.2*inch, 1*inch], repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2C5530')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ]))
+
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=0.5*inch, rightMargin=0.5*inch,
+                                topMargin=0.7*inch, bottomMargin=0.7*inch)
+        doc.build([
+            Paragraph(f"Case {case_id} - Compiled Evidence Report", styles['title']),
+            Paragraph(f"{len(entries)} evidence items", styles['report_id']),
+            Spacer(1, 0.2*inch),
+            table
+        ])
+        buffer.seek(0)
+        return buffer
+
+    def build(self, case_id):
+        """
+        Compile all evidence reports of a case into one PDF.
+
+        Returns a generator that fetches the evidence reports and writes the
+        merged PDF as it is read, or None if the case has no evidence. Only
+        the fields the contents need are read up front.
+        """
+        if PdfReader is None:
+            raise CaseReportUnavailableError("Compiled case reports require the 'pypdf' package")
+
+        evidence_items = list(firestore_manager.iter_case_evidence(case_id, fields=CASE_REPORT_FIELDS))
+        if not evidence_items:
+            return None
+        evidence_items.sort(key=lambda evidence: str(evidence.get('addedAt', '')))
+
+        return self._stream(case_id, evidence_items)
+
+    def _stream(self, case_id, evidence_items):
+        """Write every report page by page as it is fetched, then the contents, yielding output in chunks"""
+        with tempfile.TemporaryDirectory(prefix='case-report-') as directory:
+            writer = _PdfStreamWriter()
+            # Each entry records where its report starts, relative to the first report
+            entries = []
+            for evidence, path in self._fetch_items(case_id, evidence_items, directory):
+                reader = self._open(evidence, path)
+                if reader is None:
+                    entries.append((evidence, None))
+                    continue
+                entries.append((evidence, len(writer.page_refs)))
+                for _ in writer.copy_pages(reader):
+                    chunk = writer.drain(self.chunk_bytes)
+                    if chunk:
+                        yield chunk
+                os.remove(path)
+            item_pages = len(writer.page_refs)
+
+            # The contents may span several pages, which shifts every page number after it
+            contents_pages = 1
+            while True:
+                contents = PdfReader(self._render_contents(case_id, entries, contents_pages + 1))
+                if len(contents.pages) == contents_pages:
+                    break
+                contents_pages = len(contents.pages)
+            for _ in writer.copy_pages(contents, at=0):
+                pass
+
+            outline = [('Contents', 0)]
+            for number, (evidence, start) in enumerate(entries, 1):
+                if start is not None:
+                    outline.append((f"{number}. {evidence.get('filename') or evidence['id']}",
+                                    contents_pages + start))
+            writer.finish(outline)
+            yield writer.drain()
+
+        available = sum(1 for _, start in entries if start is not None)
+        logger.info(f"Compiled case report for {case_id}: {available}/{len(entries)} reports, "
+                    f"{item_pages} report pages, {writer.position} bytes")
+
+    @staticmethod
+    def _open(evidence, path):
+        """Reader for a fetched evidence report, or None if it is missing or unreadable"""
+        if path is None:
+            return None
+        try:
+            reader = PdfReader(path)
+            len(reader.pages)  # parses the page tree, so broken files are skipped here
+            return reader
+        except Exception as e:
+            logger.error(f"Case report item {evidence['id']} is not a readable PDF: {e}")
+            return None
+
+# Singleton instance
+case_report_builder = CaseReportBuilder()
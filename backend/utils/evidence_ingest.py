@@ -0,0 +1,146 @@
+# utils/evidence_ingest.py
+import hashlib
+import mimetypes
+import os
+import re
+import sys
+import uuid
+import logging
+
+from werkzeug.utils import secure_filename
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from config import UPLOAD_CHUNK_SIZE, MAX_UPLOAD_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Magic-byte signatures checked against the first chunk of the upload
+_MAGIC_SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'BM', 'image/bmp'),
+    (b'%PDF', 'application/pdf'),
+    (b'ID3', 'audio/mpeg'),
+    (b'fLaC', 'audio/flac'),
+    (b'OggS', 'audio/ogg'),
+    (b'\x1aE\xdf\xa3', 'video/x-matroska'),
+]
+
+_RIFF_TYPES = {
+    b'WAVE': 'audio/wav',
+    b'AVI ': 'video/x-msvideo',
+    b'WEBP': 'image/webp',
+}
+
+_FTYP_BRANDS = {
+    b'qt  ': 'video/quicktime',
+    b'M4A ': 'audio/mp4',
+}
+
+
+# Client extensions kept on the spool name; anything else comes from the sniffed type
+_SAFE_EXTENSION = re.compile(r'^\.[A-Za-z0-9]{1,10}$')
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES while streaming"""
+
+
+def sniff_mime_type(head, filename=''):
+    """Detect MIME type from leading bytes, falling back to the file extension"""
+    for signature, mime_type in _MAGIC_SIGNATURES:
+        if head.startswith(signature):
+            return mime_type
+
+    if head[:4] == b'RIFF' and head[8:12] in _RIFF_TYPES:
+        return _RIFF_TYPES[head[8:12]]
+
+    if head[4:8] == b'ftyp':
+        return _FTYP_BRANDS.get(head[8:12], 'video/mp4')
+
+    guessed, _ = mimetypes.guess_type(filename)
+    return guessed or 'application/octet-stream'
+
+
+def spool_filename(filename, mime_type):
+    """
+    Unique, sanitized spool name that always keeps a file extension.
+
+    secure_filename drops non-ASCII characters, so 'வீடியோ.mp4' would
+    otherwise become 'mp4' and lose the suffix mimetypes relies on.
+    """
+    stem, extension = os.path.splitext(filename or '')
+    if not _SAFE_EXTENSION.match(extension):
+        extension = mimetypes.guess_extension(mime_type) or ''
+    base = secure_filename(stem) or 'upload'
+    return f"{uuid.uuid4().hex}_{base}{extension.lower()}"
+
+
+class EvidenceIngestor:
+    def __init__(self, chunk_size=UPLOAD_CHUNK_SIZE, max_bytes=MAX_UPLOAD_BYTES):
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+
+    def ingest(self, file_storage, upload_folder):
+        """
+        Stream an uploaded file to the upload spool, computing SHA-256,
+        byte count and MIME type in the same pass.
+        
+        The spool file gets a unique, sanitized name (see spool_filename) so
+        queued uploads with the same client filename never share (or escape) a
+        path; the client name is only kept for display.
+        """
+        filename = file_storage.filename
+        partial_path = os.path.join(upload_folder, f"{uuid.uuid4().hex}.part")
+
+        sha256_hash = hashlib.sha256()
+        size_bytes = 0
+        head = b''
+
+        try:
+            with open(partial_path, 'wb') as out:
+                while True:
+                    chunk = file_storage.stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    if not head:
+                        head = chunk[:64]
+
+                    size_bytes += len(chunk)
+                    if size_bytes > self.max_bytes:
+                        raise UploadTooLargeError(
+                            f"File too large: more than {self.max_bytes} bytes"
+                        )
+
+                    sha256_hash.update(chunk)
+                    out.write(chunk)
+
+            mime_type = sniff_mime_type(head, filename)
+            file_path = os.path.join(upload_folder, spool_filename(filename, mime_type))
+            os.replace(partial_path, file_path)
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+        ingest_result = {
+            'file_path': file_path,
+            'filename': filename,
+            'sha256': sha256_hash.hexdigest(),
+            'size_bytes': size_bytes,
+            'mime_type': mime_type
+        }
+        logger.info(
+            f"Ingested {filename}: {size_bytes} bytes, {ingest_result['mime_type']}, "
+            f"sha256={ingest_result['sha256'][:12]}..."
+        )
+        return ingest_result
+
+# Singleton instance
+evidence_ingestor = EvidenceIngestor()
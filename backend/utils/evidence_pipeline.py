@@ -0,0 +1,194 @@
+# utils/evidence_pipeline.py
+import os
+import sys
+import logging
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from utils.ai_analyzer import analyze_evidence
+from config import INLINE_MEDIA_MAX_BYTES
+from utils.firebase_storage import save_to_storage, save_metadata, store_frame_images, get_storage_uri
+from utils.firestore_manager import firestore_manager
+from utils.pdf_generator import parse_report_analysis
+from utils.report_service import split_enhanced_data
+from utils.pipeline_executor import pipeline_executor
+
+logger = logging.getLogger(__name__)
+
+# Stage names reported by /api/jobs/<id>, in pipeline order
+STANDARD_STAGES = ['analysis', 'storage', 'firestore']
+ADVANCED_STAGES = ['analysis', 'storage', 'enhancement', 'firestore']
+
+
+def _discard_upload(job, file_path):
+    """Remove the spooled upload after a failed run, unless the queue will retry the job"""
+    if job.is_final_attempt and os.path.exists(file_path):
+        os.remove(file_path)
+
+
+def _analysis_options(payload):
+    """Keyword arguments shared by the analysis stages; display_name is the uploader's filename"""
+    return {
+        'file_hash': payload.get('fileHash'),
+        'mime_type': payload.get('mimeType'),
+        'language': payload.get('language', 'en'),
+        'bypass_cache': payload.get('bypass_cache', False),
+        'display_name': payload.get('filename')
+    }
+
+
+def _run_analysis_stages(job, file_path, analysis_stages):
+    """
+    Run the Storage upload together with the analysis stages.
+
+    analysis_stages maps a stage name to a callable taking the evidence
+    storage URI (or None). Files above INLINE_MEDIA_MAX_BYTES are uploaded
+    first so the model and annotation APIs read them from Cloud Storage
+    instead of loading the whole file into worker memory; smaller files go
+    inline with every stage running in parallel.
+    """
+    upload = {'storage': lambda: save_to_storage(file_path)}
+
+    if (job.payload.get('fileSize') or 0) > INLINE_MEDIA_MAX_BYTES:
+        storage_uri = get_storage_uri(file_path)
+        return pipeline_executor.fan_out_after(
+            upload,
+            lambda results: {name: (lambda build=build: build(storage_uri))
+                             for name, build in analysis_stages.items()},
+            job=job
+        )
+
+    stages = dict(upload)
+    stages.update({name: (lambda build=build: build(None)) for name, build in analysis_stages.items()})
+    return pipeline_executor.fan_out(stages, job=job)
+
+
+def run_standard_pipeline(job):
+    """Analyze, upload and persist a standard evidence upload; the PDF is rendered on first view"""
+    payload = job.payload
+    file_path = payload['file_path']
+    language = payload.get('language', 'en')
+    options = _analysis_options(payload)
+
+    try:
+        # 1-2. Analyze and upload to Storage
+        results, timings = _run_analysis_stages(job, file_path, {
+            'analysis': lambda uri: analyze_evidence(file_path, storage_uri=uri, **options)
+        })
+        analysis = results['analysis']
+        storage_url = results['storage']
+        if not analysis:
+            raise Exception("AI analysis returned empty.")
+
+        # 3. Save metadata to Firestore; GET /reports/<id> renders the PDF in the stored language
+        with job.stage('firestore'):
+            parsed_analysis = parse_report_analysis(analysis)
+            report_id = save_metadata(analysis, storage_url, payload['filename'],
+                                      file_hash=payload.get('fileHash'),
+                                      parsed_analysis=parsed_analysis.to_dict(),
+                                      language=language)
+    except Exception as e:
+        logger.error(f"Upload process error: {e}")
+        _discard_upload(job, file_path)
+        raise
+
+    return {
+        'message': 'Report generated successfully',
+        'report_id': report_id,
+        'pdf_url': f'/reports/{report_id}',
+        'analysis': analysis,
+        'stage_timings': timings
+    }
+
+
+def run_advanced_pipeline(job):
+    """Run the enhanced analysis flow and store the case, evidence and report"""
+    from utils.advanced_analyzer import advanced_analyzer
+
+    payload = job.payload
+    file_path = payload['file_path']
+    filename = payload['filename']
+    language = payload.get('language', 'en')
+    options = _analysis_options(payload)
+
+    try:
+        # Model analysis, Storage upload and Vision/Video annotation
+        results, timings = _run_analysis_stages(job, file_path, {
+            'analysis': lambda uri: analyze_evidence(file_path, storage_uri=uri, **options),
+            'enhancement': lambda uri: advanced_analyzer.annotate_media(file_path, storage_uri=uri, **options)
+        })
+        basic_analysis = results['analysis']
+        storage_url = results['storage']
+        enhanced_analysis_data = advanced_analyzer.combine_analysis(basic_analysis, results['enhancement'])
+
+        # Extract the actual analysis text
+        if isinstance(enhanced_analysis_data, dict) and 'basic_analysis' in enhanced_analysis_data:
+            analysis = enhanced_analysis_data['basic_analysis']
+            advanced_features = enhanced_analysis_data.get('advanced_features', {})
+        else:
+            analysis = enhanced_analysis_data
+            advanced_features = {}
+
+        # Parsed once here; stored with the analysis so re-renders skip re-parsing
+        parsed_analysis = parse_report_analysis(analysis, enhanced_analysis_data)
+
+        # Store the case, evidence, report and key frames in one atomic Firestore commit
+        with job.stage('firestore'):
+            case_data = {
+                'title': f"Case Analysis - {filename}",
+                'officerId': payload.get('officerId', 'default_officer'),
+                'description': payload.get('description', ''),
+                'evidenceType': payload.get('content_type'),
+                'language': language
+            }
+
+            evidence_data = {
+                'filename': filename,
+                'filePath': file_path,
+                'analysis': analysis,
+                'parsed_analysis': parsed_analysis.to_dict(),
+                'advanced_features': advanced_features,
+                'analysisType': 'advanced',
+                'fileType': payload.get('content_type'),
+                'storageUrl': storage_url,
+                'fileHash': payload.get('fileHash'),
+                'fileSize': payload.get('fileSize'),
+                'mimeType': payload.get('mimeType'),
+                'language': language
+            }
+
+            # Everything the PDF needs is stored with the report; it is rendered on first view
+            stored_enhanced_data, key_frames = split_enhanced_data(enhanced_analysis_data)
+            report_data = {
+                'filename': filename,
+                'analysis': analysis,
+                'parsed_analysis': parsed_analysis.to_dict(),
+                'advanced_features': advanced_features,
+                'enhanced_data': stored_enhanced_data,
+                'timestamp': firestore_manager.get_server_timestamp(),
+                'language': language
+            }
+
+            # Frame images go to Storage first; a failed commit leaves only deduplicated blobs behind
+            case_id, (evidence_id,) = firestore_manager.create_case_with_evidence(case_data, [{
+                'evidence': evidence_data,
+                'report': report_data,
+                'frames': store_frame_images(key_frames)
+            }])
+    except Exception as e:
+        logger.error(f"Advanced analysis error: {e}")
+        _discard_upload(job, file_path)
+        raise
+
+    return {
+        'message': 'Advanced analysis completed',
+        'case_id': case_id,
+        'evidence_id': evidence_id,
+        'analysis': analysis,
+        'advanced_features': advanced_features,
+        'pdf_url': f'/reports/{evidence_id}',
+        'stage_timings': timings
+    }
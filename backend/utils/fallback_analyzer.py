@@ -7,10 +7,10 @@ import logging
 logger = logging.getLogger(__name__)
 
 class FallbackAnalyzer:
-    def analyze_evidence(self, file_path):
+    def analyze_evidence(self, file_path, display_name=None):
         """Fallback analysis when Vertex AI is unavailable"""
         try:
-            filename = os.path.basename(file_path)
+            filename = display_name or os.path.basename(file_path)
             file_size = os.path.getsize(file_path)
             
             return f"""
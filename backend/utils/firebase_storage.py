@@ -1,50 +1,240 @@
-import firebase_admin
-from firebase_admin import credentials, storage, firestore
+from firebase_admin import firestore
+import base64
+import hashlib
 import os
+import queue
 import sys
+import threading
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import FIREBASE_CRED_PATH, FIREBASE_STORAGE_BUCKET
+from config import (
+    REPORT_STREAM_CHUNK_BYTES,
+    REPORT_DOC_CACHE_MAX_ENTRIES, REPORT_DOC_CACHE_MAX_BYTES, REPORT_DOC_CACHE_TTL
+)
+from utils.gcp_clients import gcp_clients
+from utils.memory_cache import LRUCache
 
-# Initialize Firebase
-print(f"Using FIREBASE_CRED_PATH: {FIREBASE_CRED_PATH}")
-cred = credentials.Certificate(FIREBASE_CRED_PATH)
-firebase_admin.initialize_app(cred, {
-    'storageBucket': FIREBASE_STORAGE_BUCKET
-})
-db = firestore.client()
-bucket = storage.bucket()
+def _document_size(value):
+    """Approximate in-memory size of a Firestore document, counting strings and bytes"""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(key) + _document_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_document_size(item) for item in value)
+    return 8
+
+# Report documents by (report ID, projected fields); see get_report
+_report_cache = LRUCache(
+    max_entries=REPORT_DOC_CACHE_MAX_ENTRIES,
+    max_bytes=REPORT_DOC_CACHE_MAX_BYTES,
+    ttl=REPORT_DOC_CACHE_TTL,
+    sizeof=_document_size
+)
+# Projections requested so far, so a report's cached entries can all be invalidated
+_report_projections = set()
+_report_projections_lock = threading.Lock()
+
+def _evidence_blob_name(file_path):
+    return f"evidence/{os.path.basename(file_path)}"
+
+def get_storage_uri(file_path):
+    """
+    Returns the gs:// URI of an uploaded evidence file, for APIs that read from Cloud Storage.
+    """
+    return f"gs://{gcp_clients.bucket().name}/{_evidence_blob_name(file_path)}"
 
 def save_to_storage(file_path):
     """
     Uploads the file to Firebase Storage and returns the public URL.
     """
-    blob_name = f"evidence/{os.path.basename(file_path)}"
-    blob = bucket.blob(blob_name)
+    blob_name = _evidence_blob_name(file_path)
+    blob = gcp_clients.bucket().blob(blob_name)
     blob.upload_from_filename(file_path)
     blob.make_public()  # Make the file publicly accessible
     return blob.public_url
 
-def save_metadata(analysis, storage_url, filename, pdf_bytes):
+def save_metadata(analysis, storage_url, filename, file_hash=None, parsed_analysis=None, language='en'):
     """
-    Saves report metadata including PDF bytes to Firestore and returns the document ID.
+    Saves report metadata to Firestore and returns the document ID.
+    The PDF is rendered on demand when the report is first opened.
     """
-    doc_ref = db.collection('reports').document()
+    doc_ref = gcp_clients.firestore().collection('reports').document()
     doc_ref.set({
         'filename': filename,
         'evidence_url': storage_url,
         'analysis': analysis,
-        'pdf_bytes': pdf_bytes,  # Store PDF as bytes in Firestore
+        'parsed_analysis': parsed_analysis,  # Structured parse reused by later re-renders
+        'language': language,
+        'fileHash': file_hash,  # SHA-256 computed while streaming the upload
         'timestamp': firestore.SERVER_TIMESTAMP
     })
     return doc_ref.id
 
-def get_pdf_from_firestore(report_id):
+def save_content_blob(data, prefix, extension, content_type):
+    """
+    Uploads bytes under a name derived from their SHA-256 and returns a reference to them.
+    Identical content is stored once; an existing blob is not uploaded again.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = f"{prefix}/{digest}.{extension}"
+    blob = gcp_clients.bucket().blob(path)
+    if not blob.exists():
+        blob.upload_from_string(data, content_type=content_type)
+    return {'path': path, 'sha256': digest, 'size': len(data), 'content_type': content_type}
+
+class _StreamAbandoned(Exception):
+    """Raised inside a download whose reader has stopped reading"""
+
+class _DownloadPipe:
+    """
+    File-like sink for Blob.download_to_file that hands the bytes to a reader
+    thread in chunk_size pieces. The queue is bounded, so a slow client slows
+    the download down instead of buffering the blob in memory.
+    """
+    _DONE = object()
+
+    def __init__(self, chunk_size, depth=4):
+        self.chunk_size = chunk_size
+        self.abandoned = threading.Event()
+        self._queue = queue.Queue(maxsize=depth)
+        self._buffer = bytearray()
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self.chunk_size:
+            self._put(bytes(self._buffer[:self.chunk_size]))
+            del self._buffer[:self.chunk_size]
+        return len(data)
+
+    def _put(self, item):
+        while not self.abandoned.is_set():
+            try:
+                self._queue.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+        raise _StreamAbandoned()
+
+    def run(self, download):
+        """Run download(self) to completion, then signal the end (or the error) to the reader"""
+        try:
+            try:
+                download(self)
+                if self._buffer:
+                    self._put(bytes(self._buffer))
+                self._put(self._DONE)
+            except _StreamAbandoned:
+                raise
+            except Exception as e:
+                self._put(e)
+        except _StreamAbandoned:
+            pass
+
+    def chunks(self):
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+def stream_blob(path, start=0, end=None, chunk_size=REPORT_STREAM_CHUNK_BYTES):
+    """
+    Yields bytes start..end (inclusive) of a stored blob in chunk_size pieces.
+    The range is fetched with one download request, streamed through a
+    helper thread; closing the generator cancels the download.
+    """
+    blob = gcp_clients.bucket().blob(path)
+    pipe = _DownloadPipe(chunk_size)
+    threading.Thread(
+        target=pipe.run,
+        args=(lambda sink: blob.download_to_file(sink, start=start, end=end),),
+        name='blob-stream',
+        daemon=True
+    ).start()
+    try:
+        yield from pipe.chunks()
+    finally:
+        pipe.abandoned.set()
+
+def save_report_pdf(report_id, pdf_key, pdf_bytes):
+    """
+    Uploads a rendered PDF and records its reference on the report under pdf_refs.<pdf_key>.
+    Any PDF bytes stored inline by older versions are removed from the document.
+    """
+    ref = save_content_blob(pdf_bytes, 'reports/pdf', 'pdf', 'application/pdf')
+    gcp_clients.firestore().collection('reports').document(report_id).update({
+        f'pdf_refs.{pdf_key}': ref,
+        'pdf_bytes': firestore.DELETE_FIELD
+    })
+    invalidate_report(report_id)
+    return ref
+
+def store_frame_images(frames):
+    """
+    Uploads key frame images to Storage and returns the frame documents to store, with image references.
+    """
+    frame_docs = []
+    for frame in frames or []:
+        frame = dict(frame)
+        # Raw JPEG bytes, or base64 text from older analyses
+        image = frame.pop('image_bytes', None) or base64.b64decode(frame.pop('image_data', '') or '')
+        if image:
+            frame['image_ref'] = save_content_blob(image, 'reports/frames', 'jpg', 'image/jpeg')
+        frame_docs.append(frame)
+    return frame_docs
+
+def get_report(report_id, fields=None, cached=True):
+    """
+    Retrieves the report document for the given report ID, or None.
+    Pass fields to read only those fields instead of the whole document.
+    Results are cached per projection for REPORT_DOC_CACHE_TTL seconds;
+    pass cached=False for a read that bypasses and does not fill the cache.
+    """
+    projection = tuple(sorted(fields)) if fields else None
+    key = (report_id, projection)
+    if cached:
+        report = _report_cache.get(key)
+        if report is not None:
+            return dict(report)
+
+    doc = gcp_clients.firestore().collection('reports').document(report_id).get(field_paths=fields)
+    if not doc.exists:
+        return None
+    report = doc.to_dict()
+    if cached:
+        with _report_projections_lock:
+            _report_projections.add(projection)
+        _report_cache.put(key, report)
+        report = dict(report)
+    return report
+
+def invalidate_report(report_id):
+    """
+    Drops every cached projection of a report after it is written.
+    """
+    with _report_projections_lock:
+        projections = list(_report_projections)
+    for projection in projections:
+        _report_cache.pop((report_id, projection))
+
+def report_cache_stats():
+    """
+    Report document cache counters for the metrics endpoint.
+    """
+    return _report_cache.stats()
+
+def get_report_frames(report_id):
     """
-    Retrieves the PDF bytes from Firestore for the given report ID.
+    Retrieves a report's key frames in their original order, with image bytes loaded from Storage.
     """
-    doc_ref = db.collection('reports').document(report_id)
-    doc = doc_ref.get()
-    if doc.exists:
-        data = doc.to_dict()
-        return data.get('pdf_bytes')
-    return None
+    frames_ref = gcp_clients.firestore().collection('reports').document(report_id).collection('frames')
+    frames = []
+    for doc in frames_ref.order_by('index').stream():
+        frame = doc.to_dict()
+        image_ref = frame.get('image_ref')
+        if image_ref:
+            frame['image_bytes'] = gcp_clients.bucket().blob(image_ref['path']).download_as_bytes()
+        frames.append(frame)
+    return frames
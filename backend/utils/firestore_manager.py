@@ -1,50 +1,122 @@
 # utils/firestore_manager.py
-import firebase_admin
 from firebase_admin import firestore
 from google.cloud.firestore_v1 import ArrayUnion
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+import atexit
 import hashlib
+import logging
 import os
+import random
 import sys
+import threading
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import FIREBASE_CRED_PATH
+from config import CASE_COUNTER_SHARDS, CASE_ROLLUP_INTERVAL
+from utils.gcp_clients import gcp_clients
+
+logger = logging.getLogger(__name__)
+
+# Firestore rejects batches with more writes than this
+BATCH_MAX_WRITES = 500
+
+# Fields returned by list views; full documents also hold analysis text and feature blobs
+CASE_LIST_FIELDS = ['title', 'description', 'officerId', 'status', 'evidenceCount', 'evidenceType',
+                    'language', 'createdAt', 'updatedAt']
+EVIDENCE_LIST_FIELDS = ['evidenceId', 'filename', 'fileType', 'mimeType', 'fileSize', 'fileHash',
+                        'analysisType', 'analysisStatus', 'language', 'storageUrl', 'addedAt']
+
+# Counter document holding a case's count at creation (or its pre-sharding count)
+_COUNTER_BASE = 'base'
+# Set on a counter shard with every increment and cleared by the roll-up that includes it
+_ROLLUP_PENDING = 'rollupPending'
+# Attempts to write a roll-up before the case is left for the next pass
+_ROLLUP_ATTEMPTS = 5
+
+
+def _sum_counters(counters):
+    """Total each numeric field across counter documents"""
+    totals = {}
+    for counter in counters:
+        for name, value in counter.to_dict().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                totals[name] = totals.get(name, 0) + value
+    return totals
 
-# Initialize Firestore
-cred = firebase_admin.credentials.Certificate(FIREBASE_CRED_PATH)
-if not firebase_admin._apps:
-    firebase_admin.initialize_app(cred)
-db = firestore.client()
 
 class FirestoreManager:
-    def __init__(self):
-        self.db = db
+    """
+    Case, evidence and report documents.
+    
+    Per-case aggregates such as evidenceCount are distributed counters:
+    writers increment one of CASE_COUNTER_SHARDS random documents under
+    cases/<id>/counters instead of the case itself, so concurrent uploads to
+    one case do not contend on a single document. The case document keeps
+    the rolled-up totals and updatedAt, written by a background thread at
+    most once per CASE_ROLLUP_INTERVAL per busy case; get_case_counters sums
+    the shards for a current value in between.
+    
+    Each increment also flags its shard rollupPending, so increments whose
+    roll-up was lost with the process are found and rolled up at the next
+    start (recover_pending_rollups). That query needs a collection-group
+    index on counters.rollupPending.
+    """
+    
+    def __init__(self, counter_shards=CASE_COUNTER_SHARDS, rollup_interval=CASE_ROLLUP_INTERVAL):
+        self.counter_shards = counter_shards
+        self.rollup_interval = rollup_interval
+        self._dirty_cases = set()
+        self._rollup_lock = threading.Lock()
+        self._rollup_wakeup = threading.Event()
+        self._rollup_thread = None
+        self.rollups = 0
+        self.rollup_failures = 0
+    
+    @property
+    def db(self):
+        """Firestore client from the shared registry, created on first use"""
+        return gcp_clients.firestore()
     
     def get_server_timestamp(self):
         """Get server timestamp for Firestore"""
         return firestore.SERVER_TIMESTAMP
     
-    def create_case_document(self, case_data):
-        """Create a new case document"""
-        case_ref = self.db.collection('cases').document()
-        
+    def _case_fields(self, case_data, evidence_count=0):
+        # evidenceCount here is the rolled-up total; the counters' base document holds the same start value
         case_data.update({
             'createdAt': self.get_server_timestamp(),
             'updatedAt': self.get_server_timestamp(),
             'status': 'active',
-            'evidenceCount': 0
+            'evidenceCount': evidence_count
         })
-        
-        case_ref.set(case_data)
+        return case_data
+    
+    def create_case_document(self, case_data):
+        """Create a new case document"""
+        case_ref = self.db.collection('cases').document()
+        batch = self.db.batch()
+        batch.set(case_ref, self._case_fields(case_data))
+        batch.set(case_ref.collection('counters').document(_COUNTER_BASE), {'evidenceCount': 0})
+        batch.commit()
         return case_ref.id
     
-    def add_evidence_to_case(self, case_id, evidence_data):
-        """Add evidence analysis to a case"""
-        case_ref = self.db.collection('cases').document(case_id)
-        evidence_ref = case_ref.collection('evidence').document()
+    @staticmethod
+    def _item_writes(item):
+        """Writes one evidence item needs: the evidence, its report and one per key frame"""
+        if item.get('report') is None:
+            return 1
+        return 2 + len(item.get('frames') or [])
+    
+    def _add_evidence_writes(self, batch, case_ref, case_id, item):
+        """
+        Queue one evidence item on a batch: the evidence document and, if given,
+        its report document and the report's key-frame documents. Returns the evidence ID.
+        """
+        evidence_data = item['evidence']
+        evidence_ref = case_ref.collection('evidence').document()  # ID allocated client-side
         
-        # Generate hash for chain of custody
-        file_hash = self._generate_file_hash(evidence_data.get('file_path', ''))
+        # Use the digest computed at ingest; only re-hash from disk if it is missing
+        file_hash = evidence_data.get('fileHash') or self._generate_file_hash(evidence_data.get('filePath', ''))
         
         evidence_data.update({
             'evidenceId': evidence_ref.id,
@@ -52,17 +124,206 @@ class FirestoreManager:
             'fileHash': file_hash,
             'analysisStatus': 'completed'
         })
+        batch.set(evidence_ref, evidence_data)
         
-        evidence_ref.set(evidence_data)
-        
-        # Update case timestamp and evidence count
-        case_ref.update({
-            'updatedAt': self.get_server_timestamp(),
-            'evidenceCount': firestore.Increment(1)
-        })
+        report_data = item.get('report')
+        if report_data is not None:
+            # Reports share the evidence ID, so /reports/<evidence_id> finds them
+            report_ref = self.db.collection('reports').document(evidence_ref.id)
+            report_data.update({
+                'case_id': case_id,
+                'evidence_id': evidence_ref.id,
+                'evidence_url': f'/reports/{evidence_ref.id}'
+            })
+            batch.set(report_ref, report_data)
+            
+            for index, frame in enumerate(item.get('frames') or []):
+                batch.set(report_ref.collection('frames').document(f"{index:03d}"), dict(frame, index=index))
         
         return evidence_ref.id
     
+    def create_case_with_evidence(self, case_data, evidence_items):
+        """
+        Create a case with its evidence, reports and key frames in one atomic batch.
+        
+        Each item is a dict with 'evidence' data and optionally 'report' data and
+        'frames' (key-frame documents). Returns (case_id, evidence_ids); nothing is
+        written if the commit fails.
+        """
+        writes = 2 + sum(self._item_writes(item) for item in evidence_items)
+        if writes > BATCH_MAX_WRITES:
+            raise ValueError(f"Case with {writes} writes exceeds the {BATCH_MAX_WRITES}-write batch limit; "
+                             f"create it with fewer items and use add_evidence_bulk for the rest")
+        
+        case_ref = self.db.collection('cases').document()  # ID allocated client-side
+        batch = self.db.batch()
+        batch.set(case_ref, self._case_fields(case_data, evidence_count=len(evidence_items)))
+        batch.set(case_ref.collection('counters').document(_COUNTER_BASE), {'evidenceCount': len(evidence_items)})
+        evidence_ids = [self._add_evidence_writes(batch, case_ref, case_ref.id, item) for item in evidence_items]
+        batch.commit()
+        return case_ref.id, evidence_ids
+    
+    def add_evidence_bulk(self, case_id, evidence_items):
+        """
+        Add many evidence items (with optional reports and frames) to an existing case.
+        
+        Items are committed in as few batches as the 500-write limit allows, each
+        batch also incrementing one counter shard; every batch is atomic. The
+        case's evidenceCount and updatedAt follow at the next roll-up.
+        Returns the evidence IDs in item order.
+        """
+        case_ref = self.db.collection('cases').document(case_id)
+        evidence_ids = []
+        batch = self.db.batch()
+        writes = 0
+        items_in_batch = 0
+        
+        for item in evidence_items:
+            # An item is never split across batches; one write is kept for the counter shard
+            item_writes = self._item_writes(item)
+            if items_in_batch and writes + item_writes + 1 > BATCH_MAX_WRITES:
+                self._commit_evidence_batch(batch, case_ref, items_in_batch)
+                batch = self.db.batch()
+                writes = 0
+                items_in_batch = 0
+            
+            evidence_ids.append(self._add_evidence_writes(batch, case_ref, case_id, item))
+            writes += item_writes
+            items_in_batch += 1
+        
+        if items_in_batch:
+            self._commit_evidence_batch(batch, case_ref, items_in_batch)
+        return evidence_ids
+    
+    def _commit_evidence_batch(self, batch, case_ref, count):
+        # Count the evidence in the same commit
+        self._increment_counters(batch, case_ref, {'evidenceCount': count})
+        batch.commit()
+        self._schedule_rollup(case_ref.id)
+    
+    def _increment_counters(self, batch, case_ref, increments):
+        """Queue increments of per-case aggregates on one randomly chosen counter shard"""
+        shard_ref = case_ref.collection('counters').document(str(random.randrange(self.counter_shards)))
+        update = {name: firestore.Increment(value) for name, value in increments.items()}
+        update[_ROLLUP_PENDING] = True
+        batch.set(shard_ref, update, merge=True)
+    
+    def _schedule_rollup(self, case_id):
+        """Mark a case for the next roll-up, starting the roll-up thread on first use"""
+        with self._rollup_lock:
+            self._dirty_cases.add(case_id)
+            if self._rollup_thread is None or not self._rollup_thread.is_alive():
+                self._rollup_thread = threading.Thread(target=self._rollup_loop, name='case-rollup', daemon=True)
+                self._rollup_thread.start()
+    
+    def _rollup_loop(self):
+        while not self._rollup_wakeup.wait(self.rollup_interval):
+            self.flush_rollups()
+    
+    def _counters(self, case_ref, case_doc=None):
+        """
+        Counter documents of a case, plus its totals. Cases created before
+        sharding have no base document; their count is read from the case
+        (case_doc, if the caller already read it).
+        """
+        counters = list(case_ref.collection('counters').stream())
+        totals = _sum_counters(counters)
+        if any(counter.id == _COUNTER_BASE for counter in counters):
+            return counters, totals, None
+        
+        if case_doc is None:
+            case_doc = case_ref.get(field_paths=['evidenceCount'])
+        if not case_doc.exists:
+            return counters, None, None
+        base = {'evidenceCount': case_doc.get('evidenceCount') or 0}
+        for name, value in base.items():
+            totals[name] = totals.get(name, 0) + value
+        return counters, totals, base
+    
+    def get_case_counters(self, case_id):
+        """Current per-case aggregates summed from the counter shards; None if the case does not exist"""
+        _, totals, _ = self._counters(self.db.collection('cases').document(case_id))
+        return totals
+    
+    def _roll_up_case(self, case_id):
+        """
+        Sum a case's counter shards onto the case document and touch updatedAt.
+        
+        Shards are read outside a transaction, so a roll-up never contends with
+        the uploads incrementing them. The case is read before the shards and
+        only written if it has not changed since: a roll-up by another process
+        in between may hold newer totals, so this one re-reads and retries
+        rather than overwrite them. A shard's pending flag is only cleared if
+        it has not changed since it was read; one incremented in between stays
+        flagged and the case is rolled up again.
+        """
+        case_ref = self.db.collection('cases').document(case_id)
+        for _ in range(_ROLLUP_ATTEMPTS):
+            case_doc = case_ref.get(field_paths=['evidenceCount'])
+            counters, totals, base = self._counters(case_ref, case_doc)
+            if totals is None:
+                return None
+            try:
+                if base is not None:
+                    case_ref.collection('counters').document(_COUNTER_BASE).create(base)
+                case_ref.update(dict(totals, updatedAt=firestore.SERVER_TIMESTAMP),
+                                option=self.db.write_option(last_update_time=case_doc.update_time))
+                break
+            except (AlreadyExists, FailedPrecondition):
+                # Another roll-up made the base or wrote the case after it was read
+                continue
+            except NotFound:
+                return None
+        else:
+            raise RuntimeError(f"Case {case_id} changed during {_ROLLUP_ATTEMPTS} roll-up attempts")
+        
+        for counter in counters:
+            if not counter.to_dict().get(_ROLLUP_PENDING):
+                continue
+            try:
+                counter.reference.update({_ROLLUP_PENDING: False},
+                                         option=self.db.write_option(last_update_time=counter.update_time))
+            except FailedPrecondition:
+                with self._rollup_lock:
+                    self._dirty_cases.add(case_id)
+        return totals
+    
+    def flush_rollups(self):
+        """Write rolled-up aggregates and updatedAt for every case changed since the last roll-up"""
+        with self._rollup_lock:
+            case_ids, self._dirty_cases = self._dirty_cases, set()
+        
+        for case_id in case_ids:
+            try:
+                self._roll_up_case(case_id)
+                with self._rollup_lock:
+                    self.rollups += 1
+            except Exception as e:
+                # Retried on the next pass; the shards already hold the increments
+                logger.error(f"Case roll-up failed for {case_id}: {e}")
+                with self._rollup_lock:
+                    self.rollup_failures += 1
+                    self._dirty_cases.add(case_id)
+    
+    def recover_pending_rollups(self):
+        """Schedule roll-ups for cases with increments no roll-up has included, e.g. after a crash"""
+        pending = self.db.collection_group('counters').where(_ROLLUP_PENDING, '==', True).select([])
+        case_ids = {counter.reference.parent.parent.id for counter in pending.stream()}
+        for case_id in case_ids:
+            self._schedule_rollup(case_id)
+        if case_ids:
+            logger.info(f"Scheduled roll-ups for {len(case_ids)} cases with pending counter increments")
+        return len(case_ids)
+    
+    def shutdown(self):
+        """Stop the roll-up thread and write any pending roll-ups"""
+        self._rollup_wakeup.set()
+        self.flush_rollups()
+    
+    def add_evidence_to_case(self, case_id, evidence_data):
+        """Add evidence analysis to a case"""
+        return self.add_evidence_bulk(case_id, [{'evidence': evidence_data}])[0]
+    
     def store_analysis_embeddings(self, case_id, evidence_id, analysis_text):
         """Store analysis embeddings for semantic search"""
         embeddings_ref = self.db.collection('cases').document(case_id)\
@@ -90,21 +351,44 @@ class FirestoreManager:
         
         return sha256_hash.hexdigest()
     
+    def _iter_documents(self, query, collection_ref, fields=None, page_size=None, start_after=None):
+        """
+        Stream a query in document-ID order, optionally projected to `fields`,
+        limited to `page_size` and resuming after the document ID `start_after`.
+        """
+        query = query.order_by('__name__')
+        if fields:
+            query = query.select(fields)
+        if start_after:
+            query = query.start_after({'__name__': collection_ref.document(start_after)})
+        if page_size:
+            query = query.limit(page_size)
+        
+        for doc in query.stream():
+            data = doc.to_dict()
+            data['id'] = doc.id
+            yield data
+    
+    def iter_case_evidence(self, case_id, fields=None, page_size=None, start_after=None):
+        """Stream evidence for a case, one document at a time"""
+        evidence_ref = self.db.collection('cases').document(case_id).collection('evidence')
+        return self._iter_documents(evidence_ref, evidence_ref, fields, page_size, start_after)
+    
     def get_case_evidence(self, case_id):
         """Get all evidence for a case"""
-        evidence_ref = self.db.collection('cases').document(case_id).collection('evidence')
-        docs = evidence_ref.stream()
-        
-        evidence_list = []
-        for doc in docs:
-            evidence_data = doc.to_dict()
-            evidence_data['id'] = doc.id
-            evidence_list.append(evidence_data)
-        
-        return evidence_list
+        return list(self.iter_case_evidence(case_id))
     
-    def search_cases_by_metadata(self, filters):
-        """Search cases by metadata filters"""
+    def get_case_evidence_item(self, case_id, evidence_id):
+        """Get one evidence document of a case, or None if it does not exist"""
+        doc = self.db.collection('cases').document(case_id).collection('evidence').document(evidence_id).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        data['id'] = doc.id
+        return data
+    
+    def iter_cases(self, filters, fields=None, page_size=None, start_after=None):
+        """Stream cases matching metadata filters, one document at a time"""
         cases_ref = self.db.collection('cases')
         
         # Build query based on filters
@@ -114,14 +398,12 @@ class FirestoreManager:
         if 'officerId' in filters:
             query = query.where('officerId', '==', filters['officerId'])
         
-        docs = query.stream()
-        cases = []
-        for doc in docs:
-            case_data = doc.to_dict()
-            case_data['id'] = doc.id
-            cases.append(case_data)
-        
-        return cases
+        return self._iter_documents(query, cases_ref, fields, page_size, start_after)
+    
+    def search_cases_by_metadata(self, filters):
+        """Search cases by metadata filters"""
+        return list(self.iter_cases(filters))
 
 # Singleton instance
-firestore_manager = FirestoreManager()
\ No newline at end of file
+firestore_manager = FirestoreManager()
+atexit.register(firestore_manager.shutdown)
\ No newline at end of file
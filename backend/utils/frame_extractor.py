@@ -0,0 +1,160 @@
+# utils/frame_extractor.py
+import os
+import sys
+import logging
+from bisect import bisect_right
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from config import KEY_FRAME_MAX_WIDTH, KEY_FRAME_MAX_HEIGHT, KEY_FRAME_JPEG_QUALITY, KEY_FRAME_SEEK_GAP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# OpenCV's FFmpeg backend seeks to the keyframe before (target - this many frames), then decodes forward
+_SEEK_PREROLL_FRAMES = 16
+# Fixed cost of one seek (demuxer reposition, decoder flush), in frames decoded forward
+_SEEK_COST_FRAMES = 16
+
+
+def _format_timestamp(seconds):
+    return f"{int(seconds/60):02d}:{int(seconds%60):02d}"
+
+
+class FrameExtractor:
+    """
+    Extracts key frames in one forward pass and returns them as JPEG bytes
+    already downscaled to the size the PDF report prints them at.
+
+    Between two targets the extractor either decodes forward or seeks. A seek
+    re-decodes from the keyframe before the target, so it only pays off when
+    that keyframe lies ahead of the current position and close enough to the
+    target. Keyframe positions are read from the packets without decoding
+    (a few ms per clip); when the backend cannot report them, gaps longer
+    than seek_gap_seconds are seeked and shorter ones decoded forward.
+    """
+
+    def __init__(self, max_width=KEY_FRAME_MAX_WIDTH, max_height=KEY_FRAME_MAX_HEIGHT,
+                 jpeg_quality=KEY_FRAME_JPEG_QUALITY, seek_gap_seconds=KEY_FRAME_SEEK_GAP_SECONDS):
+        self.max_width = max_width
+        self.max_height = max_height
+        self.jpeg_quality = jpeg_quality
+        self.seek_gap_seconds = seek_gap_seconds
+
+    def _encode(self, cv2, frame):
+        """Downscale to the printed size and encode as JPEG"""
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.max_width / width, self.max_height / height)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return None, frame.shape[:2]
+        return buffer.tobytes(), frame.shape[:2]
+
+    @staticmethod
+    def _keyframes(cv2, video_path, last_frame):
+        """Sorted keyframe numbers up to last_frame, from packet flags without decoding; None if unavailable"""
+        has_key_frame = getattr(cv2, 'CAP_PROP_LRF_HAS_KEY_FRAME', None)
+        if has_key_frame is None:
+            return None
+        cap = None
+        try:
+            cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+            if not cap.isOpened():
+                return None
+            keyframes = []
+            frame_number = 0
+            while frame_number <= last_frame and cap.grab():
+                if cap.get(has_key_frame):
+                    keyframes.append(frame_number)
+                frame_number += 1
+            return keyframes or None
+        except Exception as e:
+            logger.debug(f"Keyframe scan unavailable for {video_path}: {e}")
+            return None
+        finally:
+            if cap is not None:
+                cap.release()
+
+    def _should_seek(self, keyframes, position, frame_number, seek_gap_frames):
+        """Whether seeking to frame_number decodes fewer frames than decoding forward from position"""
+        gap = frame_number - position
+        if keyframes is None:
+            return gap > seek_gap_frames
+        index = bisect_right(keyframes, frame_number - _SEEK_PREROLL_FRAMES) - 1
+        seek_from = keyframes[index] if index >= 0 else 0
+        return seek_from > position and frame_number - seek_from + _SEEK_COST_FRAMES < gap
+
+    def extract(self, video_path, timestamps=None, max_frames=8):
+        """Extract frames at the given timestamps, or evenly across the whole video"""
+        try:
+            import cv2
+        except ImportError:
+            logger.warning("OpenCV not available for frame extraction")
+            return []
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            logger.error(f"Cannot open video file: {video_path}")
+            return []
+
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30  # Default assumption
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+            if timestamps:
+                targets = {}
+                for timestamp in timestamps:
+                    targets.setdefault(int(timestamp * fps), timestamp)
+                targets = sorted(targets.items())
+            else:
+                interval = max(1, total_frames // max_frames)
+                targets = [(i, i / fps) for i in range(0, total_frames, interval)][:max_frames]
+
+            seek_gap_frames = int(self.seek_gap_seconds * fps)
+            keyframes = self._keyframes(cv2, video_path, targets[-1][0]) if targets else None
+            position = 0
+            frames = []
+
+            for frame_number, timestamp in targets:
+                if frame_number > position:
+                    if self._should_seek(keyframes, position, frame_number, seek_gap_frames):
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+                        position = frame_number
+                    else:
+                        while position < frame_number and cap.grab():
+                            position += 1
+                if position != frame_number:
+                    break
+
+                ret, frame = cap.read()
+                position += 1
+                if not ret:
+                    break
+
+                image_bytes, (height, width) = self._encode(cv2, frame)
+                if image_bytes is None:
+                    continue
+
+                frames.append({
+                    'frame_number': frame_number,
+                    'timestamp': timestamp,
+                    'timestamp_formatted': _format_timestamp(timestamp),
+                    'image_bytes': image_bytes,
+                    'width': width,
+                    'height': height
+                })
+
+            logger.info(f"Extracted {len(frames)} key frames from video")
+            return frames
+        except Exception as e:
+            logger.error(f"Frame extraction error: {e}")
+            return []
+        finally:
+            cap.release()
+
+# Singleton instance
+frame_extractor = FrameExtractor()
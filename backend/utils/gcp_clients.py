@@ -0,0 +1,131 @@
+# utils/gcp_clients.py
+import os
+import sys
+import threading
+import time
+import logging
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from config import (FIREBASE_CRED_PATH, FIREBASE_STORAGE_BUCKET, VERTEX_AI_PROJECT_ID, VERTEX_AI_LOCATION,
+                    GCP_CLIENT_RETRY_SECONDS)
+
+logger = logging.getLogger(__name__)
+
+
+class GCPClientRegistry:
+    """
+    Process-wide Firebase and Google Cloud clients, created on first use.
+
+    Importing a module no longer opens credentials or gRPC channels; each
+    client is built once when something first needs it and shared by every
+    module in the process. gRPC channels cannot cross fork(), so a forked
+    child (e.g. a gunicorn worker forked from a preloaded master) drops the
+    parent's clients and builds its own. A client that fails to build
+    raises the same error to every caller for retry_seconds, so an outage
+    is not hammered with rebuilds, and is then built again.
+    """
+
+    def __init__(self, retry_seconds=GCP_CLIENT_RETRY_SECONDS):
+        self.retry_seconds = retry_seconds
+        self._reset()
+
+    def _reset(self):
+        self._clients = {}
+        self._failures = {}
+        # Reentrant: factories build the clients they depend on (Firestore needs the app)
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+
+    def get(self, name, factory):
+        """Return the client registered under name, building it with factory() on first use"""
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(name)
+            if client is not None:
+                return client
+            failure = self._failures.get(name)
+            if failure is not None and time.monotonic() < failure[1]:
+                raise failure[0]
+            try:
+                client = factory()
+            except Exception as e:
+                self._failures[name] = (e, time.monotonic() + self.retry_seconds)
+                raise
+            self._failures.pop(name, None)
+            self._clients[name] = client
+            logger.info(f"Initialized {name} client in process {self._pid}")
+            return client
+
+    def firebase_app(self):
+        """Firebase app for this process; named by PID so a forked child never reuses the parent's"""
+        def create():
+            import firebase_admin
+            from firebase_admin import credentials
+            app_name = f"evidence-{self._pid}"
+            try:
+                return firebase_admin.get_app(app_name)
+            except ValueError:
+                logger.info(f"Using FIREBASE_CRED_PATH: {FIREBASE_CRED_PATH}")
+                return firebase_admin.initialize_app(
+                    credentials.Certificate(FIREBASE_CRED_PATH),
+                    {'storageBucket': FIREBASE_STORAGE_BUCKET},
+                    name=app_name
+                )
+        return self.get('firebase_app', create)
+
+    def firestore(self):
+        """Firestore client shared by the report and case modules"""
+        def create():
+            from firebase_admin import firestore
+            return firestore.client(app=self.firebase_app())
+        return self.get('firestore', create)
+
+    def bucket(self):
+        """Default Firebase Storage bucket"""
+        def create():
+            from firebase_admin import storage
+            return storage.bucket(app=self.firebase_app())
+        return self.get('bucket', create)
+
+    def vertexai(self):
+        """Initialize the Vertex AI SDK for this process; returns the module"""
+        def create():
+            import vertexai
+            vertexai.init(project=VERTEX_AI_PROJECT_ID, location=VERTEX_AI_LOCATION)
+            return vertexai
+        return self.get('vertexai', create)
+
+    def video_intelligence(self):
+        def create():
+            from google.cloud import videointelligence_v1
+            return videointelligence_v1.VideoIntelligenceServiceClient()
+        return self.get('video_intelligence', create)
+
+    def vision(self):
+        def create():
+            from google.cloud import vision
+            return vision.ImageAnnotatorClient()
+        return self.get('vision', create)
+
+    def stats(self):
+        """Built and failed clients, for the metrics endpoint"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'pid': self._pid,
+                'clients': sorted(self._clients),
+                'failed': {name: {'error': str(error), 'retry_in_seconds': max(0.0, round(retry_at - now, 1))}
+                           for name, (error, retry_at) in self._failures.items()}
+            }
+
+# Singleton instance
+gcp_clients = GCPClientRegistry()
+# The child starts with no clients; the parent's lock may have been held by another thread at fork
+os.register_at_fork(after_in_child=gcp_clients._reset)
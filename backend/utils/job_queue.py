@@ -0,0 +1,333 @@
+# utils/job_queue.py
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import logging
+from contextlib import closing, contextmanager
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from config import JOB_DB_PATH, JOB_WORKERS, JOB_MAX_ATTEMPTS, JOB_LEASE_SECONDS, JOB_RETRY_BACKOFF_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Job and stage states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+PENDING = 'pending'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    stages TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    run_after REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+# Columns added after the first release, for databases created without them
+_ADDED_COLUMNS = {
+    'lease_owner': 'TEXT',
+    'lease_expires': 'REAL',
+    'run_after': 'REAL NOT NULL DEFAULT 0',
+}
+
+# Rows a worker may claim: queued and due, or running under a lapsed lease (its process died)
+_CLAIMABLE = "((status = ? AND run_after <= ?) OR (status = ? AND (lease_expires IS NULL OR lease_expires < ?)))"
+
+
+class JobContext:
+    """Handle given to pipeline handlers for reporting per-stage progress"""
+
+    def __init__(self, queue, job):
+        self._queue = queue
+        self.job_id = job['job_id']
+        self.job_type = job['job_type']
+        self.payload = job['payload']
+        self.attempt = job['attempts']
+        # Handlers keep retry inputs (e.g. the spooled upload) unless no retry will follow
+        self.is_final_attempt = job['attempts'] >= queue.max_attempts
+
+    @contextmanager
+    def stage(self, name):
+        """Mark a stage running, then completed or failed with its duration"""
+        self._queue.update_stage(self.job_id, name, RUNNING)
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            duration_ms = round((time.monotonic() - started) * 1000, 1)
+            self._queue.update_stage(self.job_id, name, FAILED, duration_ms=duration_ms, error=str(e))
+            raise
+        duration_ms = round((time.monotonic() - started) * 1000, 1)
+        self._queue.update_stage(self.job_id, name, COMPLETED, duration_ms=duration_ms)
+
+
+class EvidenceJobQueue:
+    """
+    SQLite-backed evidence job queue, safe to share between processes.
+
+    A worker claims a job in one IMMEDIATE transaction and holds a lease on
+    it that a heartbeat thread renews every third of JOB_LEASE_SECONDS.
+    Jobs whose lease lapses because their process died are claimed again by
+    any live worker; jobs still leased by a running sibling process are left
+    alone. A handler exception re-queues the job after an exponential
+    backoff until max_attempts claims (crashed ones included) are used up.
+    """
+
+    def __init__(self, db_path=JOB_DB_PATH, workers=JOB_WORKERS, max_attempts=JOB_MAX_ATTEMPTS,
+                 lease_seconds=JOB_LEASE_SECONDS, retry_backoff=JOB_RETRY_BACKOFF_SECONDS):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+        self.handlers = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._started = False
+        self.owner = None
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, definition in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+
+    def _connect(self):
+        # Autocommit mode: transactions are opened explicitly where a read decides a write
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def register_handler(self, job_type, handler):
+        """Register the pipeline function that runs jobs of the given type"""
+        self.handlers[job_type] = handler
+
+    def start(self):
+        """Start the worker pool and lease heartbeat in this process (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            # Leases name the process holding them; a forked child that starts gets its own
+            self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"evidence-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name='evidence-lease-heartbeat', daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        logger.info(f"Evidence job queue started with {self.workers} workers ({self.db_path}, owner {self.owner})")
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that takes the database lock up front, so reads inside it cannot go stale"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            try:
+                self.renew_leases()
+            except Exception as e:
+                logger.error(f"Job lease renewal error: {e}")
+
+    def renew_leases(self):
+        """Extend the leases of every job this process is running"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE status = ? AND lease_owner = ?",
+                (now + self.lease_seconds, RUNNING, self.owner)
+            )
+
+    def enqueue(self, job_type, payload, stages):
+        """Persist a new job and wake a worker started in this process, if any; returns the job ID"""
+        if job_type not in self.handlers:
+            raise ValueError(f"No handler registered for job type: {job_type}")
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        stage_states = {name: {'state': PENDING} for name in stages}
+
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, job_type, status, payload, stages, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, job_type, QUEUED, json.dumps(payload), json.dumps(stage_states), now, now)
+            )
+
+        # Workers only run where an entrypoint started them (create_app); this process may just enqueue
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get_job(self, job_id):
+        """Return the job status document, or None if the job is unknown"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._row_to_job(row) if row else None
+
+    def _row_to_job(self, row):
+        result = json.loads(row['result']) if row['result'] else None
+        return {
+            'job_id': row['id'],
+            'job_type': row['job_type'],
+            'status': row['status'],
+            'payload': json.loads(row['payload']),
+            'stages': json.loads(row['stages']),
+            'result': result,
+            'report_id': (result or {}).get('report_id') or (result or {}).get('evidence_id'),
+            'error': row['error'],
+            'attempts': row['attempts'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }
+
+    def update_stage(self, job_id, stage, state, **info):
+        """Record the state of one pipeline stage"""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not row:
+                return
+            stages = json.loads(row['stages'])
+            stage_info = stages.get(stage, {})
+            stage_info.update(info)
+            stage_info['state'] = state
+            stages[stage] = stage_info
+            conn.execute(
+                "UPDATE jobs SET stages = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(stages), time.time(), job_id)
+            )
+
+    def _claim_next(self):
+        """
+        Atomically move the oldest claimable job to running under this process's lease.
+        Lapsed jobs that have used up their attempts are failed instead.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE status = ? AND (lease_expires IS NULL OR lease_expires < ?) AND attempts >= ?",
+                (FAILED, 'Job interrupted too many times', now, RUNNING, now, self.max_attempts)
+            )
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE {_CLAIMABLE} ORDER BY created_at LIMIT 1",
+                (QUEUED, now, RUNNING, now)
+            ).fetchone()
+            if not row:
+                return None
+            if row['status'] == RUNNING:
+                logger.info(f"Reclaiming job {row['id']} from lapsed lease of {row['lease_owner']}")
+            claimed = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                f"updated_at = ? WHERE id = ? AND {_CLAIMABLE}",
+                (RUNNING, self.owner, now + self.lease_seconds, now, row['id'], QUEUED, now, RUNNING, now)
+            ).rowcount
+        if not claimed:
+            return None
+
+        job = self._row_to_job(row)
+        job['attempts'] += 1
+        return job
+
+    def _finish(self, job_id, status, result=None, error=None):
+        """Record the outcome, unless the lease was lost and another worker owns the job now"""
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(),
+                 job_id, RUNNING, self.owner)
+            ).rowcount
+        if not updated:
+            logger.warning(f"Job {job_id} lease was lost; discarding this worker's {status} result")
+
+    def _retry_later(self, job, error):
+        """Re-queue a failed attempt after an exponential backoff"""
+        delay = self.retry_backoff * 2 ** (job['attempts'] - 1)
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, run_after = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (QUEUED, error, now + delay, now, job['job_id'], RUNNING, self.owner)
+            )
+        logger.info(f"Job {job['job_id']} attempt {job['attempts']}/{self.max_attempts} failed; retrying in {delay:.0f}s")
+
+    def _run(self, job):
+        handler = self.handlers.get(job['job_type'])
+        if not handler:
+            self._finish(job['job_id'], FAILED, error=f"No handler for job type: {job['job_type']}")
+            return
+
+        logger.info(f"Running {job['job_type']} job {job['job_id']} (attempt {job['attempts']})")
+        try:
+            result = handler(JobContext(self, job))
+        except Exception as e:
+            logger.error(f"Job {job['job_id']} failed: {e}")
+            if job['attempts'] < self.max_attempts:
+                self._retry_later(job, str(e))
+            else:
+                self._finish(job['job_id'], FAILED, error=str(e))
+            return
+        self._finish(job['job_id'], COMPLETED, result=result)
+
+    def _worker_loop(self):
+        while True:
+            try:
+                job = self._claim_next()
+            except Exception as e:
+                logger.error(f"Job queue claim error: {e}")
+                job = None
+
+            if not job:
+                with self._wakeup:
+                    self._wakeup.wait(timeout=5)
+                continue
+
+            self._run(job)
+
+# Singleton instance
+job_queue = EvidenceJobQueue()
@@ -0,0 +1,203 @@
+# utils/motion_detector.py
+import os
+import sys
+import time
+import logging
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from config import MOTION_SAMPLE_FPS, MOTION_FRAME_WIDTH, SCENE_CHANGE_THRESHOLD, MOTION_SCORE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Sampled frames scored together per vectorized batch
+BATCH_SIZE = 64
+HISTOGRAM_BINS = 16
+
+
+def _format_timestamp(seconds):
+    return f"{int(seconds/60):02d}:{int(seconds%60):02d}"
+
+
+class MotionDetector:
+    """
+    Local shot-change and motion detection over a low-resolution frame stream.
+
+    Frames are subsampled, shrunk to a thumbnail and scored in NumPy batches:
+    a grey-level histogram distance flags cuts, and the mean absolute
+    difference between consecutive thumbnails flags bursts of motion.
+    """
+
+    def __init__(self, sample_fps=MOTION_SAMPLE_FPS, frame_width=MOTION_FRAME_WIDTH,
+                 scene_threshold=SCENE_CHANGE_THRESHOLD, motion_threshold=MOTION_SCORE_THRESHOLD):
+        self.sample_fps = sample_fps
+        self.frame_width = frame_width
+        self.scene_threshold = scene_threshold
+        self.motion_threshold = motion_threshold
+
+    def _score_batch(self, np, frames, previous):
+        """Histogram distance and frame difference of each frame against the one before it"""
+        if previous is not None:
+            frames = np.concatenate([previous[None], frames])
+
+        count = frames.shape[0]
+        flat = frames.reshape(count, -1)
+        pixels = flat.shape[1]
+
+        # One bincount for the whole batch: offset each frame's bins into its own range
+        bins = (flat >> 4).astype(np.int64) + (np.arange(count) * HISTOGRAM_BINS)[:, None]
+        histograms = np.bincount(bins.ravel(), minlength=count * HISTOGRAM_BINS)
+        histograms = histograms.reshape(count, HISTOGRAM_BINS) / pixels
+
+        histogram_distance = 0.5 * np.abs(np.diff(histograms, axis=0)).sum(axis=1)
+        frame_difference = np.abs(np.diff(flat.astype(np.int16), axis=0)).mean(axis=1) / 255.0
+
+        if previous is None:
+            # The first frame of the video has nothing to compare against
+            histogram_distance = np.concatenate([[0.0], histogram_distance])
+            frame_difference = np.concatenate([[0.0], frame_difference])
+        return histogram_distance, frame_difference
+
+    def _find_scene_changes(self, np, timestamps, histogram_distance, min_gap):
+        """Local peaks above the threshold, at least min_gap seconds apart"""
+        changes = []
+        for i in np.flatnonzero(histogram_distance > self.scene_threshold):
+            score = histogram_distance[i]
+            if changes and timestamps[i] - changes[-1]['timestamp'] < min_gap:
+                if score > changes[-1]['score']:
+                    changes[-1] = {'timestamp': float(timestamps[i]), 'score': round(float(score), 3)}
+                continue
+            changes.append({'timestamp': float(timestamps[i]), 'score': round(float(score), 3)})
+
+        for change in changes:
+            change['timestamp_formatted'] = _format_timestamp(change['timestamp'])
+        return changes
+
+    def _find_motion_events(self, np, timestamps, frame_difference, cut_mask, max_gap):
+        """Group consecutive high-motion samples into events, ignoring cuts"""
+        # Motion is judged against the clip's own baseline (median + 3 MADs) so
+        # a busy street and a static CCTV scene both yield their peaks
+        median = np.median(frame_difference)
+        spread = np.median(np.abs(frame_difference - median))
+        threshold = max(self.motion_threshold, median + 3 * spread)
+
+        above = (frame_difference > threshold) & ~cut_mask
+        events = []
+        for i in np.flatnonzero(above):
+            timestamp = float(timestamps[i])
+            score = float(frame_difference[i])
+            if events and timestamp - events[-1]['end_time'] <= max_gap:
+                event = events[-1]
+                event['end_time'] = timestamp
+                if score > event['score']:
+                    event['score'] = score
+                    event['timestamp'] = timestamp
+                continue
+            events.append({'start_time': timestamp, 'end_time': timestamp, 'timestamp': timestamp, 'score': score})
+
+        for event in events:
+            event['score'] = round(event['score'], 3)
+            event['timestamp_formatted'] = _format_timestamp(event['timestamp'])
+        return events
+
+    def detect(self, video_path):
+        """Return scene-change and high-motion timestamps for a video, or None if it cannot be read"""
+        try:
+            import cv2
+            import numpy as np
+        except ImportError:
+            logger.warning("OpenCV/NumPy not available for motion detection")
+            return None
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            logger.error(f"Cannot open video file: {video_path}")
+            return None
+
+        started = time.perf_counter()
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30  # Default assumption
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or self.frame_width
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self.frame_width
+            frame_step = max(1, int(round(fps / self.sample_fps)))
+            size = (self.frame_width, max(1, int(height * self.frame_width / width)))
+
+            timestamps = []
+            histogram_scores = []
+            difference_scores = []
+            batch = []
+            previous = None
+            frame_number = 0
+
+            while True:
+                # Only sampled frames are converted out of the decoder
+                if not cap.grab():
+                    break
+                frame_number += 1
+                if (frame_number - 1) % frame_step:
+                    continue
+                ret, frame = cap.retrieve()
+                if not ret:
+                    continue
+
+                thumbnail = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                batch.append(cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY))
+                timestamps.append((frame_number - 1) / fps)
+
+                if len(batch) == BATCH_SIZE:
+                    frames = np.stack(batch)
+                    histogram, difference = self._score_batch(np, frames, previous)
+                    histogram_scores.append(histogram)
+                    difference_scores.append(difference)
+                    previous = frames[-1]
+                    batch = []
+
+            if batch:
+                histogram, difference = self._score_batch(np, np.stack(batch), previous)
+                histogram_scores.append(histogram)
+                difference_scores.append(difference)
+        except Exception as e:
+            logger.error(f"Motion detection error: {e}")
+            return None
+        finally:
+            cap.release()
+
+        if not timestamps:
+            return None
+
+        timestamps = np.array(timestamps)
+        histogram_distance = np.concatenate(histogram_scores)
+        frame_difference = np.concatenate(difference_scores)
+        sample_interval = frame_step / fps
+
+        scene_changes = self._find_scene_changes(np, timestamps, histogram_distance, min_gap=1.0)
+        cut_mask = histogram_distance > self.scene_threshold
+        motion_events = self._find_motion_events(np, timestamps, frame_difference, cut_mask,
+                                                 max_gap=2 * sample_interval)
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"Local detection found {len(scene_changes)} scene changes and "
+                    f"{len(motion_events)} motion events in {elapsed_ms} ms")
+        return {
+            'scene_changes': scene_changes,
+            'motion_events': motion_events,
+            'frames_sampled': len(timestamps),
+            'sample_fps': round(fps / frame_step, 2),
+            'duration': frame_number / fps,
+            'elapsed_ms': elapsed_ms
+        }
+
+    def key_moments(self, detections, limit=8):
+        """Pick the strongest scene changes and motion peaks, in time order"""
+        if not detections:
+            return []
+        candidates = [(change['score'], change['timestamp']) for change in detections['scene_changes']]
+        candidates += [(event['score'], event['timestamp']) for event in detections['motion_events']]
+        strongest = sorted(candidates, reverse=True)[:limit]
+        return sorted(timestamp for _, timestamp in strongest)
+
+# Singleton instance
+motion_detector = MotionDetector()
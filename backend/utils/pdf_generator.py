@@ -11,13 +11,34 @@ from reportlab.pdfgen import canvas
 import io
 import os
 import re
+import threading
+from types import MappingProxyType
 from datetime import datetime
 import base64
+import hashlib
 import logging
+import sys
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from config import REPORT_FONT_DIR, REPORT_FONT_TA, REPORT_FONT_KN, KEY_FRAME_JPEG_QUALITY
+from utils.report_document import ParsedAnalysis, parse_analysis
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+    logger.warning("Pillow is not installed; key frames will be embedded at their original size")
+
+# Bump whenever the report layout changes so cached PDFs are rendered again
+RENDERER_VERSION = 4
+
 # Multilingual text dictionaries
 REPORT_TEXTS = {
     'en': {
@@ -197,112 +218,37 @@ RECOMMENDATIONS = {
     ]
 }
 
-# ========== MISSING FUNCTIONS ADDED HERE ==========
+# Languages a report can be rendered in
+REPORT_LANGUAGES = tuple(REPORT_TEXTS)
 
-def _split_into_readable_paragraphs(text, max_sentences=3):
-    """Split text into readable paragraphs with sentence limits"""
-    if not text:
-        return []
-        
-    paragraphs = []
-    current_para = []
-    
-    # Split into sentences
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if sentence and len(sentence) > 10:  # Filter very short sentences
-            current_para.append(sentence)
-            
-            # Start new paragraph after max sentences
-            if len(current_para) >= max_sentences:
-                paragraphs.append(' '.join(current_para))
-                current_para = []
-    
-    # Add remaining sentences
-    if current_para:
-        paragraphs.append(' '.join(current_para))
-    
-    return paragraphs if paragraphs else [text]
+# Evidence highlighting: one combined pattern, tried left to right in priority order
+# (plates, times, phones, places, keywords) so inserted markup is never re-scanned
+_HIGHLIGHT_PLACES = ["Chennai", "Coimbatore", "Madurai", "Tiruchirappalli", "Tirunelveli",
+                     "Salem", "Tiruppur", "Erode", "Kanchipuram", "Vellore"]
+_HIGHLIGHT_TERMS = ['evidence', 'suspicious', 'weapon', 'suspect', 'crime', 'illegal', 'theft', 'accident']
+_PLACE_NAMES = {place.lower(): place for place in _HIGHLIGHT_PLACES}
 
-def _extract_chronology(text):
-    """Enhanced chronology extraction with better time parsing"""
-    if not text:
-        return []
-        
-    lines = [s.strip() for s in re.split(r'[\n]+', text) if s.strip()]
-    time_pattern = re.compile(r'\b([01]?\d|2[0-3]):[0-5]\d(?::[0-5]\d)?\b')
-    
-    chrono_entries = []
-    for line in lines:
-        if time_pattern.search(line):
-            # Extract time and create structured entry
-            times = time_pattern.findall(line)
-            if times:
-                # Clean up the description
-                description = line.strip()
-                # Remove the time from beginning if it's there for cleaner display
-                if description.startswith(times[0]):
-                    description = description[len(times[0]):].strip(' -:')
-                
-                chrono_entries.append({
-                    'time': times[0],
-                    'description': description,
-                    'sort_key': _time_to_seconds(times[0])
-                })
-    
-    if chrono_entries:
-        # Sort by time and return formatted entries
-        chrono_entries.sort(key=lambda x: x['sort_key'])
-        return [f"{entry['time']} - {entry['description']}" for entry in chrono_entries[:12]]
-    
-    # Fallback: return meaningful lines that might contain event descriptions
-    event_keywords = ['first', 'then', 'after', 'before', 'begins', 'starts', 'ends', 'appears', 'enters', 'exits']
-    event_lines = [line for line in lines if any(keyword in line.lower() for keyword in event_keywords) and len(line) > 15]
-    return event_lines[:8]
+_HIGHLIGHT_PATTERN = re.compile(
+    r'(?P<plate>\bTN[-\s]?\d{1,2}[-\s]?[A-Z]{1,2}[-\s]?\d{1,4}\b)'
+    r'|(?P<time>\b(?:[01]?\d|2[0-3]):[0-5]\d(?::[0-5]\d)?\b)'
+    r'|(?P<phone>\b(?:\d{3}[-.\s]??\d{3}[-.\s]??\d{4}|\(\d{3}\)\s*\d{3}[-.\s]??\d{4}|\d{3}[-.\s]??\d{4})\b)'
+    r'|(?P<place>\b(?:' + '|'.join(re.escape(place) for place in _HIGHLIGHT_PLACES) + r')\b)'
+    r'|(?P<term>\b(?:' + '|'.join(re.escape(term) for term in _HIGHLIGHT_TERMS) + r')\b)',
+    re.IGNORECASE
+)
 
-def _time_to_seconds(time_str):
-    """Convert time string to seconds for sorting"""
-    try:
-        parts = list(map(int, time_str.split(':')))
-        while len(parts) < 3:
-            parts.append(0)
-        return parts[0] * 3600 + parts[1] * 60 + parts[2]
-    except:
-        return 0
+_HIGHLIGHT_MARKUP = {
+    'plate': lambda value: f'<font color="#D32F2F"><b>🚗 {value}</b></font>',  # Red
+    'time': lambda value: f'<font color="#1976D2"><b>⏰ {value}</b></font>',  # Blue
+    'phone': lambda value: f'<font color="#388E3C"><b>📞 {value}</b></font>',  # Green
+    'place': lambda value: f'<font color="#7B1FA2"><b>📍 {_PLACE_NAMES[value.lower()]}</b></font>',  # Purple
+    'term': lambda value: f'<font color="#F57C00"><b>{value.upper()}</b></font>',  # Orange
+}
+
+
+def _highlight_match(match):
+    return _HIGHLIGHT_MARKUP[match.lastgroup](match.group(0))
 
-def _extract_key_observations(text):
-    """Enhanced key observations extraction"""
-    if not text:
-        return []
-        
-    lines = [s.strip() for s in re.split(r'[\n]+', text) if s.strip() and len(s.strip()) > 20]
-    
-    # Priority indicators for key observations
-    priority_indicators = [
-        (r'\b(weapon|gun|knife|firearm|explosive)\b', 5),
-        (r'\b(vehicle|car|truck|motorcycle|scooter)\b', 4),
-        (r'\b(suspect|person|individual|man|woman)\b', 3),
-        (r'\b(TN[-\s]?\d{1,2}[-\s]?[A-Z]{1,2}[-\s]?\d{1,4})\b', 5),
-        (r'\b(money|cash|amount|rupee|currency)\b', 4),
-        (r'\b(drug|narcotic|substance|illegal)\b', 5),
-        (r'\b(fight|fight|attack|assault|violence)\b', 5),
-        (r'\b(punch|hit|kick|grapple|strike)\b', 4),
-    ]
-    
-    scored_lines = []
-    for line in lines:
-        score = 0
-        for pattern, points in priority_indicators:
-            if re.search(pattern, line, re.IGNORECASE):
-                score += points
-        if score > 0:
-            scored_lines.append((line, score))
-    
-    # Sort by score and return top observations
-    scored_lines.sort(key=lambda x: x[1], reverse=True)
-    return [line for line, score in scored_lines[:10]]
 
 def _highlight_evidences(text):
     """Enhanced evidence highlighting with better color scheme"""
@@ -312,191 +258,129 @@ def _highlight_evidences(text):
     # Escape HTML characters
     text = text.replace('<', '&lt;').replace('>', '&gt;')
     
-    # Patterns for different types of evidence
-    time_pattern = re.compile(r'\b([01]?\d|2[0-3]):[0-5]\d(?::[0-5]\d)?\b')
-    plate_pattern = re.compile(r'\b(TN[-\s]?\d{1,2}[-\s]?[A-Z]{1,2}[-\s]?\d{1,4})\b', re.IGNORECASE)
-    phone_pattern = re.compile(r'\b(\d{3}[-.\s]??\d{3}[-.\s]??\d{4}|\(\d{3}\)\s*\d{3}[-.\s]??\d{4}|\d{3}[-.\s]??\d{4})\b')
-    
-    places = ["Chennai", "Coimbatore", "Madurai", "Tiruchirappalli", "Tirunelveli", 
-              "Salem", "Tiruppur", "Erode", "Kanchipuram", "Vellore"]
-    
-    # Priority-based highlighting (order matters)
-    
-    # 1. Vehicle plates (Highest priority - Red)
-    text = plate_pattern.sub(
-        lambda m: f'<font color="#D32F2F"><b>🚗 {m.group(0)}</b></font>', text)
-    
-    # 2. Timestamps (Blue)
-    text = time_pattern.sub(
-        lambda m: f'<font color="#1976D2"><b>⏰ {m.group(0)}</b></font>', text)
-    
-    # 3. Phone numbers (Green)
-    text = phone_pattern.sub(
-        lambda m: f'<font color="#388E3C"><b>📞 {m.group(0)}</b></font>', text)
-    
-    # 4. Locations (Purple)
-    for place in places:
-        text = re.sub(r'\b' + re.escape(place) + r'\b', 
-                     f'<font color="#7B1FA2"><b>📍 {place}</b></font>', text, flags=re.IGNORECASE)
-    
-    # 5. Evidence keywords (Orange)
-    evidence_terms = ['evidence', 'suspicious', 'weapon', 'suspect', 'crime', 'illegal', 'theft', 'accident']
-    for term in evidence_terms:
-        text = re.sub(r'\b' + re.escape(term) + r'\b', 
-                     f'<font color="#F57C00"><b>{term.upper()}</b></font>', text, flags=re.IGNORECASE)
-    
-    return text
+    return _HIGHLIGHT_PATTERN.sub(_highlight_match, text)
 
-def _extract_ai_sections(analysis_text):
-    """Extract and structure AI analysis into sections with better parsing"""
-    if not analysis_text:
-        return {}
-    
-    sections = {
-        'executive_summary': '',
-        'detailed_analysis': '',
-        'key_findings': '',
-        'chronology': ''
-    }
-    
-    # Clean and normalize text
-    lines = [line.strip() for line in analysis_text.split('\n') if line.strip()]
-    
-    # Improved section detection with multiple patterns
-    current_section = 'executive_summary'  # Default to executive summary
-    section_content = []
-    
-    for i, line in enumerate(lines):
-        lower_line = line.lower()
-        
-        # Detect section headers with multiple patterns
-        if any(keyword in lower_line for keyword in ['executive summary', 'summary', 'overview']):
-            if section_content:
-                sections[current_section] = ' '.join(section_content)
-            section_content = []
-            current_section = 'executive_summary'
-            
-        elif any(keyword in lower_line for keyword in ['detailed analysis', 'analysis', 'detailed evidence']):
-            if section_content:
-                sections[current_section] = ' '.join(section_content)
-            section_content = []
-            current_section = 'detailed_analysis'
-            
-        elif any(keyword in lower_line for keyword in ['key findings', 'key evidence', 'findings', 'observations']):
-            if section_content:
-                sections[current_section] = ' '.join(section_content)
-            section_content = []
-            current_section = 'key_findings'
-            
-        elif any(keyword in lower_line for keyword in ['timeline', 'chronology', 'chronological', 'sequence of events']):
-            if section_content:
-                sections[current_section] = ' '.join(section_content)
-            section_content = []
-            current_section = 'chronology'
-            
-        elif re.search(r'\b\d{1,2}:\d{2}', line):  # Time pattern
-            # If we find timestamps and we're not already in chronology, switch
-            if current_section != 'chronology' and len(section_content) > 3:
-                if section_content:
-                    sections[current_section] = ' '.join(section_content)
-                section_content = [line]  # Start with this timestamp line
-                current_section = 'chronology'
-            else:
-                section_content.append(line)
-        else:
-            section_content.append(line)
-    
-    # Add the last section
-    if section_content:
-        sections[current_section] = ' '.join(section_content)
-    
-    # Fallback: If no good sections found, create intelligent splits
-    if not any(len(str(section).strip()) > 50 for section in sections.values()):
-        return _create_intelligent_sections(analysis_text)
-    
-    return sections
+# Bundled Noto Sans (OFL) files per language in REPORT_FONT_DIR: (regular, bold); see fonts/fetch_fonts.py
+_FONT_FILES = {
+    'ta': ('NotoSansTamil-Regular.ttf', 'NotoSansTamil-Bold.ttf'),
+    'kn': ('NotoSansKannada-Regular.ttf', 'NotoSansKannada-Bold.ttf'),
+}
+_FONT_OVERRIDES = {'ta': REPORT_FONT_TA, 'kn': REPORT_FONT_KN}
 
-def _create_intelligent_sections(full_text):
-    """Create sections intelligently when automatic parsing fails"""
-    paragraphs = [p.strip() for p in full_text.split('\n') if p.strip() and len(p.strip()) > 20]
-    
-    sections = {
-        'executive_summary': '',
-        'detailed_analysis': '',
-        'key_findings': '',
-        'chronology': ''
-    }
-    
-    if not paragraphs:
-        return sections
-    
-    # Executive summary = first 1-2 paragraphs
-    sections['executive_summary'] = ' '.join(paragraphs[:2])
-    
-    # Detailed analysis = most content
-    if len(paragraphs) > 2:
-        sections['detailed_analysis'] = ' '.join(paragraphs[2:])
-    
-    # Extract chronology from lines with timestamps
-    time_pattern = re.compile(r'\b([01]?\d|2[0-3]):[0-5]\d(?::[0-5]\d)?\b')
-    time_lines = [line for line in full_text.split('\n') if time_pattern.search(line)]
-    if time_lines:
-        sections['chronology'] = ' '.join(time_lines[:10])  # Limit to 10 time entries
-    
-    # Key findings = lines with evidence keywords
-    evidence_keywords = ['vehicle', 'plate', 'TN-', 'suspect', 'weapon', 'suspicious', 'individual', 'person', 'fight', 'altercation']
-    key_lines = []
-    for line in full_text.split('\n'):
-        if any(keyword in line.lower() for keyword in evidence_keywords) and len(line) > 20:
-            key_lines.append(line)
-    if key_lines:
-        sections['key_findings'] = ' '.join(key_lines[:8])  # Limit to 8 key findings
-    
-    return sections
+# Key frames are printed at 3x2 inches; embedded images are limited to this resolution
+_FRAME_WIDTH = 3 * inch
+_FRAME_HEIGHT = 2 * inch
+_FRAME_PRINT_DPI = 150
 
-# ========== END OF MISSING FUNCTIONS ==========
+# Registered fonts, built style sheets and page chrome specs are shared by every render in the process
+_font_lock = threading.Lock()
+_font_cache = {}
+_style_cache = {}
+_chrome_cache = {}
+
+# Watermark, header and footer strings drawn on every page
+_PAGE_CHROME_TEXTS = {
+    'en': ("ALFA LABS",
+           "Automated Evidence Analysis Report",
+           "Alfa Labs Evidence Analysis System - Confidential"),
+    'ta': ("அல்பா லேப்ஸ்",
+           "தானியங்கி ஆதார பகுப்பாய்வு அறிக்கை",
+           "அல்பா லேப்ஸ் ஆதார பகுப்பாய்வு அமைப்பு - இரகசியம்"),
+    'kn': ("ಆಲ್ಫಾ ಲ್ಯಾಬ್ಸ್",
+           "ಸ್ವಯಂಚಾಲಿತ ಪುರಾವೆ ವಿಶ್ಲೇಷಣಾ ವರದಿ",
+           "ಆಲ್ಫಾ ಲ್ಯಾಬ್ಸ್ ಪುರಾವೆ ವಿಶ್ಲೇಷಣಾ ವ್ಯವಸ್ಥೆ - ಗೌಪ್ಯ"),
+}
+
+def _find_font_files(language):
+    """Return (regular, bold) TTF paths for a language, or None; fonts are only loaded by path"""
+    override = _FONT_OVERRIDES.get(language)
+    if override and os.path.exists(override):
+        return override, None
+
+    regular, bold = _FONT_FILES[language]
+    regular_path = os.path.join(REPORT_FONT_DIR, regular)
+    if not os.path.exists(regular_path):
+        return None
+    bold_path = os.path.join(REPORT_FONT_DIR, bold)
+    return regular_path, bold_path if os.path.exists(bold_path) else None
+
+def _language_fonts(language='en'):
+    """Register the language's TTF fonts once and return their (regular, bold) names"""
+    with _font_lock:
+        if language in _font_cache:
+            return _font_cache[language]
+
+        fonts = ('Helvetica', 'Helvetica-Bold')
+        paths = _find_font_files(language) if language in _FONT_FILES else None
+        if paths:
+            regular_path, bold_path = paths
+            regular = f'ReportFont-{language}'
+            bold = f'{regular}-Bold' if bold_path else regular
+            try:
+                pdfmetrics.registerFont(TTFont(regular, regular_path))
+                if bold_path:
+                    pdfmetrics.registerFont(TTFont(bold, bold_path))
+                # <b> markup needs a family mapping even when there is no separate bold face
+                pdfmetrics.registerFontFamily(regular, normal=regular, bold=bold, italic=regular, boldItalic=bold)
+                fonts = (regular, bold)
+                logger.info(f"Registered report font for '{language}': {regular_path}")
+                # Conjuncts and vowel signs need HarfBuzz shaping (ReportLab's uharfbuzz support)
+                if not _shapes_text(regular):
+                    logger.warning(f"Text shaping unavailable for '{language}' (install uharfbuzz); "
+                                   f"conjuncts will render as unjoined glyphs")
+            except Exception as e:
+                logger.warning(f"Font registration failed for '{language}': {e}")
+        elif language in _FONT_FILES:
+            logger.warning(f"No TTF font for '{language}' in {REPORT_FONT_DIR} (run fonts/fetch_fonts.py); "
+                           f"text will render in Helvetica")
+
+        _font_cache[language] = fonts
+        return fonts
+
+def _shapes_text(font_name):
+    """Whether ReportLab can shape text set in this font (a registered TTF with uharfbuzz installed)"""
+    return bool(getattr(pdfmetrics.getFont(font_name), 'shapable', False))
 
 def _register_fonts(language='en'):
     """Register fonts with Unicode support for different languages"""
-    try:
-        # Use built-in fonts instead of external files
-        # These are available in most systems
-        builtin_fonts = {
-            'en': 'Helvetica',
-            'ta': 'Helvetica',  # Fallback to Helvetica for Tamil
-            'kn': 'Helvetica'   # Fallback to Helvetica for Kannada
-        }
-        
-        return builtin_fonts.get(language, 'Helvetica')
-            
-    except Exception as e:
-        print(f"Font registration warning: {e}")
-        return "Helvetica"
+    return _language_fonts(language)[0]
 
-def _create_watermark(canvas, doc, language='en'):
-    """Create professional watermark on every page"""
+def _page_chrome_spec(language, doc):
+    """Fonts, strings and positions of the static page chrome, cached per language and page layout"""
+    key = (language, tuple(doc.pagesize), doc.leftMargin, doc.bottomMargin, doc.width, doc.height)
+    spec = _chrome_cache.get(key)
+    if spec is None:
+        regular_font, bold_font = _language_fonts(language)
+        watermark, header, footer = _PAGE_CHROME_TEXTS.get(language, _PAGE_CHROME_TEXTS['en'])
+        spec = MappingProxyType({
+            'regular_font': regular_font,
+            'bold_font': bold_font,
+            'shaping': _shapes_text(regular_font),
+            'watermark': watermark,
+            'header': header,
+            'footer': footer,
+            'center': (doc.pagesize[0] / 2, doc.pagesize[1] / 2),
+            'left': doc.leftMargin,
+            'right': doc.width + doc.leftMargin,
+            'bottom': doc.bottomMargin,
+            'top': doc.height + doc.topMargin,
+        })
+        _chrome_cache[key] = spec
+    return spec
+
+def _draw_page_chrome(canvas, spec):
+    """Draw the watermark, header and footer shared by every page"""
     canvas.saveState()
     
     # Set watermark properties
-    canvas.setFont('Helvetica-Bold', 42)
+    canvas.setFont(spec['bold_font'], 42)
     canvas.setFillColor(colors.HexColor('#F0F0F0'))
     canvas.setFillAlpha(0.1)
     
-    # Get page dimensions
-    page_width = doc.pagesize[0]
-    page_height = doc.pagesize[1]
-    
     # Rotate and position watermark in center
-    canvas.translate(page_width / 2, page_height / 2)
+    canvas.translate(*spec['center'])
     canvas.rotate(45)
-    
-    # Draw main watermark text
-    watermark_texts = {
-        'en': "ALFA LABS",
-        'ta': "அல்பா லேப்ஸ்",
-        'kn': "ಆಲ್ಫಾ ಲ್ಯಾಬ್ಸ್"
-    }
-    canvas.drawCentredString(0, 0, watermark_texts.get(language, "ALFA LABS"))
+    canvas.drawCentredString(0, 0, spec['watermark'], shaping=spec['shaping'])
     
     canvas.restoreState()
     
@@ -506,38 +390,76 @@ def _create_watermark(canvas, doc, language='en'):
     # Header line
     canvas.setStrokeColor(colors.HexColor('#2C5530'))
     canvas.setLineWidth(0.5)
-    canvas.line(doc.leftMargin, doc.height + doc.topMargin - 15, 
-                doc.width + doc.leftMargin, doc.height + doc.topMargin - 15)
+    canvas.line(spec['left'], spec['top'] - 15, spec['right'], spec['top'] - 15)
     
     # Footer line
-    canvas.line(doc.leftMargin, doc.bottomMargin + 15, 
-                doc.width + doc.leftMargin, doc.bottomMargin + 15)
+    canvas.line(spec['left'], spec['bottom'] + 15, spec['right'], spec['bottom'] + 15)
     
-    # Page number
-    canvas.setFont('Helvetica', 8)
+    # Footer and header text
+    canvas.setFont(spec['regular_font'], 8)
     canvas.setFillColor(colors.gray)
-    page_text = f"Page {canvas.getPageNumber()}"
-    canvas.drawRightString(doc.width + doc.leftMargin - 10, doc.bottomMargin, page_text)
-    
-    # Footer text
-    footer_texts = {
-        'en': "Alfa Labs Evidence Analysis System - Confidential",
-        'ta': "அல்பா லேப்ஸ் ஆதார பகுப்பாய்வு அமைப்பு - இரகசியம்",
-        'kn': "ಆಲ್ಫಾ ಲ್ಯಾಬ್ಸ್ ಪುರಾವೆ ವಿಶ್ಲೇಷಣಾ ವ್ಯವಸ್ಥೆ - ಗೌಪ್ಯ"
-    }
-    canvas.drawString(doc.leftMargin, doc.bottomMargin, footer_texts.get(language, "Alfa Labs Evidence Analysis System - Confidential"))
+    canvas.drawString(spec['left'], spec['bottom'], spec['footer'], shaping=spec['shaping'])
+    canvas.drawString(spec['left'], spec['top'] - 12, spec['header'], shaping=spec['shaping'])
     
-    # Header text
-    header_texts = {
-        'en': "Automated Evidence Analysis Report",
-        'ta': "தானியங்கி ஆதார பகுப்பாய்வு அறிக்கை",
-        'kn': "ಸ್ವಯಂಚಾಲಿತ ಪುರಾವೆ ವಿಶ್ಲೇಷಣಾ ವರದಿ"
-    }
-    canvas.drawString(doc.leftMargin, doc.height + doc.topMargin - 12, header_texts.get(language, "Automated Evidence Analysis Report"))
+    canvas.restoreState()
+
+def _create_watermark(canvas, doc, language='en'):
+    """Create professional watermark on every page"""
+    spec = _page_chrome_spec(language, doc)
     
+    # The static chrome is drawn once per document as a form XObject that every page references
+    form_name = f"PageChrome_{language}"
+    if not canvas.hasForm(form_name):
+        canvas.beginForm(form_name)
+        _draw_page_chrome(canvas, spec)
+        canvas.endForm()
+    canvas.doForm(form_name)
+    
+    # Page number is the only per-page drawing
+    canvas.saveState()
+    canvas.setFont(spec['regular_font'], 8)
+    canvas.setFillColor(colors.gray)
+    canvas.drawRightString(spec['right'] - 10, spec['bottom'], f"Page {canvas.getPageNumber()}")
     canvas.restoreState()
 
 def _create_styles(language='en'):
+    """Return the cached, read-only style sheet for a language, building it on first use"""
+    styles = _style_cache.get(language)
+    if styles is None:
+        styles = MappingProxyType(_build_styles(language))
+        _style_cache.setdefault(language, styles)
+    return _style_cache[language]
+
+class ReportFontsUnavailableError(RuntimeError):
+    """Raised when a report language has no bundled font or its text cannot be shaped"""
+
+def check_report_fonts(languages=REPORT_LANGUAGES):
+    """
+    Raise ReportFontsUnavailableError unless every language that needs a TTF
+    font has one registered and shapable; renders would otherwise silently
+    fall back to Helvetica or unjoined glyphs.
+    """
+    problems = []
+    for language in languages:
+        if language not in _FONT_FILES:
+            continue
+        regular, _ = _language_fonts(language)
+        if regular == 'Helvetica':
+            problems.append(f"'{language}': {_FONT_FILES[language][0]} not found in {REPORT_FONT_DIR}")
+        elif not _shapes_text(regular):
+            problems.append(f"'{language}': text shaping unavailable (install uharfbuzz)")
+    if problems:
+        raise ReportFontsUnavailableError(
+            "Report fonts unavailable - " + "; ".join(problems) +
+            ". Run fonts/fetch_fonts.py or set REPORT_FONT_TA/REPORT_FONT_KN."
+        )
+
+def warm_report_styles(languages=REPORT_LANGUAGES):
+    """Register fonts and build style sheets up front so renders under load skip it"""
+    for language in languages:
+        _create_styles(language)
+
+def _build_styles(language='en'):
     """Create comprehensive styling for the PDF with language support"""
     styles = getSampleStyleSheet()
     font_name = _register_fonts(language)
@@ -655,7 +577,7 @@ def _create_styles(language='en'):
         spaceAfter=8
     )
     
-    return {
+    report_styles = {
         'title': title_style,
         'report_id': report_id_style,
         'section_heading': section_heading_style,
@@ -667,11 +589,17 @@ def _create_styles(language='en'):
         'risk_high': risk_high_style,
         'risk_medium': risk_medium_style
     }
+    # Tamil and Kannada conjuncts only join when the paragraph is shaped
+    if _shapes_text(font_name):
+        for style in report_styles.values():
+            style.shaping = 1
+    return report_styles
 
 def _create_header_table(report_id, language='en'):
     """Create a professional header table with language support"""
     current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     texts = REPORT_TEXTS.get(language, REPORT_TEXTS['en'])
+    regular_font, bold_font = _language_fonts(language)
     
     header_data = [
         [texts['title'], f'Report ID: {report_id}'],
@@ -681,14 +609,21 @@ def _create_header_table(report_id, language='en'):
     
     col_widths = [360, 180]
     
+    # Plain table cells are never shaped; set localized titles as shaped paragraphs instead
+    if _shapes_text(bold_font):
+        title_cell = ParagraphStyle('HeaderTitle', fontName=bold_font, fontSize=8, leading=10,
+                                    textColor=colors.whitesmoke, shaping=1)
+        for row in header_data:
+            row[0] = Paragraph(row[0], title_cell)
+    
     header_table = Table(header_data, colWidths=col_widths)
     header_table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#2C5530')),
         ('TEXTCOLOR', (0, 0), (-1, -1), colors.whitesmoke),
         ('ALIGN', (0, 0), (0, -1), 'LEFT'),
         ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTNAME', (0, 0), (0, -1), bold_font),
+        ('FONTNAME', (1, 0), (1, -1), regular_font),
         ('FONTSIZE', (0, 0), (-1, -1), 8),
         ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
         ('TOPPADDING', (0, 0), (-1, -1), 4),
@@ -743,7 +678,25 @@ def _add_analytical_intelligence_section(content, enhanced_data, styles, texts):
     
     content.append(Spacer(1, 0.15*inch))
 
-def _add_visual_evidence_section(content, enhanced_data, styles, texts):
+def _print_ready_frame(frame_data, width, height):
+    """Downscale and recompress a frame to its printed size; frames already small enough are kept as-is"""
+    if PILImage is None:
+        return frame_data
+    try:
+        with PILImage.open(io.BytesIO(frame_data)) as image:
+            max_size = (int(width / inch * _FRAME_PRINT_DPI), int(height / inch * _FRAME_PRINT_DPI))
+            if image.format == 'JPEG' and image.width <= max_size[0] and image.height <= max_size[1]:
+                return frame_data
+            image = image.convert('RGB')
+            image.thumbnail(max_size, PILImage.LANCZOS)
+            output = io.BytesIO()
+            image.save(output, format='JPEG', quality=KEY_FRAME_JPEG_QUALITY, optimize=True)
+            return output.getvalue()
+    except Exception as e:
+        logger.warning(f"Could not downscale frame, embedding original: {e}")
+        return frame_data
+
+def _add_visual_evidence_section(content, enhanced_data, styles, texts, prepared=None):
     """Add visual evidence section with key frames to PDF"""
     content.append(Paragraph(texts['visual_evidence'], styles['section_heading']))
     
@@ -751,18 +704,15 @@ def _add_visual_evidence_section(content, enhanced_data, styles, texts):
     
     if key_frames:
         content.append(Paragraph(f"<b>{texts['key_frames']}</b>", styles['normal']))
+        # Print-ready bytes per distinct frame; ReportLab stores identical images once
+        if prepared is None:
+            prepared = {}
         
         for i, frame in enumerate(key_frames[:3], 1):  # Limit to 3 frames
             try:
-                # Convert base64 to image
-                frame_data = frame.get('image_data', '')
+                # Raw JPEG bytes, or base64 text from older analyses
+                frame_data = frame.get('image_bytes') or base64.b64decode(frame.get('image_data', ''))
                 if frame_data:
-                    # Create temporary image file
-                    import tempfile
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp_file:
-                        temp_file.write(base64.b64decode(frame_data))
-                        temp_img_path = temp_file.name
-                    
                     # Add frame description
                     timestamp = frame.get('timestamp_formatted', 'Unknown')
                     significance = frame.get('analytical_significance', 'Key moment')
@@ -770,16 +720,15 @@ def _add_visual_evidence_section(content, enhanced_data, styles, texts):
                     frame_desc = f"<b>Frame {i}</b> - {timestamp} - {significance}"
                     content.append(Paragraph(frame_desc, styles['normal']))
                     
-                    # Add image to PDF
+                    # Add image to PDF straight from memory
                     try:
-                        img = Image(temp_img_path, width=3*inch, height=2*inch)
+                        digest = hashlib.sha1(frame_data).digest()
+                        if digest not in prepared:
+                            prepared[digest] = _print_ready_frame(frame_data, _FRAME_WIDTH, _FRAME_HEIGHT)
+                        img = Image(io.BytesIO(prepared[digest]), width=_FRAME_WIDTH, height=_FRAME_HEIGHT)
                         content.append(img)
                     except Exception as img_error:
                         content.append(Paragraph(f"[Visual Evidence: {timestamp} - Image load failed]", styles['evidence']))
-                    
-                    # Clean up
-                    if os.path.exists(temp_img_path):
-                        os.remove(temp_img_path)
                         
                     content.append(Spacer(1, 0.05*inch))
                     
@@ -850,22 +799,62 @@ def _enhance_analysis_with_intelligence(analysis_text, enhanced_data):
     
     return enhanced_text
 
-def generate_pdf(analysis_text, report_id, language='en', enhanced_data=None):
+def parse_report_analysis(analysis_text, enhanced_data=None):
+    """Parse the text a report is rendered from, so the result can be stored and reused"""
+    if enhanced_data:
+        analysis_text = _enhance_analysis_with_intelligence(analysis_text, enhanced_data)
+    return parse_analysis(analysis_text)
+
+def _highlight_report_content(parsed_analysis):
+    """Highlight the parsed analysis once; the markup is the same in every report language"""
+    # Numbering follows the source lists, so entries filtered out still leave their gap
+    return {
+        'executive_summary': _highlight_evidences(parsed_analysis.executive_summary),
+        'paragraphs': [(i, _highlight_evidences(paragraph))
+                       for i, paragraph in enumerate(parsed_analysis.detailed_paragraphs[:6], 1)
+                       if paragraph and len(paragraph) > 20],
+        'paragraph_count': len(parsed_analysis.detailed_paragraphs),
+        'chronology': [(i, _highlight_evidences(entry.strip()))
+                       for i, entry in enumerate(parsed_analysis.chronology_entries(), 1) if len(entry) > 10],
+        'observations': [(i, _highlight_evidences(observation.text))
+                         for i, observation in enumerate(parsed_analysis.observations, 1)
+                         if len(observation.text) > 15],
+        'has_observations': bool(parsed_analysis.observations),
+        'plates': parsed_analysis.plates[:5],
+        'phones': parsed_analysis.phones[:5],
+        'frames': {},  # Print-ready key frames, filled by the first language rendered
+    }
+
+def _prepare_report_content(analysis_text, enhanced_data, parsed_analysis):
+    # Reuse a stored parse when it matches the current parsing rules
+    if isinstance(parsed_analysis, dict):
+        parsed_analysis = ParsedAnalysis.from_dict(parsed_analysis)
+    if parsed_analysis is None:
+        parsed_analysis = parse_report_analysis(analysis_text, enhanced_data)
+    return _highlight_report_content(parsed_analysis)
+
+def generate_pdf(analysis_text, report_id, language='en', enhanced_data=None, parsed_analysis=None):
     """Generate advanced PDF report with analytical intelligence and visual evidence"""
+    report_content = _prepare_report_content(analysis_text, enhanced_data, parsed_analysis)
+    return _render_report(report_content, report_id, language, enhanced_data)
+
+def generate_pdfs(analysis_text, report_id, languages=REPORT_LANGUAGES, enhanced_data=None, parsed_analysis=None):
+    """Generate the report in several languages, parsing and highlighting the analysis only once"""
+    report_content = _prepare_report_content(analysis_text, enhanced_data, parsed_analysis)
+    return {language: _render_report(report_content, report_id, language, enhanced_data)
+            for language in languages}
+
+def _render_report(report_content, report_id, language, enhanced_data):
+    """Lay out one language of a report from its shared, highlighted content"""
     # Validate language
-    if language not in ['en', 'ta', 'kn']:
+    if language not in REPORT_LANGUAGES:
         language = 'en'
     
-    # Register fonts and create styles for the selected language
-    font_name = _register_fonts(language)
+    # Cached fonts and styles for the selected language
     styles = _create_styles(language)
     texts = REPORT_TEXTS.get(language, REPORT_TEXTS['en'])
     recommendations = RECOMMENDATIONS.get(language, RECOMMENDATIONS['en'])
     
-    # Enhance analysis text with intelligence if enhanced data is available
-    if enhanced_data:
-        analysis_text = _enhance_analysis_with_intelligence(analysis_text, enhanced_data)
-    
     # Create document with better margins
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(
@@ -877,25 +866,17 @@ def generate_pdf(analysis_text, report_id, language='en', enhanced_data=None):
         bottomMargin=0.7*inch
     )
     
-    # Create frame with watermark
-    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, 
-                  id='normal', showBoundary=0)
-    
+    # Watermark, header and footer on every page; SimpleDocTemplate switches to its
+    # 'Later' template after the first page, so both hooks are set at build time
     def create_watermark(canvas, doc):
         return _create_watermark(canvas, doc, language)
     
-    template = PageTemplate(id='watermarked', frames=[frame], onPage=create_watermark)
-    doc.addPageTemplates([template])
-    
     content = []
     
     # Header Table
     content.append(_create_header_table(report_id, language))
     content.append(Spacer(1, 0.2*inch))
     
-    # Extract and structure AI analysis
-    sections = _extract_ai_sections(analysis_text)
-    
     # Case Information Section
     content.append(Paragraph(texts['case_info'], styles['section_heading']))
     case_info_html = f"""
@@ -911,61 +892,46 @@ def generate_pdf(analysis_text, report_id, language='en', enhanced_data=None):
     
     # Executive Summary
     content.append(Paragraph(texts['executive_summary'], styles['section_heading']))
-    executive_summary = sections.get('executive_summary', '')
-    if not executive_summary:
-        summary_paragraphs = _split_into_readable_paragraphs(analysis_text, 2)
-        executive_summary = ' '.join(summary_paragraphs[:2])
-    
+    executive_summary = report_content['executive_summary']
     if executive_summary:
-        content.append(Paragraph(_highlight_evidences(executive_summary), styles['evidence']))
+        content.append(Paragraph(executive_summary, styles['evidence']))
     else:
         content.append(Paragraph(texts['no_summary'], styles['normal']))
     content.append(Spacer(1, 0.15*inch))
     
     # Detailed Evidence Analysis
     content.append(Paragraph(texts['detailed_analysis'], styles['section_heading']))
-    detailed_analysis = sections.get('detailed_analysis', analysis_text)
-    paragraphs = _split_into_readable_paragraphs(detailed_analysis)
-    
-    if paragraphs:
-        for i, paragraph in enumerate(paragraphs[:6], 1):
-            if paragraph and len(paragraph) > 20:
-                highlighted_para = _highlight_evidences(paragraph)
-                content.append(Paragraph(f"<b>{texts['analysis_point']} {i}:</b> {highlighted_para}", styles['normal']))
-                content.append(Spacer(1, 0.08*inch))
+    paragraph_count = report_content['paragraph_count']
+    
+    if paragraph_count:
+        for i, highlighted_para in report_content['paragraphs']:
+            content.append(Paragraph(f"<b>{texts['analysis_point']} {i}:</b> {highlighted_para}", styles['normal']))
+            content.append(Spacer(1, 0.08*inch))
     else:
         content.append(Paragraph(texts['no_analysis'], styles['normal']))
     
     # Add page break if content is getting long
-    if len(paragraphs) > 3:
+    if paragraph_count > 3:
         content.append(PageBreak())
     
     content.append(Spacer(1, 0.15*inch))
     
     # Chronological Timeline
     content.append(Paragraph(texts['chronological_timeline'], styles['section_heading']))
-    chronology_text = sections.get('chronology', analysis_text)
-    chronology = _extract_chronology(chronology_text)
+    chronology = report_content['chronology']
     
     if chronology:
-        flow_items = []
-        for i, entry in enumerate(chronology, 1):
-            if len(entry) > 10:
-                clean_entry = _highlight_evidences(entry.strip())
-                flow_items.append(Paragraph(f"<b>{texts['event']} {i}:</b> {clean_entry}", styles['bullet']))
-        
-        if flow_items:
-            chronology_list = ListFlowable(
-                flow_items,
-                bulletType='bullet',
-                leftIndent=20,
-                bulletOffsetY=2,
-                spaceBefore=6,
-                spaceAfter=6
-            )
-            content.append(chronology_list)
-        else:
-            content.append(Paragraph(texts['no_timeline'], styles['normal']))
+        flow_items = [Paragraph(f"<b>{texts['event']} {i}:</b> {clean_entry}", styles['bullet'])
+                      for i, clean_entry in chronology]
+        chronology_list = ListFlowable(
+            flow_items,
+            bulletType='bullet',
+            leftIndent=20,
+            bulletOffsetY=2,
+            spaceBefore=6,
+            spaceAfter=6
+        )
+        content.append(chronology_list)
     else:
         content.append(Paragraph(texts['no_timeline'], styles['normal']))
     
@@ -973,15 +939,10 @@ def generate_pdf(analysis_text, report_id, language='en', enhanced_data=None):
     
     # Key Evidence Findings
     content.append(Paragraph(texts['key_evidence_findings'], styles['section_heading']))
-    key_findings_text = sections.get('key_findings', analysis_text)
-    key_observations = _extract_key_observations(key_findings_text)
-    
-    if key_observations:
-        for i, observation in enumerate(key_observations, 1):
-            if len(observation) > 15:
-                highlighted_obs = _highlight_evidences(observation)
-                content.append(Paragraph(f"<b>{texts['finding']} {i}:</b> {highlighted_obs}", styles['bullet']))
-                content.append(Spacer(1, 0.04*inch))
+    if report_content['has_observations']:
+        for i, highlighted_obs in report_content['observations']:
+            content.append(Paragraph(f"<b>{texts['finding']} {i}:</b> {highlighted_obs}", styles['bullet']))
+            content.append(Spacer(1, 0.04*inch))
     else:
         content.append(Paragraph(texts['no_findings'], styles['normal']))
     
@@ -990,22 +951,17 @@ def generate_pdf(analysis_text, report_id, language='en', enhanced_data=None):
     # Critical Identifiers
     content.append(Paragraph(texts['critical_identifiers'], styles['section_heading']))
     
-    plate_pattern = re.compile(r'\b(TN[-\s]?\d{1,2}[-\s]?[A-Z]{1,2}[-\s]?\d{1,4})\b', re.IGNORECASE)
-    phone_pattern = re.compile(r'\b(\d{10}|\d{3}[-.\s]??\d{3}[-.\s]??\d{4})\b')
-    
-    plates = plate_pattern.findall(analysis_text)
-    phones = phone_pattern.findall(analysis_text)
+    plates = report_content['plates']
+    phones = report_content['phones']
     
     identifiers_html = ""
     
     if plates:
-        unique_plates = list(set(plates))
-        plates_text = ", ".join([f'<font color="#D32F2F"><b>{plate}</b></font>' for plate in unique_plates[:5]])
+        plates_text = ", ".join([f'<font color="#D32F2F"><b>{plate}</b></font>' for plate in plates])
         identifiers_html += f"<b>{texts['vehicle_plates']}</b> {plates_text}<br/>"
     
     if phones:
-        unique_phones = list(set(phones))
-        phones_text = ", ".join([f'<font color="#388E3C"><b>{phone}</b></font>' for phone in unique_phones[:5]])
+        phones_text = ", ".join([f'<font color="#388E3C"><b>{phone}</b></font>' for phone in phones])
         identifiers_html += f"<b>{texts['phone_numbers']}</b> {phones_text}<br/>"
     
     if identifiers_html:
@@ -1021,7 +977,7 @@ def generate_pdf(analysis_text, report_id, language='en', enhanced_data=None):
     
     # NEW: Visual Evidence Section
     if enhanced_data:
-        _add_visual_evidence_section(content, enhanced_data, styles, texts)
+        _add_visual_evidence_section(content, enhanced_data, styles, texts, report_content['frames'])
     
     # NEW: Confidence Metrics Section
     if enhanced_data:
@@ -1056,7 +1012,7 @@ def generate_pdf(analysis_text, report_id, language='en', enhanced_data=None):
     
     # Build PDF
     try:
-        doc.build(content)
+        doc.build(content, onFirstPage=create_watermark, onLaterPages=create_watermark)
         buffer.seek(0)
         return buffer.getvalue()
     except Exception as e:
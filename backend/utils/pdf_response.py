@@ -0,0 +1,50 @@
+# utils/pdf_response.py
+from flask import request, Response
+
+
+def _satisfiable(begin, size):
+    """Whether a byte range starting at begin (negative for a suffix range) overlaps the content"""
+    return begin < size if begin >= 0 else size > 0
+
+
+def pdf_response(report_id, ref, stream_range):
+    """
+    Stream a stored PDF, honouring conditional and Range requests.
+
+    ref is the report's Storage reference ({'path', 'size', 'sha256'});
+    stream_range(path, start, end) yields the bytes start..end inclusive.
+    """
+    size = ref['size']
+    etag = ref['sha256']  # Content-addressed, so the hash is a strong validator
+    headers = {
+        'Content-Disposition': f'inline; filename=report_{report_id}.pdf',
+        'Cache-Control': 'private, no-cache',
+        'Accept-Ranges': 'bytes'
+    }
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag)
+        return response
+
+    start, end, status = 0, size - 1, 200
+    # A Range only applies if If-Range is absent or still names this version
+    if_range = request.if_range
+    range_applies = if_range.etag == etag if if_range.etag else if_range.date is None
+    if request.range and request.range.units == 'bytes' and range_applies:
+        byte_range = request.range.range_for_length(size)
+        if byte_range is None and not any(_satisfiable(begin, size) for begin, _ in request.range.ranges):
+            response = Response(status=416, headers=headers)
+            response.headers['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is not None:
+            start, end, status = byte_range[0], byte_range[1] - 1, 206
+        # Several satisfiable ranges: multipart responses are optional, so send the whole PDF
+
+    response = Response(stream_range(ref['path'], start, end), status=status, mimetype='application/pdf',
+                        headers=headers)
+    response.content_length = end - start + 1
+    response.set_etag(etag)
+    if status == 206:
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
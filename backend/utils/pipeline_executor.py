@@ -0,0 +1,85 @@
+# utils/pipeline_executor.py
+import os
+import sys
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from config import PIPELINE_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineExecutor:
+    def __init__(self, max_workers=PIPELINE_MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pipeline-stage')
+
+    def _timed(self, name, fn, job):
+        """Run one stage, reporting it to the job if given, and time it"""
+        started = time.monotonic()
+        if job is not None:
+            with job.stage(name):
+                result = fn()
+        else:
+            result = fn()
+        return result, round((time.monotonic() - started) * 1000, 1)
+
+    def fan_out(self, stages, job=None):
+        """
+        Start independent stages in parallel and join their results.
+
+        stages maps a stage name to a zero-argument callable. Returns
+        (results, timings) where timings holds per-stage milliseconds plus
+        the wall-clock time of the whole fan-out and the sequential sum.
+        """
+        started = time.monotonic()
+        futures = {
+            name: self._executor.submit(self._timed, name, fn, job)
+            for name, fn in stages.items()
+        }
+        # Join every stage before surfacing errors so none is left running unobserved
+        wait(futures.values())
+
+        results = {}
+        timings = {}
+        first_error = None
+        for name, future in futures.items():
+            try:
+                results[name], timings[name] = future.result()
+            except Exception as e:
+                logger.error(f"Pipeline stage '{name}' failed: {e}")
+                if first_error is None:
+                    first_error = e
+
+        if first_error is not None:
+            raise first_error
+
+        timings['fan_out_total'] = round((time.monotonic() - started) * 1000, 1)
+        timings['sequential_sum'] = round(sum(timings[name] for name in stages), 1)
+        logger.info(f"Pipeline stage timings (ms): {timings}")
+        return results, timings
+
+    def fan_out_after(self, first, build_next, job=None):
+        """
+        Run the `first` stages, then fan out the stages returned by
+        build_next(results) once those results are available.
+        """
+        started = time.monotonic()
+        results, first_timings = self.fan_out(first, job=job)
+        next_results, next_timings = self.fan_out(build_next(results), job=job)
+        results.update(next_results)
+
+        timings = {}
+        for name in list(first) + list(next_results):
+            timings[name] = first_timings.get(name, next_timings.get(name))
+        timings['fan_out_total'] = round((time.monotonic() - started) * 1000, 1)
+        timings['sequential_sum'] = round(first_timings['sequential_sum'] + next_timings['sequential_sum'], 1)
+        return results, timings
+
+# Singleton instance
+pipeline_executor = PipelineExecutor()
@@ -0,0 +1,249 @@
+# utils/report_document.py
+import re
+from dataclasses import dataclass, field, asdict
+
+# Bump whenever parsing rules or the stored shape change so stale parses are rebuilt
+PARSED_ANALYSIS_VERSION = 1
+
+SECTION_NAMES = ['executive_summary', 'detailed_analysis', 'key_findings', 'chronology']
+
+# Header keywords in priority order; a short matching line starts a new section and is not kept
+# as content. Timeline headers go first so "TEMPORAL ANALYSIS" is not read as detailed analysis.
+_SECTION_HEADERS = [
+    ('chronology', ['timeline', 'chronology', 'chronological', 'sequence of events', 'temporal']),
+    ('executive_summary', ['executive summary', 'summary', 'overview']),
+    ('detailed_analysis', ['detailed analysis', 'analysis', 'detailed evidence']),
+    ('key_findings', ['key findings', 'key evidence', 'findings', 'observations']),
+]
+_HEADER_MAX_LENGTH = 60
+
+_TIME = r'\b(?:[01]?\d|2[0-3]):[0-5]\d(?::[0-5]\d)?\b'
+_TIME_PATTERN = re.compile(_TIME)
+# A leading "14:30 -", "- [00:07]" or "[00:07-00:09]" that the timeline shows separately
+_LEADING_TIME_PATTERN = re.compile(r'^[\s*•\-\[]*' + _TIME + r'(?:\s*-\s*' + _TIME + r')?\]?[\s:\-]*')
+_PLATE_PATTERN = re.compile(r'\bTN[-\s]?\d{1,2}[-\s]?[A-Z]{1,2}[-\s]?\d{1,4}\b', re.IGNORECASE)
+_PHONE_PATTERN = re.compile(r'\b(?:\d{10}|\d{3}[-.\s]??\d{3}[-.\s]??\d{4})\b')
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+# Observation indicators: each group found in a line adds its points once
+_INDICATOR_POINTS = {
+    'weapon': 5, 'vehicle': 4, 'person': 3, 'plate': 5,
+    'money': 4, 'drug': 5, 'violence': 5, 'contact': 4,
+}
+_INDICATOR_PATTERN = re.compile(
+    r'(?P<weapon>\b(?:weapon|gun|knife|firearm|explosive)\b)'
+    r'|(?P<vehicle>\b(?:vehicle|car|truck|motorcycle|scooter)\b)'
+    r'|(?P<person>\b(?:suspect|person|individual|man|woman)\b)'
+    r'|(?P<plate>\bTN[-\s]?\d{1,2}[-\s]?[A-Z]{1,2}[-\s]?\d{1,4}\b)'
+    r'|(?P<money>\b(?:money|cash|amount|rupee|currency)\b)'
+    r'|(?P<drug>\b(?:drug|narcotic|substance|illegal)\b)'
+    r'|(?P<violence>\b(?:fight|attack|assault|violence)\b)'
+    r'|(?P<contact>\b(?:punch|hit|kick|grapple|strike)\b)',
+    re.IGNORECASE
+)
+
+_EVENT_KEYWORDS = ['first', 'then', 'after', 'before', 'begins', 'starts', 'ends', 'appears', 'enters', 'exits']
+_FINDING_KEYWORDS = ['vehicle', 'plate', 'tn-', 'suspect', 'weapon', 'suspicious', 'individual', 'person',
+                     'fight', 'altercation']
+
+
+@dataclass
+class TimelineEvent:
+    time: str
+    seconds: int
+    description: str
+
+    def to_text(self):
+        return f"{self.time} - {self.description}"
+
+
+@dataclass
+class Observation:
+    text: str
+    score: int
+
+
+@dataclass
+class ParsedAnalysis:
+    """Structured view of one analysis text, shared by every PDF section"""
+    sections: dict = field(default_factory=dict)  # section name -> content lines
+    executive_summary: str = ''
+    detailed_paragraphs: list = field(default_factory=list)
+    chronology: list = field(default_factory=list)  # TimelineEvent, in time order
+    event_lines: list = field(default_factory=list)  # untimed event lines when no timestamps exist
+    observations: list = field(default_factory=list)  # Observation, highest score first
+    plates: list = field(default_factory=list)
+    phones: list = field(default_factory=list)
+    version: int = PARSED_ANALYSIS_VERSION
+
+    def chronology_entries(self, limit=12):
+        """Timeline lines for the report, falling back to untimed event descriptions"""
+        if self.chronology:
+            return [event.to_text() for event in self.chronology[:limit]]
+        return self.event_lines[:8]
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a stored parse, or return None if it was produced by older parsing rules"""
+        if not data or data.get('version') != PARSED_ANALYSIS_VERSION:
+            return None
+        return cls(
+            sections={name: list(lines) for name, lines in data.get('sections', {}).items()},
+            executive_summary=data.get('executive_summary', ''),
+            detailed_paragraphs=list(data.get('detailed_paragraphs', [])),
+            chronology=[TimelineEvent(**event) for event in data.get('chronology', [])],
+            event_lines=list(data.get('event_lines', [])),
+            observations=[Observation(**observation) for observation in data.get('observations', [])],
+            plates=list(data.get('plates', [])),
+            phones=list(data.get('phones', [])),
+        )
+
+
+def split_into_readable_paragraphs(text, max_sentences=3):
+    """Split text into readable paragraphs with sentence limits"""
+    if not text:
+        return []
+
+    paragraphs = []
+    current_para = []
+    for sentence in _SENTENCE_SPLIT.split(text):
+        sentence = sentence.strip()
+        if sentence and len(sentence) > 10:  # Filter very short sentences
+            current_para.append(sentence)
+            if len(current_para) >= max_sentences:
+                paragraphs.append(' '.join(current_para))
+                current_para = []
+
+    if current_para:
+        paragraphs.append(' '.join(current_para))
+    return paragraphs if paragraphs else [text]
+
+
+def _time_to_seconds(time_str):
+    parts = list(map(int, time_str.split(':')))
+    while len(parts) < 3:
+        parts.append(0)
+    return parts[0] * 3600 + parts[1] * 60 + parts[2]
+
+
+def _header_section(lower_line):
+    if len(lower_line) > _HEADER_MAX_LENGTH:
+        return None
+    for name, keywords in _SECTION_HEADERS:
+        if any(keyword in lower_line for keyword in keywords):
+            return name
+    return None
+
+
+def _scan_line(text):
+    """Everything the report needs from one line, found in a single visit"""
+    lower = text.lower()
+    time_match = _TIME_PATTERN.search(text)
+    score = 0
+    if len(text) > 20:
+        groups = {match.lastgroup for match in _INDICATOR_PATTERN.finditer(text)}
+        score = sum(_INDICATOR_POINTS[group] for group in groups)
+    return {
+        'text': text,
+        'lower': lower,
+        'header': _header_section(lower),
+        'time': time_match.group(0) if time_match else None,
+        'score': score,
+        'plates': _PLATE_PATTERN.findall(text),
+        'phones': _PHONE_PATTERN.findall(text),
+        'section': None,
+    }
+
+
+def _assign_sections(records):
+    """Walk the lines once, assigning content lines to the section they fall under"""
+    current = 'executive_summary'
+    count = 0
+    for record in records:
+        if record['header']:
+            current = record['header']
+            count = 0
+            continue
+        # A timestamp after a few lines of prose starts the chronology
+        if record['time'] and current != 'chronology' and count > 3:
+            current = 'chronology'
+            count = 0
+        record['section'] = current
+        count += 1
+
+
+def _assign_fallback_sections(records):
+    """Split by position and content when the text has no recognizable headers"""
+    for record in records:
+        record['section'] = None
+
+    long_lines = [record for record in records if len(record['text']) > 20]
+    for i, record in enumerate(long_lines):
+        record['section'] = 'executive_summary' if i < 2 else 'detailed_analysis'
+
+    for record in [record for record in records if record['time']][:10]:
+        record['section'] = 'chronology'
+
+    findings = [record for record in long_lines
+                if record['section'] != 'chronology'
+                and any(keyword in record['lower'] for keyword in _FINDING_KEYWORDS)]
+    for record in findings[:8]:
+        record['section'] = 'key_findings'
+
+
+def _section_lines(records):
+    sections = {name: [] for name in SECTION_NAMES}
+    for record in records:
+        if record['section']:
+            sections[record['section']].append(record['text'])
+    return sections
+
+
+def parse_analysis(analysis_text):
+    """Parse analysis text once into sections, paragraphs, timeline, observations and identifiers"""
+    if not analysis_text:
+        return ParsedAnalysis(sections={name: [] for name in SECTION_NAMES})
+
+    records = [_scan_line(line.strip()) for line in analysis_text.split('\n') if line.strip()]
+
+    _assign_sections(records)
+    sections = _section_lines(records)
+    if not any(len(' '.join(lines)) > 50 for lines in sections.values()):
+        _assign_fallback_sections(records)
+        sections = _section_lines(records)
+
+    executive_summary = ' '.join(sections['executive_summary'])
+    if not executive_summary:
+        executive_summary = ' '.join(split_into_readable_paragraphs(analysis_text, 2)[:2])
+
+    detailed_text = ' '.join(sections['detailed_analysis']) or analysis_text
+
+    # Timeline and findings come from their own sections, or the whole text if those are empty
+    chronology_records = [record for record in records if record['section'] == 'chronology'] or records
+    chronology = []
+    for record in chronology_records:
+        if record['time']:
+            description = _LEADING_TIME_PATTERN.sub('', record['text']) or record['text']
+            chronology.append(TimelineEvent(record['time'], _time_to_seconds(record['time']), description))
+    chronology.sort(key=lambda event: event.seconds)
+
+    event_lines = [record['text'] for record in chronology_records
+                   if len(record['text']) > 15 and any(keyword in record['lower'] for keyword in _EVENT_KEYWORDS)]
+
+    finding_records = [record for record in records if record['section'] == 'key_findings'] or records
+    observations = [Observation(record['text'], record['score']) for record in finding_records if record['score'] > 0]
+    observations.sort(key=lambda observation: observation.score, reverse=True)
+
+    return ParsedAnalysis(
+        sections=sections,
+        executive_summary=executive_summary,
+        detailed_paragraphs=split_into_readable_paragraphs(detailed_text),
+        chronology=chronology,
+        event_lines=event_lines,
+        observations=observations[:10],
+        plates=list(dict.fromkeys(plate for record in records for plate in record['plates'])),
+        phones=list(dict.fromkeys(phone for record in records for phone in record['phones'])),
+    )
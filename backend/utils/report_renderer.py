@@ -0,0 +1,179 @@
+# utils/report_renderer.py
+import atexit
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from config import REPORT_RENDER_WORKERS, REPORT_RENDER_START_METHOD
+from utils.pdf_generator import generate_pdf, generate_pdfs, warm_report_styles
+from utils.report_document import ParsedAnalysis
+
+logger = logging.getLogger(__name__)
+
+# Recent render durations kept for percentile metrics
+_SAMPLE_WINDOW = 500
+
+
+def _init_render_worker():
+    """Runs once in each worker: ReportLab is imported with this module, so only warm styles"""
+    warm_report_styles()
+
+
+def _render_in_worker(analysis_text, report_id, language, enhanced_data, parsed_analysis):
+    started = time.perf_counter()
+    pdf_bytes = generate_pdf(analysis_text, report_id, language=language, enhanced_data=enhanced_data,
+                             parsed_analysis=parsed_analysis)
+    return pdf_bytes, (time.perf_counter() - started) * 1000
+
+
+def _render_languages_in_worker(analysis_text, report_id, languages, enhanced_data, parsed_analysis):
+    started = time.perf_counter()
+    pdfs = generate_pdfs(analysis_text, report_id, languages=languages, enhanced_data=enhanced_data,
+                         parsed_analysis=parsed_analysis)
+    return pdfs, (time.perf_counter() - started) * 1000
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+
+
+class ReportRenderService:
+    """
+    Renders PDF reports in a pool of worker processes.
+
+    ReportLab layout is pure Python and holds the GIL, so rendering on a
+    request or job thread stalls every other thread in the server. Workers
+    are started lazily with the 'spawn' method (the parent runs gRPC and job
+    threads, which must not be forked) and warm their fonts and styles once.
+    Spawned workers re-import the parent's main module, so the development
+    entrypoint (serve.py) keeps the Flask app out of its top-level imports.
+    """
+
+    def __init__(self, workers=REPORT_RENDER_WORKERS, start_method=REPORT_RENDER_START_METHOD):
+        self.workers = workers
+        self.start_method = start_method
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._render_ms = deque(maxlen=_SAMPLE_WINDOW)
+        self._wait_ms = deque(maxlen=_SAMPLE_WINDOW)
+        self.renders = 0
+        self.failures = 0
+        self.inline_renders = 0
+        self.pool_restarts = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_render_worker
+                )
+            return self._executor
+
+    def _reset_executor(self, broken):
+        """Drop a pool whose worker died so the next render starts a fresh one"""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self.pool_restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def render(self, analysis_text, report_id, language='en', enhanced_data=None, parsed_analysis=None):
+        """Render a report in a worker process and return the PDF bytes"""
+        return self._run(_render_in_worker, analysis_text, report_id, language, enhanced_data, parsed_analysis)
+
+    def render_languages(self, analysis_text, report_id, languages, enhanced_data=None, parsed_analysis=None):
+        """Render several languages of a report in one worker task; returns {language: PDF bytes}"""
+        return self._run(_render_languages_in_worker, analysis_text, report_id, tuple(languages), enhanced_data,
+                         parsed_analysis)
+
+    def _run(self, task, analysis_text, report_id, languages, enhanced_data, parsed_analysis):
+        if isinstance(parsed_analysis, ParsedAnalysis):
+            parsed_analysis = parsed_analysis.to_dict()
+
+        args = (analysis_text, report_id, languages, enhanced_data, parsed_analysis)
+        started = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                with self._lock:
+                    self.inline_renders += 1
+                result, render_ms = task(*args)
+            else:
+                try:
+                    result, render_ms = executor.submit(task, *args).result()
+                except BrokenProcessPool:
+                    logger.error("Report render worker died; rendering inline and restarting the pool")
+                    self._reset_executor(executor)
+                    with self._lock:
+                        self.inline_renders += 1
+                    result, render_ms = task(*args)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        total_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.renders += 1
+            self._render_ms.append(render_ms)
+            self._wait_ms.append(max(0.0, total_ms - render_ms))
+        return result
+
+    def stats(self):
+        """Queue depth and render-time counters for the metrics endpoint"""
+        with self._lock:
+            in_flight = self._in_flight
+            render_ms = list(self._render_ms)
+            wait_ms = list(self._wait_ms)
+            stats = {
+                'workers': self.workers,
+                'in_flight': in_flight,
+                'queue_depth': max(0, in_flight - self.workers),
+                'renders': self.renders,
+                'failures': self.failures,
+                'inline_renders': self.inline_renders,
+                'pool_restarts': self.pool_restarts,
+            }
+
+        if render_ms:
+            stats['render_ms'] = {
+                'avg': round(sum(render_ms) / len(render_ms), 1),
+                'p50': _percentile(render_ms, 0.5),
+                'p95': _percentile(render_ms, 0.95),
+                'max': round(max(render_ms), 1)
+            }
+            stats['queue_wait_ms'] = {
+                'avg': round(sum(wait_ms) / len(wait_ms), 1),
+                'p95': _percentile(wait_ms, 0.95)
+            }
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+# Singleton instance
+report_renderer = ReportRenderService()
+atexit.register(report_renderer.shutdown)
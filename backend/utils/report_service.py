@@ -0,0 +1,207 @@
+# utils/report_service.py
+import os
+import sys
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Path correction
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(UTILS_DIR)
+sys.path.append(BACKEND_DIR)
+
+from config import REPORT_PDF_CACHE_MAX_ENTRIES, REPORT_PRERENDER_VARIANTS, REPORT_RENDER_WAIT_SECONDS
+from utils.firebase_storage import get_report, get_report_frames, save_report_pdf
+from utils.memory_cache import LRUCache
+from utils.pdf_generator import RENDERER_VERSION, REPORT_LANGUAGES
+from utils.report_renderer import report_renderer
+
+logger = logging.getLogger(__name__)
+
+# Enhanced-data keys stored elsewhere: the analysis text and advanced features are
+# already on the report document, key frames live in its frames subcollection
+_SEPARATELY_STORED = ('basic_analysis', 'advanced_features', 'key_frames')
+
+
+def split_enhanced_data(enhanced_data):
+    """Split enhanced data into the part stored on the report document and its key frames"""
+    if not isinstance(enhanced_data, dict):
+        return None, []
+    stored = {key: value for key, value in enhanced_data.items() if key not in _SEPARATELY_STORED}
+    return stored, enhanced_data.get('key_frames', [])
+
+
+class ReportService:
+    """
+    Renders report PDFs on first view and stores them in the Storage bucket.
+
+    Uploads only store the analysis; the PDF for a (report, language,
+    renderer version) is rendered when someone first opens it, shared by
+    concurrent requests for the same key, and uploaded under its content
+    hash. Firestore and this process only keep the reference. After a first
+    render, the report's other languages are rendered in the background from
+    the same parsed and highlighted content.
+    """
+
+    def __init__(self, max_entries=REPORT_PDF_CACHE_MAX_ENTRIES, prerender_variants=REPORT_PRERENDER_VARIANTS,
+                 render_wait=REPORT_RENDER_WAIT_SECONDS):
+        self.refs = LRUCache(max_entries=max_entries)
+        # Report ID -> stored language, so repeat views can skip the Firestore read
+        self._languages = LRUCache(max_entries=max_entries)
+        self._in_progress = {}
+        self._lock = threading.Lock()
+        self.prerender_variants = prerender_variants
+        self.render_wait = render_wait
+        self._variants = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report-variants')
+        self.renders = 0
+        self.variant_renders = 0
+        self.legacy_pdfs = 0
+        self.wait_timeouts = 0
+
+    @staticmethod
+    def _pdf_key(language):
+        return f"{language}_v{RENDERER_VERSION}"
+
+    def _try_claim(self, key):
+        """Mark a key as being rendered; returns its event, or None if another thread has it"""
+        with self._lock:
+            if key in self._in_progress:
+                return None
+            pending = self._in_progress[key] = threading.Event()
+            return pending
+
+    def _release(self, key, pending):
+        with self._lock:
+            self._in_progress.pop(key, None)
+        pending.set()
+
+    def _rebuild_enhanced_data(self, report_id, report):
+        enhanced_data = report.get('enhanced_data')
+        if enhanced_data is None:
+            return None
+        enhanced_data = dict(enhanced_data)
+        enhanced_data['basic_analysis'] = report.get('analysis', '')
+        enhanced_data['advanced_features'] = report.get('advanced_features', {})
+        enhanced_data['key_frames'] = get_report_frames(report_id)
+        return enhanced_data
+
+    def _render(self, report_id, report, language, enhanced_data):
+        pdf_bytes = report.get('pdf_bytes')
+        if pdf_bytes and language == report.get('language', 'en'):
+            # Reports created before on-demand rendering carry their PDF inline; move it to Storage
+            self.legacy_pdfs += 1
+            return pdf_bytes
+
+        self.renders += 1
+        return report_renderer.render(
+            report.get('analysis', ''),
+            report_id,
+            language=language,
+            enhanced_data=enhanced_data,
+            parsed_analysis=report.get('parsed_analysis')
+        )
+
+    def _render_variants(self, report_id, report, enhanced_data, claimed):
+        """Render the claimed languages in one worker task and store each PDF"""
+        try:
+            pdfs = report_renderer.render_languages(
+                report.get('analysis', ''),
+                report_id,
+                list(claimed),
+                enhanced_data=enhanced_data,
+                parsed_analysis=report.get('parsed_analysis')
+            )
+            for language, pdf_bytes in pdfs.items():
+                ref = save_report_pdf(report_id, self._pdf_key(language), pdf_bytes)
+                self.refs.put((report_id, language, RENDERER_VERSION), ref)
+                self.variant_renders += 1
+        except Exception as e:
+            logger.error(f"Background language variants failed for report {report_id}: {e}")
+        finally:
+            for language, pending in claimed.items():
+                self._release((report_id, language, RENDERER_VERSION), pending)
+
+    def _schedule_variants(self, report_id, report, enhanced_data, existing):
+        """Queue the languages this report has no PDF for yet"""
+        claimed = {}
+        for language in REPORT_LANGUAGES:
+            if language in existing:
+                continue
+            # Claimed now so a request for a variant waits for this render instead of starting its own
+            pending = self._try_claim((report_id, language, RENDERER_VERSION))
+            if pending is not None:
+                claimed[language] = pending
+        if claimed:
+            self._variants.submit(self._render_variants, report_id, report, enhanced_data, claimed)
+
+    def get_pdf(self, report_id, language=None, prerender_variants=True):
+        """
+        Return the Storage reference of a report's PDF, rendering it on first
+        view; None if the report is missing. prerender_variants=False skips
+        queueing the report's other languages (bulk readers such as case reports).
+        """
+        language = language or self._languages.get(report_id)
+        if language:
+            ref = self.refs.get((report_id, language, RENDERER_VERSION))
+            if ref is not None:
+                return ref
+
+        # Only the references are read here; the analysis is loaded if a render is needed
+        summary = get_report(report_id, fields=['language', 'pdf_refs'])
+        if summary is None:
+            return None
+        self._languages.put(report_id, summary.get('language', 'en'))
+        language = language or summary.get('language', 'en')
+        key = (report_id, language, RENDERER_VERSION)
+
+        pdf_refs = summary.get('pdf_refs') or {}
+        ref = pdf_refs.get(self._pdf_key(language))
+        if ref is not None:
+            self.refs.put(key, ref)
+            return ref
+
+        # Concurrent requests for the same report wait for one render. A variant queued
+        # behind other background renders may not start for a while; past render_wait
+        # the request renders the PDF itself rather than hang
+        while True:
+            ref = self.refs.get(key)
+            if ref is not None:
+                return ref
+            pending = self._try_claim(key)
+            if pending is not None:
+                break
+            with self._lock:
+                waiting_on = self._in_progress.get(key)
+            if waiting_on is not None and not waiting_on.wait(self.render_wait):
+                logger.warning(f"Waited {self.render_wait}s for report {report_id} ({language}); rendering inline")
+                self.wait_timeouts += 1
+                break
+
+        try:
+            # Not cached: reports from older versions carry their PDF inline, which is moved out below
+            report = get_report(report_id, cached=False)
+            enhanced_data = self._rebuild_enhanced_data(report_id, report)
+            pdf_bytes = self._render(report_id, report, language, enhanced_data)
+            ref = save_report_pdf(report_id, self._pdf_key(language), pdf_bytes)
+            self.refs.put(key, ref)
+        finally:
+            if pending is not None:
+                self._release(key, pending)
+
+        if self.prerender_variants and prerender_variants:
+            existing = {language} | {lang for lang in REPORT_LANGUAGES if self._pdf_key(lang) in pdf_refs}
+            self._schedule_variants(report_id, report, enhanced_data, existing)
+        return ref
+
+    def stats(self):
+        """Reference cache and render counters for the metrics endpoint"""
+        return {
+            'cache': self.refs.stats(),
+            'renders': self.renders,
+            'variant_renders': self.variant_renders,
+            'legacy_pdfs': self.legacy_pdfs,
+            'wait_timeouts': self.wait_timeouts
+        }
+
+# Singleton instance
+report_service = ReportService()
@@ -0,0 +1,255 @@
+# utils/video_segmenter.py
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bracketed clip-relative timestamps emitted by the video prompt: [mm:ss] or [mm:ss-mm:ss]
+_BRACKET_TIME_PATTERN = re.compile(
+    r'\[(\d{1,2}):([0-5]\d)(?::([0-5]\d))?(?:\s*-\s*(\d{1,2}):([0-5]\d)(?::([0-5]\d))?)?\]'
+)
+_HEADING_PATTERN = re.compile(r'^\s*(?:\d+\.\s*)?([A-Z][A-Z /&-]{3,}):?\s*$')
+_WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def format_timestamp(seconds):
+    """Format seconds as HH:MM:SS so long recordings sort and parse unambiguously"""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def probe_video(file_path):
+    """Return fps, frame count and duration of a video, or None if OpenCV cannot read it"""
+    try:
+        import cv2
+    except ImportError:
+        logger.warning("OpenCV not available for video probing")
+        return None
+
+    cap = cv2.VideoCapture(file_path)
+    try:
+        if not cap.isOpened():
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return {
+            'fps': fps,
+            'frame_count': frame_count,
+            'duration': frame_count / fps if fps else 0,
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        }
+    finally:
+        cap.release()
+
+
+def plan_windows(duration, window_seconds, overlap_seconds):
+    """Split a duration into overlapping (start, end) windows in seconds"""
+    if duration <= window_seconds:
+        return [(0.0, float(duration))]
+
+    step = max(1.0, window_seconds - overlap_seconds)
+    windows = []
+    start = 0.0
+    while start < duration:
+        end = min(duration, start + window_seconds)
+        windows.append((start, end))
+        if end >= duration:
+            break
+        start += step
+    return windows
+
+
+def write_window_clips(file_path, windows, out_dir, clip_width=640, clip_fps=5):
+    """
+    Cut every window into its own downscaled clip in a single sequential
+    decode pass, so overlapping windows never re-decode the same frames.
+    """
+    import cv2
+
+    info = probe_video(file_path)
+    if not info:
+        raise ValueError(f"Cannot open video file: {file_path}")
+
+    fps = info['fps']
+    frame_step = max(1, int(round(fps / clip_fps)))
+    scale = min(1.0, clip_width / info['width']) if info['width'] else 1.0
+    size = (int(info['width'] * scale) // 2 * 2, int(info['height'] * scale) // 2 * 2)
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+
+    clip_paths = [os.path.join(out_dir, f"window_{i:03d}.mp4") for i in range(len(windows))]
+    writers = [None] * len(windows)
+
+    cap = cv2.VideoCapture(file_path)
+    frame_number = 0
+    try:
+        while True:
+            if not cap.grab():
+                break
+            timestamp = frame_number / fps
+            frame_number += 1
+
+            if (frame_number - 1) % frame_step:
+                continue
+            active = [i for i, (start, end) in enumerate(windows) if start <= timestamp < end]
+            if not active:
+                continue
+
+            ret, frame = cap.retrieve()
+            if not ret:
+                continue
+            if scale < 1.0:
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+            for i in active:
+                if writers[i] is None:
+                    writers[i] = cv2.VideoWriter(clip_paths[i], fourcc, fps / frame_step, size)
+                writers[i].write(frame)
+    finally:
+        cap.release()
+        for writer in writers:
+            if writer is not None:
+                writer.release()
+
+    return [path if writers[i] is not None else None for i, path in enumerate(clip_paths)]
+
+
+def _to_seconds(minutes, seconds, extra):
+    """Convert a mm:ss or hh:mm:ss match into seconds"""
+    if extra is not None:
+        return int(minutes) * 3600 + int(seconds) * 60 + int(extra)
+    return int(minutes) * 60 + int(seconds)
+
+
+def shift_timestamps(text, offset_seconds):
+    """Shift bracketed clip-relative timestamps by the window offset"""
+    def _shift(match):
+        start = _to_seconds(*match.group(1, 2, 3)) + offset_seconds
+        if match.group(4) is None:
+            return f"[{format_timestamp(start)}]"
+        end = _to_seconds(*match.group(4, 5, 6)) + offset_seconds
+        return f"[{format_timestamp(start)}-{format_timestamp(end)}]"
+
+    return _BRACKET_TIME_PATTERN.sub(_shift, text)
+
+
+def _split_window_sections(text):
+    """Group a window's analysis lines under summary, timeline, findings or details"""
+    sections = {'summary': [], 'timeline': [], 'findings': [], 'details': []}
+    current = 'details'
+
+    for raw_line in text.split('\n'):
+        line = raw_line.strip()
+        if not line or line.startswith('---'):
+            continue
+
+        heading = _HEADING_PATTERN.match(line.strip('*# '))
+        if heading:
+            title = heading.group(1)
+            if 'SUMMARY' in title:
+                current = 'summary'
+            elif 'TIMELINE' in title or 'TEMPORAL' in title:
+                current = 'timeline'
+            elif 'FINDING' in title:
+                current = 'findings'
+            else:
+                current = 'details'
+            continue
+
+        # Any timestamped line belongs to the chronology regardless of section
+        if _BRACKET_TIME_PATTERN.search(line):
+            sections['timeline'].append(line)
+        else:
+            sections[current].append(line)
+    return sections
+
+
+def _words(text):
+    return set(_WORD_PATTERN.findall(text.lower()))
+
+
+def _is_duplicate_event(event, kept, tolerance_seconds):
+    """Overlapping windows describe the same moment twice; match on time and wording"""
+    for other in kept:
+        if abs(event['seconds'] - other['seconds']) > tolerance_seconds:
+            continue
+        words, other_words = event['words'], other['words']
+        if not words or not other_words:
+            continue
+        if len(words & other_words) / len(words | other_words) >= 0.5:
+            return True
+    return False
+
+
+def merge_window_analyses(window_results, duration, overlap_seconds):
+    """
+    Merge per-window analyses into one report with a single deduplicated
+    chronology on the original video's time axis.
+
+    window_results is a list of (start, end, analysis_text) with timestamps
+    still relative to each clip; windows whose text is None are reported as
+    gaps in the summary and details.
+    """
+    summaries = []
+    gaps = []
+    details = []
+    findings = []
+    seen_findings = set()
+    events = []
+
+    for start, end, text in window_results:
+        window_label = f"[{format_timestamp(start)}-{format_timestamp(end)}]"
+        if not text:
+            gaps.append(window_label)
+            details.append(f"Window {window_label}: analysis unavailable")
+            continue
+
+        sections = _split_window_sections(shift_timestamps(text, start))
+
+        if sections['summary']:
+            summaries.append(f"Window {window_label}: {' '.join(sections['summary'])}")
+        if sections['details']:
+            details.append(f"Window {window_label}:")
+            details.extend(sections['details'])
+
+        for line in sections['findings']:
+            key = ' '.join(sorted(_words(line)))
+            if key and key not in seen_findings:
+                seen_findings.add(key)
+                findings.append(line)
+
+        for line in sections['timeline']:
+            match = _BRACKET_TIME_PATTERN.search(line)
+            description = line[match.end():].strip(' -:*') or line
+            events.append({
+                'seconds': _to_seconds(*match.group(1, 2, 3)),
+                'stamp': match.group(0),
+                'description': description,
+                'words': _words(description)
+            })
+
+    events.sort(key=lambda event: event['seconds'])
+    chronology = []
+    for event in events:
+        if not _is_duplicate_event(event, chronology, max(overlap_seconds, 2)):
+            chronology.append(event)
+
+    lines = [
+        "1. EXECUTIVE SUMMARY:",
+        f"Total Duration: {format_timestamp(duration)}. Analyzed in {len(window_results)} overlapping windows.",
+    ]
+    if gaps:
+        lines.append(f"INCOMPLETE: {len(gaps)} of {len(window_results)} windows could not be analyzed "
+                     f"({', '.join(gaps)}); events in those spans are missing from this report.")
+    lines.extend(summaries)
+    lines.append("")
+    lines.append("2. DETAILED ANALYSIS:")
+    lines.extend(details)
+    lines.append("")
+    lines.append("3. CHRONOLOGICAL TIMELINE:")
+    lines.extend(f"- {event['stamp']} {event['description']}" for event in chronology)
+    lines.append("")
+    lines.append("4. KEY EVIDENCE FINDINGS:")
+    lines.extend(findings)
+    return '\n'.join(lines)
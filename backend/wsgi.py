@@ -0,0 +1,10 @@
+# wsgi.py
+"""
+Production entrypoint: gunicorn wsgi:app
+
+Importing app.py only defines routes; the job workers start here, once per
+serving process.
+"""
+from app import create_app
+
+app = create_app()
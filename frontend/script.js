@@ -179,9 +179,10 @@ async function generateReport() {
                 body: formData
             });
             
-            const data = await response.json();
+            const queued = await response.json();
             
             if (response.ok) {
+                const data = await waitForJob(queued.job_id, 30, 80);
                 updateProgress('Compiling comprehensive report...', 80);
                 await sleep(1000);
                 updateProgress('Finalizing advanced analysis...', 95);
@@ -193,7 +194,7 @@ async function generateReport() {
                 currentEvidenceId = data.evidence_id;
                 displayReport(data);
             } else {
-                throw new Error(data.error || 'Advanced analysis failed');
+                throw new Error(queued.error || 'Advanced analysis failed');
             }
         } else {
             // Standard analysis
@@ -210,9 +211,10 @@ async function generateReport() {
                 body: formData
             });
 
-            const data = await response.json();
+            const queued = await response.json();
 
             if (response.ok) {
+                const data = await waitForJob(queued.job_id, 50, 80);
                 updateProgress('Compiling professional report...', 80);
                 await sleep(1000);
                 updateProgress('Finalizing analysis report...', 95);
@@ -222,7 +224,7 @@ async function generateReport() {
 
                 displayReport(data);
             } else {
-                throw new Error(data.error || 'Server returned an error response.');
+                throw new Error(queued.error || 'Server returned an error response.');
             }
         }
     } catch (err) {
@@ -232,6 +234,32 @@ async function generateReport() {
     }
 }
 
+async function waitForJob(jobId, startPercent, endPercent) {
+    // Poll the background job until the pipeline finishes
+    while (true) {
+        const response = await fetch(`http://127.0.0.1:5000/api/jobs/${jobId}`);
+        const job = await response.json();
+
+        if (!response.ok) {
+            throw new Error(job.error || 'Could not read job status');
+        }
+        if (job.status === 'completed') {
+            return job.result;
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'Evidence processing failed');
+        }
+
+        const stages = Object.entries(job.stages || {});
+        const done = stages.filter(([, info]) => info.state === 'completed').length;
+        const running = stages.find(([, info]) => info.state === 'running');
+        const percent = startPercent + Math.round((endPercent - startPercent) * done / Math.max(stages.length, 1));
+        updateProgress(running ? `Processing: ${running[0]}...` : 'Waiting for an analysis worker...', percent);
+
+        await sleep(2000);
+    }
+}
+
 function updateProgress(text, percentage) {
     progressText.textContent = text;
     progressFill.style.width = `${percentage}%`;
@@ -394,17 +422,28 @@ function handleReportCollapse(e) {
 }
 
 // Case Management Functions
+// Listings are paged by the server; follow next_cursor until every page is loaded
+async function fetchAllPages(url, key, errorMessage) {
+    const items = [];
+    let cursor = null;
+    do {
+        const separator = url.includes('?') ? '&' : '?';
+        const pageUrl = cursor ? `${url}${separator}start_after=${encodeURIComponent(cursor)}` : url;
+        const response = await fetch(pageUrl);
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.error || errorMessage);
+        }
+        items.push(...data[key]);
+        cursor = data.next_cursor;
+    } while (cursor);
+    return items;
+}
+
 async function loadCases() {
     try {
         showLoading('Loading cases...');
-        const response = await fetch('/api/cases');
-        const data = await response.json();
-        
-        if (response.ok) {
-            displayCases(data.cases);
-        } else {
-            throw new Error(data.error || 'Failed to load cases');
-        }
+        displayCases(await fetchAllPages('/api/cases', 'cases', 'Failed to load cases'));
     } catch (err) {
         showError(`Error loading cases: ${err.message}`);
     }
@@ -438,14 +477,8 @@ function displayCases(cases) {
 async function viewCase(caseId) {
     try {
         showLoading('Loading case evidence...');
-        const response = await fetch(`/api/cases/${caseId}/evidence`);
-        const data = await response.json();
-        
-        if (response.ok) {
-            displayCaseEvidence(data.evidence, caseId);
-        } else {
-            throw new Error(data.error || 'Failed to load case evidence');
-        }
+        const evidence = await fetchAllPages(`/api/cases/${caseId}/evidence`, 'evidence', 'Failed to load case evidence');
+        displayCaseEvidence(evidence, caseId);
     } catch (err) {
         showError(`Error loading case: ${err.message}`);
     }
@@ -490,14 +523,8 @@ async function searchCases() {
     if (officerId) {
         try {
             showLoading('Searching cases...');
-            const response = await fetch(`/api/cases?officerId=${encodeURIComponent(officerId)}`);
-            const data = await response.json();
-            
-            if (response.ok) {
-                displayCases(data.cases);
-            } else {
-                throw new Error(data.error || 'Search failed');
-            }
+            const url = `/api/cases?officerId=${encodeURIComponent(officerId)}`;
+            displayCases(await fetchAllPages(url, 'cases', 'Search failed'));
         } catch (err) {
             showError(`Search error: ${err.message}`);
         }